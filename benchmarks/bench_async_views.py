@@ -0,0 +1,81 @@
+# bench_async_views.py
+"""
+Load test WorkspaceView (sync, DRF on a fixed worker thread pool like WSGI) against
+AsyncWorkspaceView (one event loop) while the stub Clockify server injects latency.
+
+    python -m benchmarks.bench_async_views --latency 0.05 --concurrency 10 100 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clockify_integration.settings')
+
+from benchmarks.stub_server import start_stub_server, stop_stub_server  # noqa: E402
+
+
+def _run_sync(view, factory, concurrency, workers):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for response in pool.map(lambda _: view(factory.get('/api/clockify/workspaces/')), range(concurrency)):
+            assert response.status_code == 200, response.status_code
+    return time.perf_counter() - started
+
+
+async def _run_async(view, factory, concurrency):
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(view(factory.get('/api/clockify/async/workspaces/')) for _ in range(concurrency)))
+    assert all(response.status_code == 200 for response in responses)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub latency per call in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--workers", type=int, default=8, help="Sync worker threads, as a WSGI server would run")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency)
+    os.environ['CLOCKIFY_API_BASE_URL'] = base_url
+    os.environ.setdefault('CLOCKIFY_API_KEY_VALUE', 'stub-api-key')
+    os.environ['CLOCKIFY_ASYNC_MAX_CONNECTIONS'] = str(max(args.concurrency))
+
+    import django
+    django.setup()
+    from django.test import RequestFactory
+    from clockify_api.views import WorkspaceView
+    from clockify_api.async_views import AsyncWorkspaceView
+    from clockify_api.services.http_client import close_async_client
+
+    factory = RequestFactory()
+    sync_view = WorkspaceView.as_view()
+    async_view = AsyncWorkspaceView.as_view()
+
+    async def run_async_levels():
+        try:
+            await _run_async(async_view, factory, 1)  # Warm up the pooled client
+            return [await _run_async(async_view, factory, level) for level in args.concurrency]
+        finally:
+            await close_async_client()
+
+    try:
+        _run_sync(sync_view, factory, 1, args.workers)
+        sync_times = [_run_sync(sync_view, factory, level, args.workers) for level in args.concurrency]
+        async_times = asyncio.run(run_async_levels())
+    finally:
+        stop_stub_server(server)
+
+    print(f"{'in-flight':>10} {'sync req/s':>12} {'async req/s':>12} {'speedup':>8}")
+    for level, sync_elapsed, async_elapsed in zip(args.concurrency, sync_times, async_times):
+        print(f"{level:>10} {level / sync_elapsed:>12,.0f} {level / async_elapsed:>12,.0f} "
+              f"{sync_elapsed / async_elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# bench_http_pool.py
+"""
+Compare pooled (shared keep-alive session) and unpooled (module-level requests.get)
+throughput against the local stub Clockify server.
+
+    python -m benchmarks.bench_http_pool --requests 2000 --threads 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clockify_integration.settings')
+
+from benchmarks.stub_server import start_stub_server, stop_stub_server  # noqa: E402
+
+
+def _run(label, fetch, url, total, threads):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for response in pool.map(lambda _: fetch(url), range(total)):
+            response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<10} {total} requests in {elapsed:.2f}s -> {total / elapsed:,.0f} req/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub latency per call in seconds")
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from clockify_api.services.http_client import build_session, get_timeout
+
+    server, base_url = start_stub_server(latency=args.latency)
+    url = f"{base_url}/workspaces"
+    timeout = get_timeout()
+    session = build_session(pool_connections=1, pool_maxsize=args.threads)
+    try:
+        unpooled = _run("unpooled", lambda u: requests.get(u, timeout=timeout), url, args.requests, args.threads)
+        pooled = _run("pooled", lambda u: session.get(u, timeout=timeout), url, args.requests, args.threads)
+        print(f"speedup    {unpooled / pooled:.2f}x")
+    finally:
+        session.close()
+        stop_stub_server(server)
+
+
+if __name__ == "__main__":
+    main()
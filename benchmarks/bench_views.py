@@ -0,0 +1,489 @@
+# bench_views.py
+"""
+Run load scenarios against the views in clockify_api/urls.py with a fake Clockify API.
+
+    python -m benchmarks.bench_views --requests 200 --concurrency 16 --latency 0.02
+    python -m benchmarks.bench_views --scenarios timer_storm bulk_create --save-baseline benchmarks/baselines/main.json
+    python -m benchmarks.bench_views --compare benchmarks/baselines/main.json
+
+Each scenario reports throughput, p50/p95/p99 latency and the upstream calls it caused.
+--compare exits with status 1 when a scenario regressed past --tolerance.
+benchmarks/baselines/main.json holds a run of every scenario with the default options; timings
+depend on the machine, so re-record it on the one you compare on before trusting p95/throughput.
+Job status/result and the SSE stream are long-lived or follow-up endpoints and are not load tested.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clockify_integration.settings')
+
+from benchmarks.fake_clockify import FakeClockify, start_fake_clockify  # noqa: E402
+from benchmarks.stub_server import stop_stub_server  # noqa: E402
+
+WORKSPACE = "ws1"
+PROJECT = "p1"
+WEBHOOK_SECRET = "bench-webhook-secret"
+
+
+class Scenario(NamedTuple):
+    run: Callable  # (client, index) -> list of responses; a coroutine function for async scenarios
+    is_async: bool
+    description: str
+
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(name: str, description: str, is_async: bool = False):
+    def register(func):
+        SCENARIOS[name] = Scenario(func, is_async, description)
+        return func
+    return register
+
+
+def _json(client, method: str, path: str, data: Dict):
+    return getattr(client, method)(path, data=json.dumps(data), content_type='application/json')
+
+
+def _consume(response):
+    if getattr(response, 'streaming', False):
+        b"".join(response.streaming_content)
+    return response
+
+
+async def _aconsume(response):
+    if getattr(response, 'streaming', False):
+        async for _ in response.streaming_content:
+            pass
+    return response
+
+
+# Sync (DRF) views
+
+@scenario("workspaces", "GET workspaces/")
+def workspaces(client, index):
+    return [client.get('/api/clockify/workspaces/')]
+
+
+@scenario("create_project", "POST projects/create/")
+def create_project(client, index):
+    return [_json(client, 'post', '/api/clockify/projects/create/', {"workspace_id": WORKSPACE, "name": f"P{index}"})]
+
+
+@scenario("timer_storm", "POST timer/start/ then PUT timer/stop/")
+def timer_storm(client, index):
+    started = _json(client, 'post', '/api/clockify/timer/start/', {"workspace_id": WORKSPACE, "project_id": PROJECT})
+    stopped = _json(client, 'put', '/api/clockify/timer/stop/', {
+        "workspaceId": WORKSPACE, "timeEntryId": started.json().get("id")
+    })
+    return [started, stopped]
+
+
+@scenario("task_timer_storm", "POST tasks/start-timer/ then PUT tasks/stop-timer/")
+def task_timer_storm(client, index):
+    started = _json(client, 'post', '/api/clockify/tasks/start-timer/', {
+        "workspace_id": WORKSPACE, "project_id": PROJECT, "task_id": f"{PROJECT}-t1"
+    })
+    stopped = _json(client, 'put', '/api/clockify/tasks/stop-timer/', {
+        "workspace_id": WORKSPACE, "time_entry_id": started.json()["time_entry"]["id"]
+    })
+    return [started, stopped]
+
+
+@scenario("bulk_timers", "POST timer/bulk-start/ then timer/bulk-stop/ for 20 users")
+def bulk_timers(client, index):
+    users = [f"user-{index}-{number}" for number in range(20)]
+    started = _json(client, 'post', '/api/clockify/timer/bulk-start/', {
+        "workspace_id": WORKSPACE, "project_id": PROJECT, "items": [{"user_id": user} for user in users]
+    })
+    stopped = _json(client, 'post', '/api/clockify/timer/bulk-stop/', {
+        "workspace_id": WORKSPACE, "items": [{"time_entry_id": result["result"]["id"]}
+                                             for result in started.json()["results"] if result["status"] == "success"]
+    })
+    return [started, stopped]
+
+
+@scenario("create_task", "POST tasks/create/")
+def create_task(client, index):
+    return [_json(client, 'post', '/api/clockify/tasks/create/', {
+        "workspace_id": WORKSPACE, "project_id": PROJECT, "name": f"Task {index}"
+    })]
+
+
+@scenario("project_tasks", "GET workspaces/<ws>/projects/<p>/tasks/")
+def project_tasks(client, index):
+    return [client.get(f'/api/clockify/workspaces/{WORKSPACE}/projects/p{index % 5}/tasks/')]
+
+
+@scenario("user_report", "GET users/<u>/time-report/ streamed over every page")
+def user_report(client, index):
+    return [_consume(client.get('/api/clockify/users/user-1/time-report/', {"workspace_id": WORKSPACE}))]
+
+
+@scenario("user_report_aggregate", "GET users/<u>/time-report/?backend=aggregate&group_by=project,day")
+def user_report_aggregate(client, index):
+    return [client.get('/api/clockify/users/user-1/time-report/', {
+        "workspace_id": WORKSPACE, "backend": "aggregate", "group_by": "project,day"
+    })]
+
+
+@scenario("project_report", "GET projects/<p>/time-report/")
+def project_report(client, index):
+    return [client.get(f'/api/clockify/projects/{PROJECT}/time-report/', {"workspace_id": WORKSPACE})]
+
+
+@scenario("assign_task", "POST tasks/<t>/assign/")
+def assign_task(client, index):
+    return [_json(client, 'post', f'/api/clockify/tasks/{PROJECT}-t{index % 20}/assign/', {
+        "workspace_id": WORKSPACE, "project_id": PROJECT, "user_ids": ["user-1"]
+    })]
+
+
+@scenario("timer_status", "GET timer/status/")
+def timer_status(client, index):
+    return [client.get('/api/clockify/timer/status/', {"workspace_id": WORKSPACE})]
+
+
+@scenario("bulk_create", "POST tasks/bulk-create/ with 20 tasks")
+def bulk_create(client, index):
+    return [_json(client, 'post', '/api/clockify/tasks/bulk-create/', {
+        "workspace_id": WORKSPACE, "project_id": PROJECT,
+        "tasks": [{"name": f"Bulk {index}-{number}"} for number in range(20)]
+    })]
+
+
+@scenario("batch", "POST batch/ with workspaces, three task lists and a timer status")
+def batch(client, index):
+    operations = [{"op": "workspaces"}, {"op": "timer_status", "args": {"workspace_id": WORKSPACE, "user_id": "user-1"}}]
+    operations += [{"op": "project_tasks", "args": {"workspace_id": WORKSPACE, "project_id": f"p{number}"}}
+                   for number in range(3)]
+    return [_json(client, 'post', '/api/clockify/batch/', {"operations": operations})]
+
+
+@scenario("webhook", "POST webhooks/clockify/ timer started and stopped")
+def webhook(client, index):
+    entry = {"id": f"hook-{index}", "workspaceId": WORKSPACE, "userId": f"hook-user-{index % 50}",
+             "timeInterval": {"start": "2026-01-01T09:00:00Z", "end": None}}
+    headers = {"HTTP_CLOCKIFY_SIGNATURE": WEBHOOK_SECRET}
+    started = client.post('/api/clockify/webhooks/clockify/', data=json.dumps(entry), content_type='application/json',
+                          HTTP_CLOCKIFY_WEBHOOK_EVENT_TYPE="NEW_TIMER_STARTED", **headers)
+    entry["timeInterval"]["end"] = "2026-01-01T10:00:00Z"
+    stopped = client.post('/api/clockify/webhooks/clockify/', data=json.dumps(entry), content_type='application/json',
+                          HTTP_CLOCKIFY_WEBHOOK_EVENT_TYPE="TIMER_STOPPED", **headers)
+    return [started, stopped]
+
+
+@scenario("cache_stats", "GET cache/stats/")
+def cache_stats(client, index):
+    return [client.get('/api/clockify/cache/stats/')]
+
+
+# Async views
+
+@scenario("async_workspaces", "GET async/workspaces/", is_async=True)
+async def async_workspaces(client, index):
+    return [await client.get('/api/clockify/async/workspaces/')]
+
+
+@scenario("async_create_project", "POST async/projects/create/", is_async=True)
+async def async_create_project(client, index):
+    return [await _json(client, 'post', '/api/clockify/async/projects/create/',
+                        {"workspace_id": WORKSPACE, "name": f"P{index}"})]
+
+
+@scenario("async_timer_storm", "POST async/timer/start/ then PUT async/timer/stop/", is_async=True)
+async def async_timer_storm(client, index):
+    started = await _json(client, 'post', '/api/clockify/async/timer/start/',
+                          {"workspace_id": WORKSPACE, "project_id": PROJECT})
+    stopped = await _json(client, 'put', '/api/clockify/async/timer/stop/',
+                          {"workspaceId": WORKSPACE, "timeEntryId": started.json().get("id")})
+    return [started, stopped]
+
+
+@scenario("async_task_timer_storm", "POST async/tasks/start-timer/ then PUT async/tasks/stop-timer/", is_async=True)
+async def async_task_timer_storm(client, index):
+    started = await _json(client, 'post', '/api/clockify/async/tasks/start-timer/', {
+        "workspace_id": WORKSPACE, "project_id": PROJECT, "task_id": f"{PROJECT}-t1"
+    })
+    stopped = await _json(client, 'put', '/api/clockify/async/tasks/stop-timer/', {
+        "workspace_id": WORKSPACE, "time_entry_id": started.json()["time_entry"]["id"]
+    })
+    return [started, stopped]
+
+
+@scenario("async_create_task", "POST async/tasks/create/", is_async=True)
+async def async_create_task(client, index):
+    return [await _json(client, 'post', '/api/clockify/async/tasks/create/', {
+        "workspace_id": WORKSPACE, "project_id": PROJECT, "name": f"Task {index}"
+    })]
+
+
+@scenario("async_project_tasks", "GET async/workspaces/<ws>/projects/<p>/tasks/", is_async=True)
+async def async_project_tasks(client, index):
+    return [await client.get(f'/api/clockify/async/workspaces/{WORKSPACE}/projects/p{index % 5}/tasks/')]
+
+
+@scenario("async_user_report", "GET async/users/<u>/time-report/", is_async=True)
+async def async_user_report(client, index):
+    return [await _aconsume(await client.get('/api/clockify/async/users/user-1/time-report/',
+                                             {"workspace_id": WORKSPACE}))]
+
+
+@scenario("async_project_report", "GET async/projects/<p>/time-report/", is_async=True)
+async def async_project_report(client, index):
+    return [await client.get(f'/api/clockify/async/projects/{PROJECT}/time-report/', {"workspace_id": WORKSPACE})]
+
+
+@scenario("async_assign_task", "POST async/tasks/<t>/assign/", is_async=True)
+async def async_assign_task(client, index):
+    return [await _json(client, 'post', f'/api/clockify/async/tasks/{PROJECT}-t{index % 20}/assign/', {
+        "workspace_id": WORKSPACE, "project_id": PROJECT, "user_ids": ["user-1"]
+    })]
+
+
+@scenario("async_timer_status", "GET async/timer/status/", is_async=True)
+async def async_timer_status(client, index):
+    return [await client.get('/api/clockify/async/timer/status/', {"workspace_id": WORKSPACE})]
+
+
+@scenario("async_bulk_create", "POST async/tasks/bulk-create/ with 20 tasks", is_async=True)
+async def async_bulk_create(client, index):
+    return [await _json(client, 'post', '/api/clockify/async/tasks/bulk-create/', {
+        "workspace_id": WORKSPACE, "project_id": PROJECT,
+        "tasks": [{"name": f"Bulk {index}-{number}"} for number in range(20)]
+    })]
+
+
+# Runner
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(share * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def _timed(results: List, errors: List, responses_or_error, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    if isinstance(responses_or_error, Exception):
+        errors.append(type(responses_or_error).__name__)
+        return
+    failed = [response.status_code for response in responses_or_error if response.status_code >= 400]
+    if failed:
+        errors.append(str(failed[0]))
+    else:
+        results.append(elapsed)
+
+
+def _run_sync(run, user, total: int, concurrency: int):
+    from django.test import Client
+
+    local = threading.local()
+    latencies, errors = [], []
+
+    def one(index):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = Client()
+            client.force_login(user)
+        started = time.perf_counter()
+        try:
+            outcome = run(client, index)
+        except Exception as e:
+            outcome = e
+        _timed(latencies, errors, outcome, started)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return latencies, errors
+
+
+async def _run_async(run, user, total: int, concurrency: int):
+    from django.test import AsyncClient
+
+    from clockify_api.services.http_client import close_async_client
+
+    client = AsyncClient()
+    await client.aforce_login(user)
+    gate = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def one(index):
+        async with gate:
+            started = time.perf_counter()
+            try:
+                outcome = await run(client, index)
+            except Exception as e:
+                outcome = e
+            _timed(latencies, errors, outcome, started)
+
+    try:
+        await asyncio.gather(*(one(index) for index in range(total)))
+    finally:
+        await close_async_client()
+    return latencies, errors
+
+
+def _reset_state():
+    from django.core.cache import caches
+
+    from clockify_api.services.cache import metadata_cache
+    from clockify_api.services.singleflight import single_flight
+
+    for alias in caches:
+        caches[alias].clear()
+    metadata_cache.local.clear()
+    metadata_cache.reset_stats()
+    single_flight.reset_stats()
+
+
+def run_scenario(name: str, fake: FakeClockify, user, total: int, concurrency: int) -> Dict:
+    spec = SCENARIOS[name]
+    _reset_state()
+    fake.reset_calls()
+    started = time.perf_counter()
+    if spec.is_async:
+        latencies, errors = asyncio.run(_run_async(spec.run, user, total, concurrency))
+    else:
+        latencies, errors = _run_sync(spec.run, user, total, concurrency)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    upstream = fake.total_calls()
+    return {
+        "operations": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 4),
+        "throughput": round(total / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "errors": len(errors),
+        "error_kinds": sorted(set(errors)),
+        "upstream_calls": upstream,
+        "upstream_per_op": round(upstream / total, 3),
+        "upstream_by_route": dict(sorted(fake.calls.items())),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Regressions against a stored baseline: slower p95, lower throughput or more upstream calls"""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput']}/s -> {current['throughput']}/s")
+        if current["upstream_per_op"] > before["upstream_per_op"] * (1 + tolerance):
+            regressions.append(f"{name}: upstream calls/op {before['upstream_per_op']} -> {current['upstream_per_op']}")
+        if current["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {current['errors']}")
+    return regressions
+
+
+def _print_table(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> None:
+    print(f"{'scenario':<24} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'upstream/op':>11} {'errors':>6} {'vs p95':>8}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        delta = f"{(result['p95_ms'] / before['p95_ms'] - 1) * 100:+.0f}%" if before and before['p95_ms'] else ""
+        print(f"{name:<24} {result['throughput']:>9,.1f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['upstream_per_op']:>11.2f} {result['errors']:>6} {delta:>8}")
+    for name, result in results.items():
+        if result["errors"]:
+            print(f"{name}: errors {', '.join(result['error_kinds'])}")
+
+
+def _setup_django(database: str) -> object:
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.DATABASES['default']['NAME'] = database
+    settings.ALLOWED_HOSTS = list(settings.ALLOWED_HOSTS) + ['testserver']
+    from django.core.management import call_command
+    from django.contrib.auth.models import User
+
+    call_command('migrate', verbosity=0)
+    return User.objects.create_user(username='bench', password='bench', is_staff=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="Operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake Clockify latency per call in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency in seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fake Clockify requests/s per key and workspace")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake Clockify calls answered with 503")
+    parser.add_argument("--report-entries", type=int, default=1000, help="Rows in each fake detailed report")
+    parser.add_argument("--client-rate-limit", type=float, default=0.0,
+                        help="Our own limiter's requests/s (CLOCKIFY_RATE_LIMIT rate), 0 = off")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="Compare with a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, spec in SCENARIOS.items():
+            print(f"{name:<24} {spec.description}")
+        return
+
+    fake = FakeClockify(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                        error_rate=args.error_rate, report_entries=args.report_entries, seed=args.seed)
+    server, base_url = start_fake_clockify(fake)
+    os.environ['CLOCKIFY_API_BASE_URL'] = base_url
+    os.environ.setdefault('CLOCKIFY_API_KEY_VALUE', 'bench-api-key')
+    os.environ['CLOCKIFY_WEBHOOK_SECRETS'] = WEBHOOK_SECRET
+    os.environ['CLOCKIFY_ASYNC_MAX_CONNECTIONS'] = str(max(args.concurrency, 10))
+    os.environ['CLOCKIFY_RATE_LIMIT_ENABLED'] = '1' if args.client_rate_limit else '0'
+    if args.client_rate_limit:
+        os.environ['CLOCKIFY_RATE_LIMIT_RATE'] = os.environ['CLOCKIFY_RATE_LIMIT_BURST'] = str(args.client_rate_limit)
+
+    baseline = json.loads(args.compare.read_text())["results"] if args.compare else {}
+    with tempfile.TemporaryDirectory() as directory:
+        user = _setup_django(os.path.join(directory, "bench.sqlite3"))
+        results = {}
+        try:
+            for name in args.scenarios:
+                results[name] = run_scenario(name, fake, user, args.requests, args.concurrency)
+        finally:
+            stop_stub_server(server)
+            from django.db import connections
+            connections.close_all()
+
+    _print_table(results, baseline)
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        config = {key: value for key, value in vars(args).items()
+                  if key not in ("save_baseline", "compare", "list", "scenarios")}
+        args.save_baseline.write_text(json.dumps({"config": config, "results": results}, indent=2, sort_keys=True))
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
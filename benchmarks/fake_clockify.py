@@ -0,0 +1,345 @@
+# fake_clockify.py
+"""
+Stateful fake of the Clockify REST API for benchmarks: timers, projects, tasks and paged
+reports, with injectable latency, per key/workspace rate limiting and random 5xx errors.
+"""
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.stub_server import StubClockifyHandler, StubClockifyServer
+
+_ID = r"([^/]+)"
+_ROUTES = [
+    ("GET", r"/user", "current_user"),
+    ("GET", r"/workspaces", "workspaces"),
+    ("GET", rf"/workspaces/{_ID}", "workspace"),
+    ("GET", rf"/workspaces/{_ID}/projects", "projects"),
+    ("POST", rf"/workspaces/{_ID}/projects", "create_project"),
+    ("GET", rf"/workspaces/{_ID}/projects/{_ID}", "project"),
+    ("GET", rf"/workspaces/{_ID}/projects/{_ID}/tasks", "tasks"),
+    ("POST", rf"/workspaces/{_ID}/projects/{_ID}/tasks", "create_task"),
+    ("GET", rf"/workspaces/{_ID}/projects/{_ID}/tasks/{_ID}", "task"),
+    ("PUT", rf"/workspaces/{_ID}/projects/{_ID}/tasks/{_ID}", "update_task"),
+    ("GET", rf"/workspaces/{_ID}/projects/{_ID}/reports/summary", "summary_report"),
+    ("POST", rf"/workspaces/{_ID}/reports/detailed", "detailed_report"),
+    ("POST", rf"/workspaces/{_ID}/time-entries", "start_timer"),
+    ("GET", rf"/workspaces/{_ID}/time-entries/{_ID}", "time_entry"),
+    ("PUT", rf"/workspaces/{_ID}/time-entries/{_ID}", "update_time_entry"),
+    ("GET", rf"/workspaces/{_ID}/user/{_ID}/time-entries", "user_time_entries"),
+    ("POST", rf"/workspaces/{_ID}/user/{_ID}/time-entries", "start_timer_for_user"),
+    ("PATCH", rf"/workspaces/{_ID}/user/{_ID}/time-entries", "stop_running"),
+]
+_COMPILED = [(method, re.compile(f"^{pattern}$"), name) for method, pattern, name in _ROUTES]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeClockify:
+    """
+    State and behaviour shared by every handler thread.
+
+    latency / jitter   seconds added to every response (uniform jitter on top)
+    rate_limit         requests per second per API key and workspace, 0 = unlimited (429 + Retry-After)
+    error_rate         share of requests answered with a 503
+    tasks_per_project  size of each project's task list
+    report_entries     rows in every detailed report, served in the requested page size
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_limit: float = 0.0,
+                 error_rate: float = 0.0, projects: int = 5, tasks_per_project: int = 20,
+                 report_entries: int = 1000, user_id: str = "user-1", seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.projects = projects
+        self.tasks_per_project = tasks_per_project
+        self.report_entries = report_entries
+        self.user_id = user_id
+        self.calls: Counter = Counter()
+        self._forced_throttles: Counter = Counter()  # route -> calls still to answer with a 429
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._windows: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._tasks: Dict[str, list] = {}
+        self._entries: Dict[str, Dict] = {}
+        self._running: Dict[str, str] = {}  # user -> time entry id
+
+    # Bookkeeping
+
+    def reset_calls(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def total_calls(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}{next(self._ids)}"
+
+    def throttle_next(self, route: str, times: int = 1) -> None:
+        """Answer the next `times` calls to `route` (a route name, e.g. "workspace") with a 429"""
+        with self._lock:
+            self._forced_throttles[route] += times
+
+    def throttled(self, api_key: str, workspace_id: str, route: Optional[str] = None) -> bool:
+        with self._lock:
+            if self._forced_throttles[route] > 0:
+                self._forced_throttles[route] -= 1
+                return True
+        if not self.rate_limit:
+            return False
+        window = int(time.monotonic())
+        with self._lock:
+            start, count = self._windows.get((api_key, workspace_id), (window, 0))
+            if start != window:
+                start, count = window, 0
+            self._windows[(api_key, workspace_id)] = (start, count + 1)
+        return count + 1 > self.rate_limit
+
+    def failed(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def delay(self) -> float:
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    # Resources
+
+    def tasks(self, project_id: str) -> list:
+        with self._lock:
+            if project_id not in self._tasks:
+                self._tasks[project_id] = [
+                    {"id": f"{project_id}-t{index}", "name": f"Task {index}", "projectId": project_id,
+                     "status": "ACTIVE", "assigneeIds": []}
+                    for index in range(self.tasks_per_project)
+                ]
+            return self._tasks[project_id]
+
+    def report_page(self, workspace_id: str, page: int, page_size: int) -> Dict:
+        first = (page - 1) * page_size
+        rows = []
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for index in range(first, min(first + page_size, self.report_entries)):
+            begin = start + timedelta(hours=index)
+            rows.append({
+                "_id": f"{workspace_id}-e{index}", "userId": f"user-{index % 10}",
+                "projectId": f"p{index % self.projects}", "taskId": f"p{index % self.projects}-t{index % 7}",
+                "billable": index % 3 != 0, "tagIds": [f"tag{index % 4}"], "description": "",
+                "timeInterval": {"start": begin.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                                 "end": (begin + timedelta(minutes=45)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                                 "duration": 2700},
+            })
+        return {"totals": [{"totalTime": 2700 * self.report_entries, "entriesCount": self.report_entries}],
+                "timeentries": rows}
+
+    def start_timer(self, workspace_id: str, body: Dict, user_id: Optional[str] = None) -> Dict:
+        user_id = user_id or self.user_id
+        entry = {
+            "id": self._next_id("te"), "workspaceId": workspace_id, "userId": user_id,
+            "projectId": body.get("projectId"), "taskId": body.get("taskId"),
+            "description": body.get("description") or "", "billable": bool(body.get("billable")),
+            "tagIds": body.get("tagIds") or [],
+            "timeInterval": {"start": body.get("start") or _now(), "end": body.get("end"), "duration": None},
+        }
+        with self._lock:
+            self._entries[entry["id"]] = entry
+            if not body.get("end"):
+                self._running[user_id] = entry["id"]
+        return entry
+
+    def stop_entry(self, entry_id: str, body: Dict) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return None
+            # PUT replaces the entry, as on Clockify: whatever the body leaves out is cleared
+            entry = {**entry, "description": body.get("description") or "", "billable": bool(body.get("billable")),
+                     "tagIds": body.get("tagIds") or [], "projectId": body.get("projectId"),
+                     "taskId": body.get("taskId")}
+            entry["timeInterval"] = {"start": body.get("start") or entry["timeInterval"]["start"],
+                                     "end": body.get("end") or _now(), "duration": None}
+            self._entries[entry_id] = entry
+            if self._running.get(entry["userId"]) == entry_id:
+                del self._running[entry["userId"]]
+            return entry
+
+    def user_entries(self, workspace_id: str, user_id: str, start: Optional[str] = None,
+                     end: Optional[str] = None) -> list:
+        """Entries started within [start, end], newest first (timestamps compare as strings)"""
+        with self._lock:
+            entries = [
+                entry for entry in self._entries.values()
+                if entry["workspaceId"] == workspace_id and entry["userId"] == user_id
+                and (start is None or entry["timeInterval"]["start"] >= start)
+                and (end is None or entry["timeInterval"]["start"] <= end)
+            ]
+        return sorted(entries, key=lambda entry: entry["timeInterval"]["start"], reverse=True)
+
+    def entry(self, entry_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._entries.get(entry_id)
+
+    def running_entry(self, user_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry_id = self._running.get(user_id)
+            return self._entries.get(entry_id) if entry_id else None
+
+
+class FakeClockifyHandler(StubClockifyHandler):
+    fake: FakeClockify = None
+
+    def _handle(self, method: str) -> None:
+        parts = urlsplit(self.path)
+        path = parts.path[len("/api/v1"):] if parts.path.startswith("/api/v1") else parts.path
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        body = self._read_body() if method in ("POST", "PUT", "PATCH") else {}
+
+        for route_method, pattern, name in _COMPILED:
+            match = pattern.match(path)
+            if route_method == method and match:
+                break
+        else:
+            return self._reply(404, {"message": f"No route for {method} {path}"})
+
+        fake = self.fake
+        with fake._lock:
+            fake.calls[name] += 1
+        delay = fake.delay()
+        if delay:
+            time.sleep(delay)
+
+        args = match.groups()
+        workspace_id = args[0] if args else "-"
+        if fake.throttled(self.headers.get("X-Api-Key", ""), workspace_id, name):
+            return self._send(429, {"message": "Too many requests"}, {"Retry-After": "1"})
+        if fake.failed():
+            return self._send(503, {"message": "Injected failure"})
+        status_code, payload = getattr(self, f"route_{name}")(query, body, *args)
+        self._send(status_code, payload)
+
+    def _send(self, status_code: int, body, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    # Routes return (status, body)
+
+    @staticmethod
+    def _page(items, query):
+        if "page" not in query:
+            return items
+        page, size = int(query["page"]), int(query.get("page-size", 50))
+        return items[(page - 1) * size:page * size]
+
+    def route_current_user(self, query, body):
+        return 200, {"id": self.fake.user_id, "name": "Benchmark user", "activeWorkspace": "ws1"}
+
+    def route_workspaces(self, query, body):
+        return 200, [{"id": "ws1", "name": "Benchmark workspace"}]
+
+    def route_workspace(self, query, body, workspace_id):
+        return 200, {"id": workspace_id, "name": "Benchmark workspace"}
+
+    def route_projects(self, query, body, workspace_id):
+        projects = [{"id": f"p{index}", "name": f"Project {index}", "billable": True, "archived": False}
+                    for index in range(self.fake.projects)]
+        return 200, self._page(projects, query)
+
+    def route_create_project(self, query, body, workspace_id):
+        return 201, {"id": self.fake._next_id("p"), "name": body.get("name"), "workspaceId": workspace_id}
+
+    def route_project(self, query, body, workspace_id, project_id):
+        return 200, {"id": project_id, "name": f"Project {project_id}", "workspaceId": workspace_id}
+
+    def route_tasks(self, query, body, workspace_id, project_id):
+        tasks = self.fake.tasks(project_id)
+        if "is-active" in query:
+            wanted = "ACTIVE" if query["is-active"] == "true" else "DONE"
+            tasks = [task for task in tasks if task.get("status") == wanted]
+        if query.get("name"):
+            tasks = [task for task in tasks if query["name"].lower() in task["name"].lower()]
+        return 200, self._page(tasks, query)
+
+    def route_create_task(self, query, body, workspace_id, project_id):
+        task = {"id": self.fake._next_id("t"), "name": body.get("name"), "projectId": project_id,
+                "status": body.get("status", "ACTIVE"), "assigneeIds": body.get("assigneeIds") or []}
+        with self.fake._lock:
+            self.fake._tasks.setdefault(project_id, []).append(task)
+        return 201, task
+
+    def route_task(self, query, body, workspace_id, project_id, task_id):
+        return 200, {"id": task_id, "name": f"Task {task_id}", "projectId": project_id, "status": "ACTIVE"}
+
+    def route_update_task(self, query, body, workspace_id, project_id, task_id):
+        return 200, {"id": task_id, "name": f"Task {task_id}", "projectId": project_id, **body}
+
+    def route_summary_report(self, query, body, workspace_id, project_id):
+        return 200, {"projectId": project_id, "totalTime": 2700 * self.fake.report_entries}
+
+    def route_detailed_report(self, query, body, workspace_id):
+        detailed = body.get("detailedFilter") or {}
+        return 200, self.fake.report_page(workspace_id, int(detailed.get("page", 1)), int(detailed.get("pageSize", 50)))
+
+    def route_start_timer(self, query, body, workspace_id):
+        return 201, self.fake.start_timer(workspace_id, body)
+
+    def route_start_timer_for_user(self, query, body, workspace_id, user_id):
+        return 201, self.fake.start_timer(workspace_id, body, user_id)
+
+    def route_time_entry(self, query, body, workspace_id, entry_id):
+        entry = self.fake.entry(entry_id)
+        return (200, entry) if entry else (404, {"message": "Time entry not found"})
+
+    def route_update_time_entry(self, query, body, workspace_id, entry_id):
+        entry = self.fake.stop_entry(entry_id, body)
+        return (200, entry) if entry else (404, {"message": "Time entry not found"})
+
+    def route_user_time_entries(self, query, body, workspace_id, user_id):
+        if query.get("in-progress") == "true":
+            entry = self.fake.running_entry(user_id)
+            return 200, [entry] if entry else []
+        return 200, self.fake.user_entries(workspace_id, user_id, query.get("start"), query.get("end"))
+
+    def route_stop_running(self, query, body, workspace_id, user_id):
+        entry = self.fake.running_entry(user_id)
+        if entry is None:
+            return 404, {"message": "No running timer"}
+        return 200, self.fake.stop_entry(entry["id"], body)
+
+
+def start_fake_clockify(fake: FakeClockify, host: str = "127.0.0.1", port: int = 0):
+    """Start the fake in a daemon thread and return (server, base_url); stop it with stop_stub_server"""
+    handler = type("FakeHandler", (FakeClockifyHandler,), {"fake": fake})
+    server = StubClockifyServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/api/v1"
@@ -0,0 +1,63 @@
+# stub_server.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+
+class StubClockifyHandler(BaseHTTPRequestHandler):
+    """Minimal fake of the Clockify REST API, answers every path with a small JSON body"""
+    protocol_version = "HTTP/1.1"  # Keep-alive, so pooled clients can reuse connections
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+    latency = 0.0
+
+    def _reply(self, status_code: int, body) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        payload = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def do_GET(self):
+        self._reply(200, [{"id": "stub", "name": "Stub workspace"}])
+
+    def do_POST(self):
+        self._reply(201, {"id": "stub", **self._read_body()})
+
+    def do_PUT(self):
+        self._reply(200, {"id": "stub", **self._read_body()})
+
+    def do_PATCH(self):
+        self._reply(200, {"id": "stub", **self._read_body()})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubClockifyServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Bursts of new connections must not hit the default backlog of 5
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0,
+                      latency: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub in a daemon thread and return (server, base_url)"""
+    handler = type("StubHandler", (StubClockifyHandler,), {"latency": latency})
+    server = StubClockifyServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/api/v1"
+
+
+def stop_stub_server(server: Optional[ThreadingHTTPServer]) -> None:
+    if server is not None:
+        server.shutdown()
+        server.server_close()
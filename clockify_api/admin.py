@@ -1,3 +1,58 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ClockifyCredential, Job, Project, RunningTimer, SyncState, Task, TimeEntry, TimerWrite, Workspace
+
+
+@admin.register(Workspace)
+class WorkspaceAdmin(admin.ModelAdmin):
+    list_display = ('clockify_id', 'name', 'synced_at')
+
+
+@admin.register(Project)
+class ProjectAdmin(admin.ModelAdmin):
+    list_display = ('clockify_id', 'name', 'workspace', 'billable', 'archived')
+    list_filter = ('workspace', 'archived')
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('clockify_id', 'name', 'project', 'status')
+    list_filter = ('status',)
+
+
+@admin.register(TimeEntry)
+class TimeEntryAdmin(admin.ModelAdmin):
+    list_display = ('clockify_id', 'user_id', 'project_id', 'task_id', 'start', 'end', 'duration')
+    list_filter = ('workspace', 'billable')
+
+
+@admin.register(SyncState)
+class SyncStateAdmin(admin.ModelAdmin):
+    list_display = ('workspace', 'time_entries_watermark', 'last_synced_at')
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress_done', 'progress_total', 'attempts', 'created_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('locked_by', 'locked_until', 'started_at', 'finished_at')
+
+
+@admin.register(RunningTimer)
+class RunningTimerAdmin(admin.ModelAdmin):
+    list_display = ('user_id', 'workspace_id', 'time_entry_id', 'updated_at')
+    search_fields = ('user_id', 'time_entry_id')
+
+
+@admin.register(ClockifyCredential)
+class ClockifyCredentialAdmin(admin.ModelAdmin):
+    list_display = ('user', 'clockify_user_id', 'updated_at')  # Keys stay out of the change list
+    search_fields = ('user__username', 'clockify_user_id')
+
+
+@admin.register(TimerWrite)
+class TimerWriteAdmin(admin.ModelAdmin):
+    list_display = ('id', 'workspace_id', 'clockify_user_id', 'time_entry_id', 'start', 'end', 'status', 'attempts')
+    list_filter = ('status',)
+    search_fields = ('id', 'time_entry_id', 'clockify_user_id')
+    readonly_fields = ('locked_by', 'locked_until', 'created_at')
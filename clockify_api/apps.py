@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ClockifyApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clockify_api'
+
+    def ready(self):
+        from .services.write_behind import flusher
+        flusher.install()
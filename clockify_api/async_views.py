@@ -0,0 +1,401 @@
+import json
+import logging
+from datetime import timedelta
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import pagination
+from .services import fast_json, timer_store
+from .services.timer_events import timer_events
+from .services.credentials import aclockify_user_id, async_service_for_user
+from .services.projection import ListQuery
+from .streaming import astream_report_json, astream_report_ndjson
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClockifyView(View):
+    """
+    Async counterpart of the DRF views, meant to be served through clockify_integration/asgi.py
+    so one worker can keep many upstream Clockify calls in flight. Clients authenticate as they
+    do with the DRF views: same authentication classes, CSRF enforced by SessionAuthentication.
+    """
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    requires_auth = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # As APIView: session-authenticated requests are CSRF-checked in authenticate() instead
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def initialize_request(self, request) -> Request:
+        """The DRF request the sync views would see: same parsers and authenticators"""
+        return Request(
+            request,
+            parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+            authenticators=[auth() for auth in self.authentication_classes]
+        )
+
+    def authenticate_header(self, request):
+        authenticators = self.authentication_classes
+        return authenticators[0]().authenticate_header(request) if authenticators else None
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.drf_request = self.initialize_request(request)
+        try:
+            # Raises AuthenticationFailed, or PermissionDenied on a CSRF failure
+            request.user = await sync_to_async(lambda: self.drf_request.user)()
+            if self.requires_auth and not request.user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+        except exceptions.APIException as e:
+            return self.exception_response(request, e)
+        self.service = await async_service_for_user(request.user)
+        return await super().dispatch(request, *args, **kwargs)
+
+    def exception_response(self, request, exc):
+        """Same status and body APIView.handle_exception gives authentication failures"""
+        response = JsonResponse({"detail": exc.detail}, status=exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            header = self.authenticate_header(request)
+            if header:
+                response['WWW-Authenticate'] = header
+                response.status_code = 401
+            else:
+                response.status_code = 403
+        return response
+
+    def get_data(self) -> dict:
+        """Request body as request.data parses it for the sync views; {} when missing or malformed"""
+        try:
+            data = self.drf_request.data
+        except exceptions.ParseError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    async def validate_ids(self, workspace_id, project_id=None, task_id=None):
+        invalid_ids = await self.service.find_invalid_ids(workspace_id, project_id, task_id)
+        if invalid_ids:
+            raise ValueError(f"Invalid ID(s) provided: {', '.join(invalid_ids)}")
+
+    @staticmethod
+    def error_response(message, e):
+        error_message = f"{message}: {str(e)}"
+        if isinstance(e, httpx.HTTPStatusError):
+            error_message += f"\nResponse content: {e.response.text}"
+        logger.error(error_message)
+        return JsonResponse({"error": str(e)}, status=400)
+
+
+class AsyncUserTimeReportView(AsyncClockifyView):
+    requires_auth = True
+
+    async def get(self, request, user_id):
+        workspace_id = request.GET.get('workspace_id')
+        if not workspace_id:
+            return JsonResponse({"error": "workspace_id is required"}, status=400)
+
+        stream_format = request.GET.get('stream', 'json')
+        if stream_format not in ('json', 'ndjson'):
+            return JsonResponse({"error": "stream must be 'json' or 'ndjson'"}, status=400)
+
+        end_date = timezone.now()
+        start_date = end_date - timedelta(days=30)
+        try:
+            pages = self.service.iter_user_time_report_pages(workspace_id, user_id, start_date, end_date)
+            # Fetch the first page up front so upstream errors still map to a 400
+            first_page = await anext(pages)
+        except Exception as e:
+            return self.error_response("Error fetching user time report", e)
+
+        if stream_format == 'ndjson':
+            return StreamingHttpResponse(
+                astream_report_ndjson(first_page, pages), content_type='application/x-ndjson', status=200
+            )
+        return StreamingHttpResponse(astream_report_json(first_page, pages), content_type='application/json', status=200)
+
+
+class AsyncProjectTimeReportView(AsyncClockifyView):
+    requires_auth = True
+
+    async def get(self, request, project_id):
+        workspace_id = request.GET.get('workspace_id')
+        if not workspace_id:
+            return JsonResponse({"error": "workspace_id is required"}, status=400)
+
+        try:
+            await self.validate_ids(workspace_id, project_id)
+            report = await self.service.get_project_time_report(workspace_id, project_id)
+            return JsonResponse(report, status=200, safe=False)
+        except Exception as e:
+            return self.error_response("Error fetching project time report", e)
+
+
+class AsyncTaskAssignmentView(AsyncClockifyView):
+    requires_auth = True
+
+    async def post(self, request, task_id):
+        data = self.get_data()
+        workspace_id = data.get('workspace_id')
+        project_id = data.get('project_id')
+        user_ids = data.get('user_ids', [])
+
+        if not all([workspace_id, project_id]):
+            return JsonResponse({"error": "workspace_id and project_id are required"}, status=400)
+
+        try:
+            await self.validate_ids(workspace_id, project_id, task_id)
+            result = await self.service.assign_task(workspace_id, project_id, task_id, user_ids)
+            return JsonResponse(result, status=200, safe=False)
+        except Exception as e:
+            return self.error_response("Error assigning task", e)
+
+
+class AsyncTimerStatusView(AsyncClockifyView):
+    requires_auth = True
+
+    async def get(self, request):
+        workspace_id = request.GET.get('workspace_id')
+        if not workspace_id:
+            return JsonResponse({"error": "workspace_id is required"}, status=400)
+
+        try:
+            user_id = await aclockify_user_id(request.user)
+            timer_status = None
+            use_store = request.GET.get('source', settings.CLOCKIFY_TIMER_STATUS_SOURCE) == 'store'
+            if use_store:
+                timer_status = await sync_to_async(timer_store.get)(workspace_id, user_id)
+            if timer_status is None:
+                timer_status = await self.service.get_timer_status(workspace_id, user_id)
+                if use_store:
+                    await sync_to_async(timer_store.seed)(workspace_id, user_id, timer_status)
+            return JsonResponse(timer_status, status=200, safe=False)
+        except Exception as e:
+            return self.error_response("Error fetching timer status", e)
+
+
+class TimerEventsView(AsyncClockifyView):
+    """
+    Server-Sent Events stream of timer starts and stops, replacing timer-status polling.
+    Opens with a `snapshot` of the current timer, then one `timer` event per change.
+    Staff may follow another user (?user_id=) or the whole workspace (?user_id=all).
+    """
+    requires_auth = True
+
+    async def get(self, request):
+        workspace_id = request.GET.get('workspace_id')
+        if not workspace_id:
+            return JsonResponse({"error": "workspace_id is required"}, status=400)
+
+        user = request.user
+        try:
+            user_id = await aclockify_user_id(user)
+        except Exception as e:
+            return self.error_response("Error resolving Clockify user", e)
+        requested = request.GET.get('user_id')
+        if requested and requested != user_id:
+            if not user.is_staff:
+                return JsonResponse({"error": "Not allowed to follow other users"}, status=403)
+            user_id = None if requested == 'all' else requested
+
+        snapshot = None
+        if user_id is not None:
+            snapshot = await sync_to_async(timer_store.get)(workspace_id, user_id)
+        response = StreamingHttpResponse(
+            self.stream(workspace_id, user_id, snapshot),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Keep nginx from buffering the stream
+        return response
+
+    @staticmethod
+    async def stream(workspace_id, user_id, snapshot):
+        if snapshot is not None:
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n".encode()
+        async for event in timer_events.subscribe(workspace_id, user_id):
+            if event is None:
+                yield b": keep-alive\n\n"
+            else:
+                yield f"event: timer\ndata: {json.dumps(event)}\n\n".encode()
+
+
+class AsyncBulkTaskCreateView(AsyncClockifyView):
+    requires_auth = True
+
+    async def post(self, request):
+        data = self.get_data()
+        workspace_id = data.get('workspace_id')
+        project_id = data.get('project_id')
+        tasks = data.get('tasks', [])
+
+        if not all([workspace_id, project_id, tasks]):
+            return JsonResponse({"error": "workspace_id, project_id, and tasks are required"}, status=400)
+
+        try:
+            await self.validate_ids(workspace_id, project_id)
+            created_tasks = await self.service.bulk_create_tasks(workspace_id, project_id, tasks)
+            return JsonResponse(created_tasks, status=201, safe=False)
+        except Exception as e:
+            return self.error_response("Error creating tasks in bulk", e)
+
+
+class AsyncWorkspaceView(AsyncClockifyView):
+    async def get(self, request):
+        try:
+            query = ListQuery.from_params(request.GET, allowed=("fields", "name__contains"))
+            if query.is_identity():
+                workspaces = await self.service.get_workspaces(raw=True)
+                return HttpResponse(workspaces, status=200, content_type="application/json")
+            workspaces = list(query.apply(await self.service.get_workspaces()))
+            return JsonResponse(workspaces, status=200, safe=False)
+        except Exception as e:
+            return self.error_response("Error fetching workspaces", e)
+
+
+class AsyncCreateProjectView(AsyncClockifyView):
+    async def post(self, request):
+        data = self.get_data()
+        workspace_id = data.get("workspace_id")
+        project_name = data.get("name")
+
+        if not project_name:
+            return JsonResponse({"error": "Project name is required"}, status=400)
+
+        try:
+            project = await self.service.create_project(workspace_id, project_name)
+            return JsonResponse(project, status=201, safe=False)
+        except Exception as e:
+            return self.error_response("Error creating project", e)
+
+
+class AsyncStartTimerView(AsyncClockifyView):
+    async def post(self, request):
+        data = self.get_data()
+        workspace_id = data.get("workspace_id")
+        project_id = data.get("project_id")
+        description = data.get("description", "")
+
+        if not workspace_id or not project_id:
+            return JsonResponse({"error": "Workspace ID and Project ID are required"}, status=400)
+
+        try:
+            time_entry = await self.service.start_timer(workspace_id, project_id, description)
+            return JsonResponse(time_entry, status=201, safe=False)
+        except Exception as e:
+            return self.error_response("Error starting timer", e)
+
+
+class AsyncStopTimerView(AsyncClockifyView):
+    async def put(self, request):
+        data = self.get_data()
+        workspace_id = data.get("workspaceId")
+        time_entry_id = data.get("timeEntryId")
+        user_id = data.get("userId")
+
+        if not workspace_id or not (time_entry_id or user_id):
+            return JsonResponse({"error": "workspaceId and timeEntryId (or userId) are required"}, status=400)
+
+        try:
+            # Stopping by userId is for the user's own timer, or for staff, as in StopTimerView
+            if user_id and not request.user.is_staff and (
+                    not request.user.is_authenticated or str(user_id) != await aclockify_user_id(request.user)):
+                return JsonResponse({"error": "Not allowed to manage other users' timers"}, status=403)
+            if time_entry_id:
+                response = await self.service.stop_timer(workspace_id, time_entry_id)
+            else:
+                response = await self.service.stop_running_timer(workspace_id, user_id)
+            return JsonResponse(response, status=200, safe=False)
+        except Exception as e:
+            return self.error_response("Error stopping timer", e)
+
+
+class AsyncCreateTaskView(AsyncClockifyView):
+    async def post(self, request):
+        data = self.get_data()
+        workspace_id = data.get("workspace_id")
+        project_id = data.get("project_id")
+        task_name = data.get("name")
+        assignee_ids = data.get("assignee_ids", [])
+
+        if not all([workspace_id, project_id, task_name]):
+            return JsonResponse({"error": "workspace_id, project_id, and name are required"}, status=400)
+
+        try:
+            task = await self.service.create_task(workspace_id, project_id, task_name, assignee_ids)
+            return JsonResponse(task, status=201, safe=False)
+        except Exception as e:
+            return self.error_response("Error creating task", e)
+
+
+class AsyncStartTaskTimerView(AsyncClockifyView):
+    async def post(self, request):
+        data = self.get_data()
+        workspace_id = data.get("workspace_id")
+        project_id = data.get("project_id")
+        task_id = data.get("task_id")
+        description = data.get("description", "")
+
+        if not all([workspace_id, project_id, task_id]):
+            return JsonResponse({"error": "workspace_id, project_id, and task_id are required"}, status=400)
+
+        try:
+            time_entry = await self.service.start_task_timer(workspace_id, project_id, task_id, description)
+            return JsonResponse({
+                "message": "Timer started successfully",
+                "time_entry": time_entry
+            }, status=201)
+        except Exception as e:
+            return self.error_response("Error starting task timer", e)
+
+
+class AsyncStopTaskTimerView(AsyncClockifyView):
+    async def put(self, request):
+        data = self.get_data()
+        workspace_id = data.get("workspace_id")
+        time_entry_id = data.get("time_entry_id")
+
+        if not workspace_id or not time_entry_id:
+            return JsonResponse({"error": "workspace_id and time_entry_id are required"}, status=400)
+
+        try:
+            response = await self.service.stop_task_timer(workspace_id, time_entry_id)
+            return JsonResponse({
+                "message": "Timer stopped successfully",
+                "time_entry": response
+            }, status=200)
+        except Exception as e:
+            return self.error_response("Error stopping task timer", e)
+
+
+class AsyncGetProjectTasksView(AsyncClockifyView):
+    async def get(self, request, workspace_id, project_id):
+        try:
+            # Same query and cursor parameters as GetProjectTasksView
+            query = ListQuery.from_params(request.GET)
+            filters = query.task_params()
+            page, page_size = pagination.read_cursor(request.GET, filters)
+            result = await self.service.get_project_task_page(workspace_id, project_id, page, page_size, filters)
+
+            query = query.without_task_params()
+            if query.is_identity():
+                response = HttpResponse(result["tasks"], status=200, content_type="application/json")
+            else:
+                tasks = list(query.apply(fast_json.decoded(result["tasks"])))
+                response = JsonResponse(tasks, status=200, safe=False)
+
+            if result["count"] >= page_size:
+                pagination.add_next_link(response, request, page + 1, page_size, filters)
+                if pagination.prefetch_enabled():
+                    self.service.prefetch_project_task_page(workspace_id, project_id, page + 1, page_size, filters)
+            return response
+        except Exception as e:
+            return self.error_response("Error fetching tasks", e)
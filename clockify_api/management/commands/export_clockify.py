@@ -0,0 +1,61 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from clockify_api.services.clockify_service import ClockifyService
+from clockify_api.services.export import export_root, export_workspace, load_checkpoint, parse_formats
+
+
+def _parse_date(value):
+    moment = datetime.fromisoformat(value)
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+
+class Command(BaseCommand):
+    help = "Export every time entry of a workspace to gzip NDJSON and/or Parquet/Arrow files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("workspace", help="Workspace ID to export")
+        parser.add_argument(
+            "--output",
+            help="Export directory, defaults to a new one under CLOCKIFY_EXPORT['directory']. "
+                 "Pass the directory of an interrupted export to resume it"
+        )
+        parser.add_argument("--start", type=_parse_date, help="ISO date/time, defaults to CLOCKIFY_EXPORT['default_days'] ago")
+        parser.add_argument("--end", type=_parse_date, help="ISO date/time, defaults to now")
+        parser.add_argument(
+            "--format", default="ndjson",
+            help="Comma separated: ndjson, parquet, arrow (the last two need pyarrow)"
+        )
+        parser.add_argument("--page-size", type=int, help="Report rows per request, defaults to CLOCKIFY_EXPORT['page_size']")
+
+    def handle(self, *args, **options):
+        try:
+            formats = parse_formats(options["format"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        directory = options["output"] or export_root() / f"{options['workspace']}-{timezone.now():%Y%m%d%H%M%S}"
+        checkpoint = load_checkpoint(directory)
+        if checkpoint and not checkpoint.get("completed"):
+            self.stdout.write(f"Resuming {directory} after {checkpoint['rows']} rows")
+
+        last_report = time.monotonic()
+
+        def report(done, total):
+            nonlocal last_report
+            if time.monotonic() - last_report >= 5:
+                last_report = time.monotonic()
+                self.stdout.write(f"{done} / {total if total is not None else '?'} rows")
+
+        try:
+            manifest = export_workspace(
+                ClockifyService(), options["workspace"], directory,
+                start_date=options["start"], end_date=options["end"],
+                formats=formats, page_size=options["page_size"], on_progress=report,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        files = ", ".join(f"{file['name']} ({file['bytes']} bytes)" for file in manifest["files"])
+        self.stdout.write(self.style.SUCCESS(f"Exported {manifest['rows']} rows to {directory}: {files}"))
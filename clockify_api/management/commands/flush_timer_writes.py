@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from clockify_api.services.write_behind import flush_all
+
+
+class Command(BaseCommand):
+    help = "Send buffered (write-behind) timer starts and stops to Clockify"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.CLOCKIFY_TIMER_WRITE_BEHIND['max_concurrency'],
+            help="Writes in flight at once, defaults to CLOCKIFY_TIMER_WRITE_BEHIND['max_concurrency']"
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Seconds to wait before checking for due writes again"
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit once nothing is due instead of polling forever"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            counts = flush_all(max_concurrency=options["concurrency"])
+            if counts["claimed"]:
+                self.stdout.write(
+                    f"Flushed {counts['claimed']} timer write(s): {counts['synced']} synced, "
+                    f"{counts['pending']} pending, {counts['retrying']} retrying, {counts['failed']} failed"
+                )
+            if options["once"]:
+                return
+            try:
+                time.sleep(options["poll_interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from clockify_api.services.jobs import WorkerPool
+
+
+class Command(BaseCommand):
+    help = "Run a pool of worker threads that process queued Clockify jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=settings.CLOCKIFY_JOB_WORKERS,
+            help="Worker threads in this process, defaults to CLOCKIFY_JOB_WORKERS"
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Seconds an idle worker waits before checking the queue again"
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit once the queue is empty instead of polling forever"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Starting {options['workers']} Clockify job worker(s)")
+        WorkerPool(size=options["workers"], poll_interval=options["poll_interval"]).run(once=options["once"])
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from clockify_api.services.sync import SyncEngine
+
+
+class Command(BaseCommand):
+    help = "Incrementally mirror Clockify workspaces, projects, tasks and time entries into the local DB"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "workspaces", nargs="*",
+            help="Workspace IDs to sync, defaults to CLOCKIFY_SYNC_WORKSPACES"
+        )
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Ignore the stored watermark and re-read CLOCKIFY_SYNC_INITIAL_DAYS of entries"
+        )
+        parser.add_argument(
+            "--skip-metadata", action="store_true",
+            help="Only sync time entries, leave projects and tasks as they are"
+        )
+
+    def handle(self, *args, **options):
+        workspaces = options["workspaces"] or settings.CLOCKIFY_SYNC_WORKSPACES
+        if not workspaces:
+            raise CommandError("Pass workspace IDs or set CLOCKIFY_SYNC_WORKSPACES")
+
+        engine = SyncEngine()
+        for workspace_id in workspaces:
+            counts = engine.sync_workspace(
+                workspace_id, full=options["full"], include_metadata=not options["skip_metadata"]
+            )
+            summary = ", ".join(f"{name}={count}" for name, count in counts.items())
+            self.stdout.write(self.style.SUCCESS(f"Synced workspace {workspace_id}: {summary}"))
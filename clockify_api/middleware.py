@@ -0,0 +1,45 @@
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+from .services.metrics import start_view_timer, stop_view_timer, view_latency, view_local, view_response_bytes, \
+    view_upstream
+
+
+def _record(request, response, started, timer):
+    elapsed = time.perf_counter() - started
+    match = getattr(request, 'resolver_match', None)
+    view = (match.url_name or match.view_name) if match else 'unresolved'
+    view_latency.observe(elapsed, view, request.method, str(response.status_code))
+    upstream = min(timer.seconds, elapsed)
+    view_upstream.observe(upstream, view)
+    view_local.observe(elapsed - upstream, view)
+    if not getattr(response, 'streaming', False):
+        view_response_bytes.observe(len(response.content), view)
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """Time every view and split it into upstream wait and local work for /metrics"""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = time.perf_counter()
+            timer, token = start_view_timer()
+            try:
+                response = await get_response(request)
+            finally:
+                stop_view_timer(token)
+            _record(request, response, started, timer)
+            return response
+    else:
+        def middleware(request):
+            started = time.perf_counter()
+            timer, token = start_view_timer()
+            try:
+                response = get_response(request)
+            finally:
+                stop_view_timer(token)
+            _record(request, response, started, timer)
+            return response
+    return middleware
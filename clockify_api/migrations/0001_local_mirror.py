@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Workspace',
+            fields=[
+                ('clockify_id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncState',
+            fields=[
+                ('workspace', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sync_state', serialize=False, to='clockify_api.workspace')),
+                ('time_entries_watermark', models.DateTimeField(blank=True, null=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('clockify_id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('billable', models.BooleanField(default=False)),
+                ('archived', models.BooleanField(default=False)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('workspace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='projects', to='clockify_api.workspace')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('clockify_id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(blank=True, max_length=32)),
+                ('assignee_ids', models.JSONField(blank=True, default=list)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='clockify_api.project')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TimeEntry',
+            fields=[
+                ('clockify_id', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('user_id', models.CharField(max_length=64)),
+                ('description', models.TextField(blank=True)),
+                ('billable', models.BooleanField(default=False)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField(blank=True, null=True)),
+                ('duration', models.PositiveIntegerField(blank=True, null=True)),
+                ('tag_ids', models.JSONField(blank=True, default=list)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='time_entries', to='clockify_api.project')),
+                ('task', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='time_entries', to='clockify_api.task')),
+                ('workspace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_entries', to='clockify_api.workspace')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['workspace', 'user_id', 'start'], name='clockify_ap_workspa_85849e_idx'), models.Index(fields=['workspace', 'project', 'start'], name='clockify_ap_workspa_dfd683_idx'), models.Index(fields=['workspace', 'user_id', 'end'], name='clockify_ap_workspa_18c77c_idx')],
+            },
+        ),
+    ]
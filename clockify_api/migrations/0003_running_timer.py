@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clockify_api', '0002_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunningTimer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('workspace_id', models.CharField(max_length=64)),
+                ('user_id', models.CharField(max_length=64)),
+                ('time_entry_id', models.CharField(blank=True, max_length=64)),
+                ('time_entry', models.JSONField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('workspace_id', 'user_id'), name='unique_running_timer_per_user')],
+            },
+        ),
+    ]
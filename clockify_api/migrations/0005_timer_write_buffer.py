@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:58
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clockify_api', '0004_clockify_credential'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimerWrite',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('workspace_id', models.CharField(max_length=64)),
+                ('clockify_user_id', models.CharField(blank=True, max_length=64)),
+                ('project_id', models.CharField(blank=True, max_length=64)),
+                ('task_id', models.CharField(blank=True, max_length=64)),
+                ('description', models.TextField(blank=True)),
+                ('start', models.DateTimeField(blank=True, null=True)),
+                ('end', models.DateTimeField(blank=True, null=True)),
+                ('time_entry_id', models.CharField(blank=True, max_length=64)),
+                ('end_synced', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('synced', 'Synced'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, max_length=128)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='clockify_timer_writes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='clockify_ap_status_4cd961_idx'), models.Index(fields=['workspace_id', 'time_entry_id'], name='clockify_ap_workspa_5a2116_idx'), models.Index(fields=['workspace_id', 'clockify_user_id', 'end'], name='clockify_ap_workspa_de8db0_idx')],
+            },
+        ),
+    ]
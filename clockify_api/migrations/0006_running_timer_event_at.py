@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clockify_api', '0005_timer_write_buffer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='runningtimer',
+            name='event_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
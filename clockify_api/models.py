@@ -1,3 +1,210 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+# Local mirror of Clockify data, kept fresh by services/sync.py.
+# Primary keys are the Clockify IDs, so foreign key columns hold Clockify IDs too.
+
+
+class Workspace(models.Model):
+    clockify_id = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name or self.clockify_id
+
+
+class Project(models.Model):
+    clockify_id = models.CharField(max_length=64, primary_key=True)
+    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='projects')
+    name = models.CharField(max_length=255, blank=True)
+    billable = models.BooleanField(default=False)
+    archived = models.BooleanField(default=False)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name or self.clockify_id
+
+
+class Task(models.Model):
+    clockify_id = models.CharField(max_length=64, primary_key=True)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='tasks')
+    name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=32, blank=True)
+    assignee_ids = models.JSONField(default=list, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name or self.clockify_id
+
+
+class TimeEntry(models.Model):
+    clockify_id = models.CharField(max_length=64, primary_key=True)
+    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='time_entries')
+    # Entries can reference projects/tasks that have not been mirrored yet, so no DB constraint
+    project = models.ForeignKey(Project, on_delete=models.DO_NOTHING, db_constraint=False,
+                                null=True, blank=True, related_name='time_entries')
+    task = models.ForeignKey(Task, on_delete=models.DO_NOTHING, db_constraint=False,
+                             null=True, blank=True, related_name='time_entries')
+    user_id = models.CharField(max_length=64)
+    description = models.TextField(blank=True)
+    billable = models.BooleanField(default=False)
+    start = models.DateTimeField()
+    end = models.DateTimeField(null=True, blank=True)  # None while the timer is running
+    duration = models.PositiveIntegerField(null=True, blank=True)  # Seconds
+    tag_ids = models.JSONField(default=list, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['workspace', 'user_id', 'start']),
+            models.Index(fields=['workspace', 'project', 'start']),
+            models.Index(fields=['workspace', 'user_id', 'end']),
+        ]
+
+    def __str__(self):
+        return self.clockify_id
+
+    def to_clockify(self) -> dict:
+        """Render the row in the shape of a detailed-report entry"""
+        return {
+            "_id": self.clockify_id,
+            "description": self.description,
+            "userId": self.user_id,
+            "billable": self.billable,
+            "projectId": self.project_id,
+            "taskId": self.task_id,
+            "tagIds": self.tag_ids,
+            "timeInterval": {
+                "start": self.start.isoformat() if self.start else None,
+                "end": self.end.isoformat() if self.end else None,
+                "duration": self.duration,
+            },
+        }
+
+
+class SyncState(models.Model):
+    workspace = models.OneToOneField(Workspace, on_delete=models.CASCADE, primary_key=True,
+                                     related_name='sync_state')
+    time_entries_watermark = models.DateTimeField(null=True, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.workspace_id} @ {self.time_entries_watermark}"
+
+
+class Job(models.Model):
+    """Long-running Clockify work handed off to `manage.py run_clockify_workers`"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    payload = models.JSONField(default=dict)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+                                   null=True, blank=True, related_name='clockify_jobs')
+    locked_by = models.CharField(max_length=128, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)  # Heartbeat, expired locks are re-queued
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.id} ({self.status})"
+
+
+class RunningTimer(models.Model):
+    """Current timer per Clockify user, kept up to date by webhooks. A row with no entry means idle."""
+    workspace_id = models.CharField(max_length=64)
+    user_id = models.CharField(max_length=64)
+    time_entry_id = models.CharField(max_length=64, blank=True)
+    time_entry = models.JSONField(null=True, blank=True)
+    event_at = models.DateTimeField(null=True, blank=True)  # Start/stop time of the last change applied
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['workspace_id', 'user_id'], name='unique_running_timer_per_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.time_entry_id or 'idle'}"
+
+
+class ClockifyCredential(models.Model):
+    """Clockify API key a Django user calls Clockify with. Users of one tenant may share a key, and its quota."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                related_name='clockify_credential')
+    api_key = models.CharField(max_length=128)
+    clockify_user_id = models.CharField(max_length=64, blank=True)  # Owner of the key, looked up on first use
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user}: {self.clockify_user_id or 'unresolved'}"
+
+
+class TimerWrite(models.Model):
+    """
+    Timer start and/or stop already acknowledged to the client and still owed to Clockify
+    (write-behind, see services/write_behind.py). Times are the ones captured on the request.
+    """
+    PENDING = 'pending'
+    SYNCED = 'synced'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SYNCED, 'Synced'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)  # Handed out as the local entry ID
+    workspace_id = models.CharField(max_length=64)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+                             null=True, blank=True, related_name='clockify_timer_writes')
+    clockify_user_id = models.CharField(max_length=64, blank=True)
+    project_id = models.CharField(max_length=64, blank=True)
+    task_id = models.CharField(max_length=64, blank=True)
+    description = models.TextField(blank=True)
+    start = models.DateTimeField(null=True, blank=True)  # None when only the stop of an upstream entry is owed
+    end = models.DateTimeField(null=True, blank=True)
+    time_entry_id = models.CharField(max_length=64, blank=True)  # Clockify ID, once the entry exists upstream
+    end_synced = models.BooleanField(default=False)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=128, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)  # A flusher that died releases its claim here
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['workspace_id', 'time_entry_id']),
+            models.Index(fields=['workspace_id', 'clockify_user_id', 'end']),
+        ]
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.time_entry_id or self.id} ({self.status})"
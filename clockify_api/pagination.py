@@ -0,0 +1,61 @@
+from typing import Dict, Tuple
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core import signing
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Opaque cursors for list endpoints Clockify pages by page number. A cursor carries the page,
+# the page size and the upstream filters it was issued for, signed so clients cannot edit it.
+
+_SALT = "clockify_api.pagination"
+
+
+def _pagination_setting(name: str, default):
+    return getattr(settings, 'CLOCKIFY_TASK_PAGINATION', {}).get(name, default)
+
+
+def prefetch_enabled() -> bool:
+    return bool(_pagination_setting('prefetch', False))
+
+
+def page_size_from(params) -> int:
+    if not params.get('page_size'):
+        return int(_pagination_setting('default_page_size', 50))
+    maximum = int(_pagination_setting('max_page_size', 500))
+    try:
+        page_size = int(params['page_size'])
+    except ValueError:
+        page_size = 0
+    if not 1 <= page_size <= maximum:
+        raise ValueError(f"page_size must be a number between 1 and {maximum}")
+    return page_size
+
+
+def _filters_key(filters: Dict) -> str:
+    return urlencode(sorted(filters.items()))
+
+
+def encode_cursor(page: int, page_size: int, filters: Dict) -> str:
+    return signing.dumps({"p": page, "s": page_size, "f": _filters_key(filters)}, salt=_SALT, compress=True)
+
+
+def read_cursor(params, filters: Dict) -> Tuple[int, int]:
+    """(page, page_size) of the request: from its cursor, or the first page"""
+    if not params.get('cursor'):
+        return 1, page_size_from(params)
+    try:
+        cursor = signing.loads(params['cursor'], salt=_SALT)
+    except signing.BadSignature:
+        raise ValueError("Invalid cursor")
+    if cursor["f"] != _filters_key(filters):
+        raise ValueError("The cursor belongs to a request with other filters")
+    return cursor["p"], cursor["s"]
+
+
+def add_next_link(response, request, page: int, page_size: int, filters: Dict) -> None:
+    """Point the client at the next page with a Link header, leaving the body a plain list"""
+    cursor = encode_cursor(page, page_size, filters)
+    url = replace_query_param(remove_query_param(request.build_absolute_uri(), 'page_size'), 'cursor', cursor)
+    response['Link'] = f'<{url}>; rel="next"'
+    response['X-Next-Cursor'] = cursor
@@ -0,0 +1,236 @@
+# aggregation.py
+import time
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # Falls back to a pure Python accumulator
+    np = None
+
+GROUP_BY_FIELDS = ("user", "project", "task", "tag", "day")
+
+
+def _timestamp(value) -> float:
+    if value is None:
+        return float("nan")
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+class TimeEntryColumns:
+    """
+    Time entries stored column by column, so totals can be computed over whole arrays at once.
+    String columns are dictionary-encoded: each holds integer codes into `labels[field]`.
+    """
+    ENCODED_FIELDS = ("user", "project", "task", "tag")
+
+    def __init__(self):
+        self.start = array("d")
+        self.end = array("d")  # NaN while the timer is running
+        self.billable = array("b")
+        self.user = array("q")
+        self.project = array("q")
+        self.task = array("q")
+        self.tags: List[List[int]] = []
+        self.labels: Dict[str, List[str]] = {field: [] for field in self.ENCODED_FIELDS}
+        self._codes: Dict[str, Dict[str, int]] = {field: {} for field in self.ENCODED_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def _encode(self, field: str, value: Optional[str]) -> int:
+        value = value or ""
+        codes = self._codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self.labels[field].append(value)
+        return code
+
+    def append(self, start, end, billable, user_id, project_id, task_id, tag_ids) -> None:
+        self.start.append(_timestamp(start))
+        self.end.append(_timestamp(end))
+        self.billable.append(1 if billable else 0)
+        self.user.append(self._encode("user", user_id))
+        self.project.append(self._encode("project", project_id))
+        self.task.append(self._encode("task", task_id))
+        self.tags.append([self._encode("tag", tag) for tag in tag_ids or []])
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict]) -> "TimeEntryColumns":
+        """Build from Clockify detailed-report entries"""
+        columns = cls()
+        for entry in entries:
+            interval = entry.get("timeInterval") or {}
+            if not interval.get("start"):
+                continue
+            tags = entry.get("tagIds") or [
+                tag.get("id") or tag.get("_id") if isinstance(tag, dict) else tag
+                for tag in entry.get("tags") or []
+            ]
+            columns.append(
+                interval["start"], interval.get("end"), entry.get("billable"),
+                entry.get("userId"), entry.get("projectId"), entry.get("taskId"), tags,
+            )
+        return columns
+
+    @classmethod
+    def from_queryset(cls, queryset) -> "TimeEntryColumns":
+        """Build straight from the local TimeEntry mirror without instantiating models"""
+        columns = cls()
+        rows = queryset.values_list("start", "end", "billable", "user_id", "project_id", "task_id", "tag_ids")
+        for row in rows.iterator(chunk_size=5000):
+            columns.append(*row)
+        return columns
+
+
+def _day_label(day_index: int) -> str:
+    return (date(1970, 1, 1) + timedelta(days=int(day_index))).isoformat()
+
+
+def _empty_result(group_by: Sequence[str]) -> Dict:
+    return {
+        "groupBy": list(group_by),
+        "totals": {"duration": 0, "billableDuration": 0, "entries": 0},
+        "groups": [],
+    }
+
+
+def aggregate(columns: TimeEntryColumns, group_by: Sequence[str] = (),
+              tz_offset_minutes: int = 0, now: Optional[float] = None) -> Dict:
+    """
+    Sum durations (seconds), the billable share and entry counts per group.
+    `day` buckets entries by the local date of their start; running timers count up to `now`.
+    Grouping by `tag` counts an entry once per tag (untagged entries go under "").
+    """
+    unknown = set(group_by) - set(GROUP_BY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported group_by field(s): {', '.join(sorted(unknown))}")
+    if not len(columns):
+        return _empty_result(group_by)
+
+    now = time.time() if now is None else now
+    offset = tz_offset_minutes * 60
+    if np is not None:
+        return _aggregate_numpy(columns, list(group_by), offset, now)
+    return _aggregate_python(columns, list(group_by), offset, now)
+
+
+def _label(columns: TimeEntryColumns, field: str, code: int) -> str:
+    return _day_label(code) if field == "day" else columns.labels[field][code]
+
+
+def _sorted_groups(groups: List[Dict], group_by: List[str]) -> List[Dict]:
+    return sorted(groups, key=lambda group: tuple(group[field] for field in group_by))
+
+
+def _aggregate_numpy(columns: TimeEntryColumns, group_by: List[str], offset: int, now: float) -> Dict:
+    start = np.frombuffer(columns.start, dtype=np.float64)
+    end = np.frombuffer(columns.end, dtype=np.float64)
+    duration = np.where(np.isnan(end), now, end) - start
+    billable = np.frombuffer(columns.billable, dtype=np.int8).astype(bool)
+    rows = np.arange(len(start))
+
+    if "tag" in group_by:
+        # One row per (entry, tag) pair, untagged entries keep a single row under ""
+        untagged = columns._encode("tag", "")
+        tag_counts = np.fromiter((max(1, len(tags)) for tags in columns.tags), dtype=np.int64, count=len(rows))
+        rows = np.repeat(rows, tag_counts)
+        tag_codes = np.fromiter(
+            (tag for tags in columns.tags for tag in (tags or [untagged])), dtype=np.int64, count=len(rows)
+        )
+
+    codes = np.zeros(len(rows), dtype=np.int64)
+    dimensions = []
+    for field in group_by:
+        if field == "day":
+            values = np.floor((start[rows] + offset) / 86400).astype(np.int64)
+        elif field == "tag":
+            values = tag_codes
+        else:
+            values = np.frombuffer(getattr(columns, field), dtype=np.int64)[rows]
+        uniques, inverse = np.unique(values, return_inverse=True)
+        codes = codes * len(uniques) + inverse
+        dimensions.append((field, uniques))
+
+    group_codes, group_index = np.unique(codes, return_inverse=True)
+    weights = duration[rows]
+    totals_duration = np.bincount(group_index, weights=weights)
+    totals_billable = np.bincount(group_index, weights=np.where(billable[rows], weights, 0.0))
+    totals_entries = np.bincount(group_index)
+
+    groups = []
+    for position, code in enumerate(group_codes.tolist()):
+        group = {}
+        for field, uniques in reversed(dimensions):
+            code, unique_index = divmod(code, len(uniques))
+            group[field] = _label(columns, field, int(uniques[unique_index]))
+        group = {field: group[field] for field in group_by}
+        group.update(
+            duration=int(round(totals_duration[position])),
+            billableDuration=int(round(totals_billable[position])),
+            entries=int(totals_entries[position]),
+        )
+        groups.append(group)
+
+    return {
+        "groupBy": group_by,
+        "totals": {
+            "duration": int(round(duration.sum())),
+            "billableDuration": int(round(duration[billable].sum())),
+            "entries": len(start),
+        },
+        "groups": _sorted_groups(groups, group_by),
+    }
+
+
+def _aggregate_python(columns: TimeEntryColumns, group_by: List[str], offset: int, now: float) -> Dict:
+    buckets: Dict[tuple, List[float]] = {}
+    total = billable_total = 0.0
+    untagged = columns._encode("tag", "") if "tag" in group_by else None
+    for index in range(len(columns)):
+        start = columns.start[index]
+        end = columns.end[index]
+        duration = (now if end != end else end) - start  # end != end is the NaN check
+        billable = columns.billable[index]
+        total += duration
+        billable_total += duration if billable else 0.0
+
+        for tag in (columns.tags[index] or [untagged]) if untagged is not None else [None]:
+            key = tuple(
+                int((start + offset) // 86400) if field == "day"
+                else tag if field == "tag"
+                else getattr(columns, field)[index]
+                for field in group_by
+            )
+            bucket = buckets.setdefault(key, [0.0, 0.0, 0])
+            bucket[0] += duration
+            bucket[1] += duration if billable else 0.0
+            bucket[2] += 1
+
+    groups = []
+    for key, (duration, billable_duration, entries) in buckets.items():
+        group = {field: _label(columns, field, code) for field, code in zip(group_by, key)}
+        group.update(
+            duration=int(round(duration)),
+            billableDuration=int(round(billable_duration)),
+            entries=entries,
+        )
+        groups.append(group)
+
+    return {
+        "groupBy": group_by,
+        "totals": {
+            "duration": int(round(total)),
+            "billableDuration": int(round(billable_total)),
+            "entries": len(columns),
+        },
+        "groups": _sorted_groups(groups, group_by),
+    }
+
+
+def parse_group_by(value: Optional[str]) -> List[str]:
+    return [field.strip() for field in (value or "").split(",") if field.strip()]
@@ -0,0 +1,424 @@
+# async_clockify_service.py
+from django.conf import settings
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Dict, Optional
+import asyncio
+import logging
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import httpx
+from asgiref.sync import sync_to_async
+
+from . import fast_json
+from .cache import metadata_cache
+from .conditional import revalidation_headers, validators_from
+from .http_client import get_async_client
+from .metrics import endpoint_template, observe_upstream, upstream_retries
+from .rate_limit import RETRYABLE_STATUSES, limiter_key, rate_limiter, retry_delay, should_retry
+from .singleflight import flight_key, single_flight
+from .timer_events import timer_changed
+
+logger = logging.getLogger(__name__)
+
+# Background prefetches, referenced until they finish so they are not collected mid-flight
+_prefetches = set()
+
+
+class AsyncClockifyService:
+    """asyncio-native counterpart of ClockifyService with the same method surface"""
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or settings.CLOCKIFY_API_KEY
+        self.base_url = settings.CLOCKIFY_BASE_URL
+        self.headers = {
+            "X-Api-Key": self.api_key,
+            "Content-Type": "application/json"
+        }
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request to Clockify over the loop's shared keep-alive client, within the
+        per key/workspace rate limit, retrying throttled and transient failures
+        """
+        kwargs.setdefault("headers", self.headers)
+        client = get_async_client()
+        limit_key = limiter_key(self.api_key, url)
+        endpoint = endpoint_template(urlsplit(url).path)
+        attempt = 0
+        while True:
+            await rate_limiter.acquire_async(limit_key)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                observe_upstream(method, endpoint, started, "error")
+                retry_method = "GET" if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)) else method
+                if not should_retry(retry_method, None, attempt):
+                    raise
+                delay = retry_delay(attempt)
+                reason = type(e).__name__
+            else:
+                observe_upstream(method, endpoint, started, str(response.status_code),
+                                 len(response.request.content), len(response.content))
+                if not should_retry(method, response.status_code, attempt) \
+                        or response.status_code not in RETRYABLE_STATUSES:
+                    return response
+                delay = retry_delay(attempt, response.headers.get("Retry-After"))
+                reason = response.status_code
+                await response.aclose()
+            attempt += 1
+            upstream_retries.inc(method, endpoint, str(reason))
+            logger.warning(f"Retrying {method} {url} in {delay:.2f}s after {reason} (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    async def _json(self, method: str, url: str, raw: bool = False, **kwargs):
+        """Decoded body, or with `raw` the undecoded RawJSON body"""
+        if method != "GET":
+            response = await self._request(method, url, **kwargs)
+            response.raise_for_status()
+            return fast_json.loads(response.content)
+
+        key = flight_key(self.api_key, method, url, kwargs.get("params"))
+        if raw:
+            key += ":raw"
+
+        async def fetch():
+            # Revalidate with the stored ETag / Last-Modified, as ClockifyService._get_json does
+            validators_key = metadata_cache.make_key("validators", self.api_key, key)
+            stored = metadata_cache.get("validators", validators_key)
+            headers = revalidation_headers(kwargs.get("headers", self.headers), stored)
+            response = await self._request(method, url, **{**kwargs, "headers": headers})
+            if response.status_code == 304 and stored:
+                return stored["body"]
+            response.raise_for_status()
+            body = fast_json.RawJSON(response.content) if raw else fast_json.loads(response.content)
+            validators = validators_from(response.headers, body)
+            if validators:
+                metadata_cache.set("validators", validators_key, validators)
+            return body
+        return await single_flight.do_async(key, fetch)
+
+    def _cache_key(self, resource: str, *parts: str) -> str:
+        return metadata_cache.make_key(resource, self.api_key, *parts)
+
+    @staticmethod
+    def _timestamp() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def _invalidate_task(self, workspace_id: str, project_id: str, task: Optional[Dict] = None,
+                         task_id: Optional[str] = None) -> None:
+        """Same as ClockifyService._invalidate_task, the metadata cache is shared by both services"""
+        metadata_cache.invalidate(self._cache_key("tasks", workspace_id, project_id),
+                                  self._cache_key("tasks-version", workspace_id, project_id))
+        task_key = self._cache_key("task", workspace_id, project_id, task_id or (task or {}).get("id"))
+        if isinstance(task, dict) and task.get("id"):
+            metadata_cache.set("task", task_key, task)
+        else:
+            metadata_cache.invalidate(task_key)
+
+    async def get_workspace_by_id(self, workspace_id: str) -> Dict:
+        url = f"{self.base_url}/workspaces/{workspace_id}"
+        return await metadata_cache.aget_or_fetch(
+            "workspace", self._cache_key("workspace", workspace_id), lambda: self._json("GET", url)
+        )
+
+    async def get_project_by_id(self, workspace_id: str, project_id: str) -> Dict:
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}"
+        return await metadata_cache.aget_or_fetch(
+            "project", self._cache_key("project", workspace_id, project_id), lambda: self._json("GET", url)
+        )
+
+    async def get_task_by_id(self, workspace_id: str, project_id: str, task_id: str) -> Dict:
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks/{task_id}"
+        return await metadata_cache.aget_or_fetch(
+            "task", self._cache_key("task", workspace_id, project_id, task_id), lambda: self._json("GET", url)
+        )
+
+    async def find_invalid_ids(self, workspace_id: str, project_id: Optional[str] = None,
+                               task_id: Optional[str] = None) -> List[str]:
+        """ClockifyService.find_invalid_ids, the uncached lookups awaited side by side"""
+        if task_id and not project_id:
+            return ["task_id"]
+
+        checks = [("workspace_id", "workspace", (workspace_id,), self.get_workspace_by_id)]
+        if project_id:
+            checks.append(("project_id", "project", (workspace_id, project_id), self.get_project_by_id))
+        if task_id:
+            checks.append(("task_id", "task", (workspace_id, project_id, task_id), self.get_task_by_id))
+
+        invalid = []
+        pending = []
+        for name, resource, ids, fetch in checks:
+            if metadata_cache.peek(self._cache_key("missing", resource, *ids)):
+                invalid.append(name)
+            else:
+                pending.append((name, resource, ids, fetch))
+
+        outcomes = await asyncio.gather(*(self._id_exists(*check[1:]) for check in pending))
+        invalid.extend(name for (name, *_), exists in zip(pending, outcomes) if not exists)
+        return [name for name, *_ in checks if name in invalid]
+
+    async def _id_exists(self, resource: str, ids: tuple, fetch) -> bool:
+        try:
+            await fetch(*ids)
+            return True
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in (400, 403, 404):
+                raise  # Throttled or failing, which says nothing about the ID
+            metadata_cache.set("missing", self._cache_key("missing", resource, *ids), True)
+            return False
+
+    async def get_user_time_report(self, workspace_id: str, user_id: str,
+                                   start_date: datetime, end_date: datetime) -> Dict:
+        """Get time tracking report for a specific user, every page of it in one document"""
+        report, entries = None, []
+        async for page in self.iter_user_time_report_pages(workspace_id, user_id, start_date, end_date):
+            report = report or page
+            entries.extend(page.get("timeentries") or [])
+        return {**report, "timeentries": entries}
+
+    async def iter_user_time_report_pages(self, workspace_id: str, user_id: str,
+                                          start_date: datetime, end_date: datetime,
+                                          page_size: Optional[int] = None) -> AsyncIterator[Dict]:
+        """Yield every page of the detailed report, requesting the next page ahead of the consumer"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/reports/detailed"
+        page_size = page_size or settings.CLOCKIFY_REPORT_PAGE_SIZE
+
+        async def fetch_page(page: int) -> Dict:
+            payload = {
+                "dateRangeStart": start_date.isoformat(),
+                "dateRangeEnd": end_date.isoformat(),
+                "users": {"ids": [user_id]},
+                "detailedFilter": {
+                    "page": page,
+                    "pageSize": page_size
+                }
+            }
+            return await self._json("POST", url, json=payload)
+
+        page = 1
+        current = await fetch_page(page)
+        while True:
+            has_more = len(current.get("timeentries") or []) >= page_size
+            upcoming = asyncio.ensure_future(fetch_page(page + 1)) if has_more else None
+            try:
+                yield current
+            except GeneratorExit:
+                if upcoming is not None:
+                    upcoming.cancel()
+                raise
+            if upcoming is None:
+                return
+            page += 1
+            current = await upcoming
+
+    async def get_project_time_report(self, workspace_id: str, project_id: str) -> Dict:
+        """Get time tracking report for a specific project"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/reports/summary"
+        return await self._json("GET", url)
+
+    async def assign_task(self, workspace_id: str, project_id: str,
+                          task_id: str, user_ids: List[str]) -> Dict:
+        """Assign a task to specific users"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks/{task_id}"
+        task = await self._json("PUT", url, json={"assigneeIds": user_ids})
+        self._invalidate_task(workspace_id, project_id, task, task_id)
+        return task
+
+    async def get_timer_status(self, workspace_id: str, user_id: str) -> Dict:
+        """Get the current timer status for a user"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/user/{user_id}/time-entries"
+        return await self._json("GET", url, params={"in-progress": "true"})
+
+    async def bulk_create_tasks(self, workspace_id: str, project_id: str,
+                                tasks: List[Dict]) -> List[Dict]:
+        """Bulk create tasks in a project, at most CLOCKIFY_BULK_MAX_WORKERS in flight"""
+        semaphore = asyncio.Semaphore(settings.CLOCKIFY_BULK_MAX_WORKERS)
+
+        async def create(task):
+            async with semaphore:
+                return await self.create_task(workspace_id, project_id, task['name'], task.get('assignee_ids', []))
+
+        results = await asyncio.gather(*(create(task) for task in tasks), return_exceptions=True)
+
+        created_tasks = []
+        for task, result in zip(tasks, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error creating task {task['name']}: {str(result)}")
+            else:
+                created_tasks.append(result)
+        return created_tasks
+
+    async def add_tags_to_task(self, workspace_id: str, project_id: str,
+                               task_id: str, tags: List[str]) -> Dict:
+        """Add tags to a task"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks/{task_id}"
+        task = await self._json("PUT", url, json={"tags": tags})
+        self._invalidate_task(workspace_id, project_id, task, task_id)
+        return task
+
+    async def get_workspaces(self, raw: bool = False):
+        url = f"{self.base_url}/workspaces"
+        # Same entry as ClockifyService.get_workspaces, the upstream bytes
+        body = await metadata_cache.aget_or_fetch(
+            "workspaces", self._cache_key("workspaces"), lambda: self._json("GET", url, raw=True)
+        )
+        return fast_json.encoded(body) if raw else fast_json.decoded(body)
+
+    async def get_current_user(self) -> Dict:
+        """The Clockify user that owns this service's API key"""
+        return await self._json("GET", f"{self.base_url}/user")
+
+    async def create_project(self, workspace_id, project_name):
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects"
+        project = await self._json("POST", url, json={"name": project_name})
+        if project.get("id"):
+            metadata_cache.set("project", self._cache_key("project", workspace_id, project["id"]), project)
+        return project
+
+    async def start_timer(self, workspace_id, project_id, description=""):
+        url = f"{self.base_url}/workspaces/{workspace_id}/time-entries"
+        payload = {
+            "start": self._timestamp(),
+            "billable": True,
+            "projectId": project_id,
+            "description": description
+        }
+        return await self._remember_time_entry(workspace_id, await self._json("POST", url, json=payload))
+
+    def _time_entry_key(self, workspace_id: str, time_entry_id: str) -> str:
+        return self._cache_key("time_entry", workspace_id, time_entry_id)
+
+    async def _remember_time_entry(self, workspace_id: str, entry: Dict) -> Dict:
+        """Keep the entry returned on start so stopping it needs no extra GET"""
+        if isinstance(entry, dict) and entry.get("id"):
+            metadata_cache.set("time_entry", self._time_entry_key(workspace_id, entry["id"]), entry)
+        return await self._timer_changed(workspace_id, entry)
+
+    @staticmethod
+    async def _timer_changed(workspace_id: str, entry: Dict) -> Dict:
+        """Update the timer store and notify subscribers; the store lives in the database"""
+        await sync_to_async(timer_changed)(workspace_id, entry)
+        return entry
+
+    async def _get_time_entry(self, workspace_id: str, time_entry_id: str) -> Dict:
+        """Entry captured at start time, or a GET for entries started outside this service"""
+        entry = metadata_cache.get("time_entry", self._time_entry_key(workspace_id, time_entry_id))
+        if entry is None:
+            url = f"{self.base_url}/workspaces/{workspace_id}/time-entries/{time_entry_id}"
+            entry = await self._json("GET", url)
+        return entry
+
+    async def _stop_time_entry(self, workspace_id: str, time_entry_id: str,
+                               include_task: bool = False) -> httpx.Response:
+        existing_entry = await self._get_time_entry(workspace_id, time_entry_id)
+        url = f"{self.base_url}/workspaces/{workspace_id}/time-entries/{time_entry_id}"
+        data = {
+            "start": existing_entry['timeInterval']['start'],
+            "end": self._timestamp(),
+            "billable": existing_entry['billable'],
+            "projectId": existing_entry['projectId'],
+            "description": existing_entry.get('description') or "",
+            "tagIds": existing_entry.get('tagIds') or []
+        }
+        if include_task:
+            data["taskId"] = existing_entry['taskId']
+
+        response = await self._request("PUT", url, json=data)
+        metadata_cache.invalidate(self._time_entry_key(workspace_id, time_entry_id))
+        return response
+
+    async def stop_running_timer(self, workspace_id: str, user_id: str) -> Dict:
+        """Stop whatever timer the user has running, one PATCH and no lookup"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/user/{user_id}/time-entries"
+        entry = await self._json("PATCH", url, json={"end": self._timestamp()})
+        if isinstance(entry, dict) and entry.get("id"):
+            metadata_cache.invalidate(self._time_entry_key(workspace_id, entry["id"]))
+        return await self._timer_changed(workspace_id, entry)
+
+    async def stop_timer(self, workspace_id, time_entry_id):
+        response = await self._stop_time_entry(workspace_id, time_entry_id)
+        if response.status_code != 200:
+            logger.error(f"Error stopping timer {time_entry_id}: {response.status_code} {response.text}")
+        response.raise_for_status()
+        return await self._timer_changed(workspace_id, response.json())
+
+    async def create_task(self, workspace_id, project_id, task_name, assignee_ids=None):
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks"
+        payload = {
+            "name": task_name,
+            "projectId": project_id,
+            "assigneeIds": assignee_ids or [],
+            "status": "ACTIVE"
+        }
+        task = await self._json("POST", url, json=payload)
+        self._invalidate_task(workspace_id, project_id, task)
+        return task
+
+    async def start_task_timer(self, workspace_id, project_id, task_id, description=""):
+        url = f"{self.base_url}/workspaces/{workspace_id}/time-entries"
+        payload = {
+            "start": self._timestamp(),
+            "billable": True,
+            "projectId": project_id,
+            "taskId": task_id,
+            "description": description
+        }
+
+        response = await self._request("POST", url, json=payload)
+        if response.status_code not in (200, 201):
+            logger.error(f"Error starting task timer: {response.status_code} {response.text}")
+        response.raise_for_status()
+        return await self._remember_time_entry(workspace_id, response.json())
+
+    async def stop_task_timer(self, workspace_id, time_entry_id):
+        response = await self._stop_time_entry(workspace_id, time_entry_id, include_task=True)
+        if response.status_code != 200:
+            logger.error(f"Error stopping task timer {time_entry_id}: {response.status_code} {response.text}")
+        response.raise_for_status()
+        return await self._timer_changed(workspace_id, response.json())
+
+    async def get_project_tasks(self, workspace_id, project_id, raw: bool = False):
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks"
+        body = await metadata_cache.aget_or_fetch(
+            "tasks", self._cache_key("tasks", workspace_id, project_id), lambda: self._json("GET", url, raw=True)
+        )
+        return fast_json.encoded(body) if raw else fast_json.decoded(body)
+
+    async def _tasks_version(self, workspace_id: str, project_id: str) -> str:
+        return await metadata_cache.aget_or_fetch(
+            "tasks", self._cache_key("tasks-version", workspace_id, project_id), self._new_version
+        )
+
+    @staticmethod
+    async def _new_version() -> str:
+        return uuid.uuid4().hex
+
+    async def get_project_task_page(self, workspace_id: str, project_id: str, page: int = 1,
+                                    page_size: Optional[int] = None, params: Optional[Dict] = None) -> Dict:
+        """ClockifyService.get_project_task_page, reading and filling the same page cache"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks"
+        params = {**(params or {}), "page": page, "page-size": page_size or settings.CLOCKIFY_LIST_PAGE_SIZE}
+        key = self._cache_key(
+            "tasks", workspace_id, project_id, await self._tasks_version(workspace_id, project_id),
+            *(f"{name}={value}" for name, value in sorted(params.items()))
+        )
+
+        async def fetch():
+            body = await self._json("GET", url, raw=True, params=params)
+            return {"tasks": body, "count": len(fast_json.loads(body))}
+        return await metadata_cache.aget_or_fetch("tasks", key, fetch)
+
+    def prefetch_project_task_page(self, workspace_id: str, project_id: str, page: int,
+                                   page_size: Optional[int] = None, params: Optional[Dict] = None) -> None:
+        """Fetch a page into the cache in the background, ahead of the client asking for it"""
+        async def fetch():
+            try:
+                await self.get_project_task_page(workspace_id, project_id, page, page_size, params)
+            except Exception as e:
+                logger.warning(f"Error prefetching task page {page} of project {project_id}: {str(e)}")
+        task = asyncio.ensure_future(fetch())
+        _prefetches.add(task)
+        task.add_done_callback(_prefetches.discard)
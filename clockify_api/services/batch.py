@@ -0,0 +1,127 @@
+# batch.py
+from datetime import timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import timer_store
+from .bulk import run_bulk
+from .clockify_service import ClockifyService
+from .credentials import clockify_user_id
+
+
+class Operation(NamedTuple):
+    required: Sequence[str]
+    call: Callable[[ClockifyService, Dict], object]
+    # Reads args["user_id"]'s data: the caller's own, or anyone's for staff (as TimerEventsView)
+    per_user: bool = False
+
+
+def _date_range(args: Dict):
+    end_date = parse_datetime(args["end_date"]) if args.get("end_date") else timezone.now()
+    start_date = parse_datetime(args["start_date"]) if args.get("start_date") else end_date - timedelta(days=30)
+    return start_date, end_date
+
+
+def _timer_status(service: ClockifyService, args: Dict):
+    workspace_id, user_id = args["workspace_id"], args["user_id"]
+    try:
+        return timer_store.get_or_fetch(workspace_id, user_id, lambda: service.get_timer_status(workspace_id, user_id))
+    finally:
+        connection.close()  # Runs on a short-lived batch thread, which would otherwise leak it
+
+
+# Read operations a client may combine in one POST batch/ call
+OPERATIONS: Dict[str, Operation] = {
+    "workspaces": Operation((), lambda service, args: service.get_workspaces()),
+    "workspace": Operation(
+        ("workspace_id",),
+        lambda service, args: service.get_workspace_by_id(args["workspace_id"])
+    ),
+    "project": Operation(
+        ("workspace_id", "project_id"),
+        lambda service, args: service.get_project_by_id(args["workspace_id"], args["project_id"])
+    ),
+    "project_tasks": Operation(
+        ("workspace_id", "project_id"),
+        lambda service, args: service.get_project_tasks(args["workspace_id"], args["project_id"])
+    ),
+    "task": Operation(
+        ("workspace_id", "project_id", "task_id"),
+        lambda service, args: service.get_task_by_id(args["workspace_id"], args["project_id"], args["task_id"])
+    ),
+    "project_time_report": Operation(
+        ("workspace_id", "project_id"),
+        lambda service, args: service.get_project_time_report(args["workspace_id"], args["project_id"])
+    ),
+    "user_time_report": Operation(
+        ("workspace_id", "user_id"),
+        lambda service, args: service.get_user_time_report(args["workspace_id"], args["user_id"], *_date_range(args)),
+        per_user=True
+    ),
+    "timer_status": Operation(("workspace_id", "user_id"), _timer_status, per_user=True),
+}
+
+
+def _check(operation: Dict, own_user_id: Callable[[], Optional[str]]) -> Optional[str]:
+    """Why the sub-operation cannot run, or None. `own_user_id()` is None for staff"""
+    if not isinstance(operation, dict):
+        return "Each operation must be an object"
+    spec = OPERATIONS.get(operation.get("op"))
+    if spec is None:
+        return f"Unknown op: {operation.get('op')}"
+    args = operation.get("args") or {}
+    missing = [name for name in spec.required if not args.get(name)]
+    if missing:
+        return f"Missing args: {', '.join(missing)}"
+    if spec.per_user:
+        own_id = own_user_id()
+        if own_id is not None and str(args["user_id"]) != own_id:
+            return "Not allowed to read other users' data"
+    return None
+
+
+def run_batch(service: ClockifyService, user, operations: List[Dict],
+              max_concurrency: Optional[int] = None) -> List[Dict]:
+    """
+    Run `user`'s sub-operations side by side and return one result per operation, in order:
+    {"id": ..., "op": ..., "status": "success", "result": ...} or {..., "status": "error", "error": "..."}
+    """
+    own_ids: List[Optional[str]] = []
+
+    def own_user_id() -> Optional[str]:
+        # Looked up once, and only when the batch reads per-user data
+        if not own_ids:
+            own_ids.append(None if user.is_staff else clockify_user_id(user))
+        return own_ids[0]
+
+    results: List[Optional[Dict]] = [None] * len(operations)
+    runnable = []
+    for index, operation in enumerate(operations):
+        error = _check(operation, own_user_id)
+        if error:
+            results[index] = {"status": "error", "error": error}
+        else:
+            runnable.append(index)
+
+    max_workers = min(
+        int(max_concurrency or settings.CLOCKIFY_BATCH_MAX_CONCURRENCY),
+        settings.CLOCKIFY_BATCH_MAX_CONCURRENCY
+    )
+    outcomes = run_bulk(
+        lambda index: OPERATIONS[operations[index]["op"]].call(service, operations[index].get("args") or {}),
+        runnable,
+        max_workers=max_workers,
+        max_retries=settings.CLOCKIFY_BULK_MAX_RETRIES,
+    )
+    for index, outcome in zip(runnable, outcomes):
+        outcome.pop("index")
+        results[index] = outcome
+
+    for index, (operation, result) in enumerate(zip(operations, results)):
+        label = operation if isinstance(operation, dict) else {}
+        results[index] = {"id": label.get("id", index), "op": label.get("op"), **result}
+    return results
@@ -0,0 +1,121 @@
+# bulk.py
+import contextvars
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency gate that backs off when Clockify throttles us (AIMD):
+    a 429 halves the number of in-flight calls, every `limit` successes add one back.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self) -> None:
+        with self._condition:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify()
+
+    def on_throttled(self) -> None:
+        with self._condition:
+            self.limit = max(self.min_limit, self.limit // 2)
+            self._successes = 0
+            logger.warning(f"Clockify throttled bulk operation, concurrency lowered to {self.limit}")
+
+
+# Set while run_bulk runs an item. It adapts its concurrency to 429s itself, so
+# ClockifyService._request hands them straight back instead of retrying underneath it.
+_handles_throttling = contextvars.ContextVar("run_bulk_handles_throttling", default=False)
+
+
+def handles_throttling() -> bool:
+    return _handles_throttling.get()
+
+
+def _retry_after(response: Optional[requests.Response], attempt: int) -> float:
+    """Seconds to wait before retrying a throttled call"""
+    header = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return max(0.0, float(header))
+    except (TypeError, ValueError):
+        return min(8.0, 0.25 * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+
+def run_bulk(func: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 8,
+             min_workers: int = 1, max_retries: int = 3,
+             on_progress: Optional[Callable[[int], None]] = None) -> List[Dict]:
+    """
+    Run `func` over `items` concurrently and return one result per item, in input order:
+    {"index": i, "status": "success", "result": ...} or {"index": i, "status": "error", "error": "..."}
+    `on_progress(done)` is called from the calling thread as results come in.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    limiter = AdaptiveLimiter(max_limit=max_workers, min_limit=min_workers)
+
+    def run_item(index: int, item: Any) -> Dict:
+        attempt = 0
+        while True:
+            limiter.acquire()
+            token = _handles_throttling.set(True)
+            try:
+                result = func(item)
+            except requests.exceptions.HTTPError as e:
+                response = e.response
+                if response is not None and response.status_code == 429 and attempt < max_retries:
+                    limiter.on_throttled()
+                    delay = _retry_after(response, attempt)
+                    attempt += 1
+                else:
+                    return {"index": index, "status": "error", "error": str(e)}
+            except Exception as e:
+                return {"index": index, "status": "error", "error": str(e)}
+            else:
+                limiter.on_success()
+                return {"index": index, "status": "success", "result": result}
+            finally:
+                _handles_throttling.reset(token)
+                limiter.release()
+            time.sleep(delay)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=min(limiter.max_limit, len(items))) as pool:
+        # Each item runs in a copy of our context so its upstream wait is charged to this request
+        futures = [pool.submit(contextvars.copy_context().run, run_item, index, item)
+                   for index, item in enumerate(items)]
+        for future in futures:
+            results.append(future.result())
+            if on_progress is not None:
+                on_progress(len(results))
+    return results
@@ -0,0 +1,147 @@
+# cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class LocalLRU:
+    """Bounded in-process tier, evicts the least recently used entry once full"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MetadataCache:
+    """
+    Read-through cache for mostly-static Clockify metadata.
+    Lookups go local LRU -> Django cache (CLOCKIFY_CACHE_ALIAS) -> upstream fetch.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.local = LocalLRU(max_entries)
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"local_hits": 0, "shared_hits": 0, "misses": 0})
+        self._stats_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[getattr(settings, 'CLOCKIFY_CACHE_ALIAS', 'default')]
+
+    @staticmethod
+    def ttl_for(resource: str) -> int:
+        return int(getattr(settings, 'CLOCKIFY_CACHE_TTLS', {}).get(resource, 60))
+
+    @staticmethod
+    def local_ttl_for(resource: str) -> float:
+        # Other workers only learn about invalidations through the shared tier, so keep the local copy short-lived
+        return min(MetadataCache.ttl_for(resource), int(getattr(settings, 'CLOCKIFY_CACHE_LOCAL_TTL', 30)))
+
+    @staticmethod
+    def make_key(resource: str, api_key: Optional[str], *parts: str) -> str:
+        credential = hashlib.sha1((api_key or "").encode()).hexdigest()[:12]
+        parts = [str(part) for part in parts]
+        tail = ":".join(parts)
+        # Client-supplied parts (task name filters) may hold spaces or run long, which memcached refuses
+        if len(tail) > 160 or not tail.isascii() or any(char.isspace() for char in tail):
+            parts = [hashlib.sha1(tail.encode()).hexdigest()]
+        return ":".join(["clockify", resource, credential, *parts])
+
+    def _count(self, resource: str, outcome: str) -> None:
+        with self._stats_lock:
+            self._stats[resource][outcome] += 1
+
+    def get(self, resource: str, key: str, default: Any = None) -> Any:
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self._count(resource, "local_hits")
+            return value
+
+        value = self.shared.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count(resource, "shared_hits")
+            self.local.set(key, value, self.local_ttl_for(resource))
+            return value
+
+        self._count(resource, "misses")
+        return default
+
+    def get_or_fetch(self, resource: str, key: str, fetch: Callable[[], Any]) -> Any:
+        value = self.get(resource, key, _MISSING)
+        if value is _MISSING:
+            value = fetch()
+            self.set(resource, key, value)
+        return value
+
+    async def aget_or_fetch(self, resource: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_fetch for AsyncClockifyService, which shares these keys with ClockifyService"""
+        value = self.get(resource, key, _MISSING)
+        if value is _MISSING:
+            value = await fetch()
+            self.set(resource, key, value)
+        return value
+
+    def peek(self, key: str) -> bool:
+        """True if either tier holds `key`, without fetching or touching the counters"""
+        return self.local.get(key) is not _MISSING or self.shared.get(key, _MISSING) is not _MISSING
+
+    def set(self, resource: str, key: str, value: Any) -> None:
+        self.shared.set(key, value, self.ttl_for(resource))
+        self.local.set(key, value, self.local_ttl_for(resource))
+
+    def invalidate(self, *keys: str) -> None:
+        for key in keys:
+            self.local.delete(key)
+        self.shared.delete_many(list(keys))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            resources = {resource: dict(counts) for resource, counts in self._stats.items()}
+        for counts in resources.values():
+            lookups = counts["local_hits"] + counts["shared_hits"] + counts["misses"]
+            counts["hit_ratio"] = round((lookups - counts["misses"]) / lookups, 4) if lookups else 0.0
+        return {"local_entries": len(self.local), "resources": resources}
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats.clear()
+
+
+metadata_cache = MetadataCache(int(getattr(settings, 'CLOCKIFY_CACHE_LOCAL_MAX_ENTRIES', 1024)))
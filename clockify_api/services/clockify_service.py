@@ -1,22 +1,147 @@
 # clockify.py
 import requests
 from django.conf import settings
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 import logging
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from . import fast_json
+from .bulk import handles_throttling, run_bulk
+from .cache import metadata_cache
+from .conditional import revalidation_headers, validators_from
+from .http_client import get_session, get_timeout
+from .metrics import endpoint_template, observe_upstream, upstream_retries
+from .rate_limit import RETRYABLE_STATUSES, limiter_key, rate_limiter, retry_delay, should_retry
+from .singleflight import flight_key, single_flight
+from .timer_events import timer_changed
 
 logger = logging.getLogger(__name__)
 
+# Shared by every ClockifyService so validate_ids can resolve its lookups side by side
+_validation_pool = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'CLOCKIFY_VALIDATION_WORKERS', 8),
+    thread_name_prefix="clockify-validate"
+)
+# Fetches the next report page while the current one is streamed out
+_prefetch_pool = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'CLOCKIFY_PREFETCH_WORKERS', 4),
+    thread_name_prefix="clockify-prefetch"
+)
+
 
 
 class ClockifyService:
-    def __init__(self):
-        self.api_key = settings.CLOCKIFY_API_KEY
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or settings.CLOCKIFY_API_KEY
         self.base_url = settings.CLOCKIFY_BASE_URL
         self.headers = {
             "X-Api-Key": self.api_key,
             "Content-Type": "application/json"
         }
+        self.session = get_session()
+        self.timeout = get_timeout()
+        self.cache = metadata_cache
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request to Clockify over the shared keep-alive session, within the
+        per key/workspace rate limit, retrying throttled and transient failures.
+        Under run_bulk a 429 is returned at once, as its limiter backs off and retries.
+        """
+        kwargs.setdefault("headers", self.headers)
+        kwargs.setdefault("timeout", self.timeout)
+        limit_key = limiter_key(self.api_key, url)
+        endpoint = endpoint_template(urlsplit(url).path)
+        attempt = 0
+        while True:
+            rate_limiter.acquire(limit_key)
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                observe_upstream(method, endpoint, started, "error")
+                # Nothing reached Clockify on a connect timeout, so any method may be resent
+                retry_method = "GET" if isinstance(e, requests.exceptions.ConnectTimeout) else method
+                if not should_retry(retry_method, None, attempt):
+                    raise
+                delay = retry_delay(attempt)
+                reason = type(e).__name__
+            else:
+                observe_upstream(method, endpoint, started, str(response.status_code),
+                                 len(response.request.body or b""), len(response.content))
+                if not should_retry(method, response.status_code, attempt) \
+                        or response.status_code not in RETRYABLE_STATUSES \
+                        or (response.status_code == 429 and handles_throttling()):
+                    return response
+                delay = retry_delay(attempt, response.headers.get("Retry-After"))
+                reason = response.status_code
+                response.close()
+            attempt += 1
+            upstream_retries.inc(method, endpoint, str(reason))
+            logger.warning(f"Retrying {method} {url} in {delay:.2f}s after {reason} (attempt {attempt})")
+            time.sleep(delay)
+
+    def _cache_key(self, resource: str, *parts: str) -> str:
+        return self.cache.make_key(resource, self.api_key, *parts)
+
+    def _get_json(self, url: str, raw: bool = False, **kwargs):
+        """
+        GET and decode, sharing one upstream call among concurrent identical requests.
+        Repeat reads send the stored ETag / Last-Modified and reuse the stored body on a 304.
+        With `raw` the body is returned undecoded, as RawJSON.
+        """
+        key = flight_key(self.api_key, "GET", url, kwargs.get("params"))
+        if raw:
+            key += ":raw"
+
+        def fetch():
+            validators_key = self._cache_key("validators", key)
+            stored = self.cache.get("validators", validators_key)
+            headers = revalidation_headers(kwargs.get("headers", self.headers), stored)
+            response = self._request("GET", url, **{**kwargs, "headers": headers})
+            if response.status_code == 304 and stored:
+                return stored["body"]
+            response.raise_for_status()
+            body = fast_json.RawJSON(response.content) if raw else fast_json.loads(response.content)
+            validators = validators_from(response.headers, body)
+            if validators:
+                self.cache.set("validators", validators_key, validators)
+            return body
+        return single_flight.do(key, fetch)
+
+    def _invalidate_task(self, workspace_id: str, project_id: str, task: Optional[Dict] = None,
+                         task_id: Optional[str] = None) -> None:
+        """Drop the project's cached task list and pages and refresh the single task from a write response"""
+        self.cache.invalidate(self._cache_key("tasks", workspace_id, project_id),
+                              self._cache_key("tasks-version", workspace_id, project_id))
+        task_key = self._cache_key("task", workspace_id, project_id, task_id or (task or {}).get("id"))
+        if isinstance(task, dict) and task.get("id"):
+            self.cache.set("task", task_key, task)
+        else:
+            self.cache.invalidate(task_key)
+
+    def get_workspace_by_id(self, workspace_id: str) -> Dict:
+        url = f"{self.base_url}/workspaces/{workspace_id}"
+        return self.cache.get_or_fetch(
+            "workspace", self._cache_key("workspace", workspace_id), lambda: self._get_json(url)
+        )
+
+    def get_project_by_id(self, workspace_id: str, project_id: str) -> Dict:
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}"
+        return self.cache.get_or_fetch(
+            "project", self._cache_key("project", workspace_id, project_id), lambda: self._get_json(url)
+        )
+
+    def get_task_by_id(self, workspace_id: str, project_id: str, task_id: str) -> Dict:
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks/{task_id}"
+        return self.cache.get_or_fetch(
+            "task", self._cache_key("task", workspace_id, project_id, task_id), lambda: self._get_json(url)
+        )
 
     ########### New Feature Auth #################
 
@@ -25,47 +150,165 @@ class ClockifyService:
     def validate_ids(self, workspace_id: str, project_id: Optional[str] = None, 
                     task_id: Optional[str] = None) -> bool:
         """Validate that the provided IDs exist in Clockify"""
+        return not self.find_invalid_ids(workspace_id, project_id, task_id)
+
+    def find_invalid_ids(self, workspace_id: str, project_id: Optional[str] = None,
+                         task_id: Optional[str] = None) -> List[str]:
+        """
+        Resolve workspace, project and task in one pass and return the names of the invalid ones.
+        Known IDs come from the metadata cache, recent misses from a short negative cache,
+        and whatever is left is fetched concurrently. Only 400/403/404 answers mark an ID invalid,
+        other failures (throttling, timeouts) are raised.
+        """
+        if task_id and not project_id:
+            return ["task_id"]
+
+        checks = [("workspace_id", "workspace", (workspace_id,), self.get_workspace_by_id)]
+        if project_id:
+            checks.append(("project_id", "project", (workspace_id, project_id), self.get_project_by_id))
+        if task_id:
+            checks.append(("task_id", "task", (workspace_id, project_id, task_id), self.get_task_by_id))
+
+        invalid = []
+        pending = []
+        for name, resource, ids, fetch in checks:
+            if self.cache.peek(self._cache_key("missing", resource, *ids)):
+                invalid.append(name)
+            elif self.cache.peek(self._cache_key(resource, *ids)):
+                if not self._id_exists(resource, ids, fetch):
+                    invalid.append(name)
+            else:
+                pending.append((name, resource, ids, fetch))
+
+        if len(pending) == 1:
+            outcomes = [self._id_exists(*pending[0][1:])]
+        else:
+            # Each lookup runs in a copy of our context so its upstream wait is charged to this request
+            contexts = [contextvars.copy_context() for _ in pending]
+            outcomes = list(_validation_pool.map(
+                lambda context, check: context.run(self._id_exists, *check[1:]), contexts, pending
+            ))
+
+        invalid.extend(name for (name, *_), exists in zip(pending, outcomes) if not exists)
+        return [name for name, *_ in checks if name in invalid]
+
+    def _id_exists(self, resource: str, ids: tuple, fetch) -> bool:
         try:
-            # Validate workspace
-            self.get_workspace_by_id(workspace_id)
-            
-            # Validate project if provided
-            if project_id:
-                self.get_project_by_id(workspace_id, project_id)
-                
-            # Validate task if provided
-            if task_id:
-                self.get_task_by_id(workspace_id, project_id, task_id)
-                
+            fetch(*ids)
             return True
-        except requests.exceptions.RequestException:
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code not in (400, 403, 404):
+                raise  # Throttled (run_bulk backs off and retries) or failing, which says nothing about the ID
+            self.cache.set("missing", self._cache_key("missing", resource, *ids), True)
             return False
 
     def get_user_time_report(self, workspace_id: str, user_id: str, 
                            start_date: datetime, end_date: datetime) -> Dict:
-        """Get time tracking report for a specific user"""
+        """Get time tracking report for a specific user, every page of it in one document"""
+        pages = self.iter_user_time_report_pages(workspace_id, user_id, start_date, end_date)
+        report = next(pages)
+        entries = list(report.get("timeentries") or [])
+        for page in pages:
+            entries.extend(page.get("timeentries") or [])
+        return {**report, "timeentries": entries}
+
+    def iter_detailed_report_pages(self, workspace_id: str, start_date: datetime, end_date: datetime,
+                                   filters: Optional[Dict] = None,
+                                   page_size: Optional[int] = None,
+                                   start_page: int = 1, prefetch: int = 1) -> Iterator[Dict]:
+        """
+        Yield every page of the workspace's detailed report from `start_page` on. Up to
+        `prefetch` following pages are requested while the caller is still consuming the
+        current one.
+        """
         url = f"{self.base_url}/workspaces/{workspace_id}/reports/detailed"
-        
-        payload = {
-            "dateRangeStart": start_date.isoformat(),
-            "dateRangeEnd": end_date.isoformat(),
-            "users": {"ids": [user_id]},
-            "detailedFilter": {
-                "page": 1,
-                "pageSize": 50
+        page_size = page_size or settings.CLOCKIFY_REPORT_PAGE_SIZE
+
+        def fetch_page(page: int) -> Dict:
+            payload = {
+                "dateRangeStart": start_date.isoformat(),
+                "dateRangeEnd": end_date.isoformat(),
+                **(filters or {}),
+                "detailedFilter": {
+                    "page": page,
+                    "pageSize": page_size
+                }
             }
-        }
-        
-        response = requests.post(url, json=payload, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
-
-    def get_project_time_report(self, workspace_id: str, project_id: str) -> Dict:
+            response = self._request("POST", url, json=payload)
+            response.raise_for_status()
+            return fast_json.loads(response.content)
+
+        def cancel(upcoming: List) -> None:
+            for future in upcoming:
+                future.cancel()
+            upcoming.clear()
+
+        page = start_page
+        current = fetch_page(page)
+        upcoming = []  # Futures for page + 1, page + 2, ...
+        while True:
+            if len(current.get("timeentries") or []) >= page_size:
+                while len(upcoming) < max(prefetch, 1):
+                    upcoming.append(_prefetch_pool.submit(
+                        contextvars.copy_context().run, fetch_page, page + len(upcoming) + 1
+                    ))
+            else:
+                cancel(upcoming)  # Last page, anything requested past it is empty
+            try:
+                yield current
+            except GeneratorExit:
+                cancel(upcoming)
+                raise
+            if not upcoming:
+                return
+            page += 1
+            current = upcoming.pop(0).result()
+
+    def iter_user_time_report_pages(self, workspace_id: str, user_id: str,
+                                    start_date: datetime, end_date: datetime,
+                                    page_size: Optional[int] = None) -> Iterator[Dict]:
+        """Yield every page of the detailed report for a user"""
+        return self.iter_detailed_report_pages(
+            workspace_id, start_date, end_date, {"users": {"ids": [user_id]}}, page_size
+        )
+
+    def iter_user_time_entries(self, workspace_id: str, user_id: str,
+                               start_date: datetime, end_date: datetime,
+                               page_size: Optional[int] = None) -> Iterator[Dict]:
+        """Yield every detailed time entry for a user, one at a time"""
+        for page in self.iter_user_time_report_pages(workspace_id, user_id, start_date, end_date, page_size):
+            yield from page.get("timeentries") or []
+
+    def _iter_pages(self, url: str, params: Optional[Dict] = None,
+                    page_size: Optional[int] = None, start_page: int = 1) -> Iterator[List[Dict]]:
+        """Yield the pages of a page/page-size list endpoint until a short page comes back"""
+        page_size = page_size or settings.CLOCKIFY_LIST_PAGE_SIZE
+        page = start_page
+        while True:
+            items = self._get_json(url, params={**(params or {}), "page": page, "page-size": page_size})
+            yield items
+            if len(items) < page_size:
+                return
+            page += 1
+
+    def _iter_paged(self, url: str, params: Optional[Dict] = None,
+                    page_size: Optional[int] = None) -> Iterator[Dict]:
+        """Yield items from a page/page-size list endpoint until a short page comes back"""
+        for items in self._iter_pages(url, params, page_size):
+            yield from items
+
+    def iter_projects(self, workspace_id: str) -> Iterator[Dict]:
+        """Yield every project in a workspace"""
+        return self._iter_paged(f"{self.base_url}/workspaces/{workspace_id}/projects")
+
+    def iter_all_project_tasks(self, workspace_id: str, project_id: str) -> Iterator[Dict]:
+        """Yield every task in a project, across all pages"""
+        return self._iter_paged(f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks")
+
+    def get_project_time_report(self, workspace_id: str, project_id: str, raw: bool = False) -> Dict:
         """Get time tracking report for a specific project"""
         url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/reports/summary"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(url, raw=raw)
 
     def assign_task(self, workspace_id: str, project_id: str, 
                    task_id: str, user_ids: List[str]) -> Dict:
@@ -76,9 +319,11 @@ class ClockifyService:
             "assigneeIds": user_ids
         }
         
-        response = requests.put(url, json=payload, headers=self.headers)
+        response = self._request("PUT", url, json=payload)
         response.raise_for_status()
-        return response.json()
+        task = response.json()
+        self._invalidate_task(workspace_id, project_id, task, task_id)
+        return task
 
     def get_timer_status(self, workspace_id: str, user_id: str) -> Dict:
         """Get the current timer status for a user"""
@@ -87,28 +332,117 @@ class ClockifyService:
             "in-progress": "true"
         }
         
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def bulk_create_tasks(self, workspace_id: str, project_id: str, 
-                         tasks: List[Dict]) -> List[Dict]:
-        """Bulk create tasks in a project"""
-        created_tasks = []
-        
-        for task in tasks:
-            try:
-                created_task = self.create_task(
-                    workspace_id, 
-                    project_id, 
-                    task['name'], 
-                    task.get('assignee_ids', [])
-                )
-                created_tasks.append(created_task)
-            except Exception as e:
-                logger.error(f"Error creating task {task['name']}: {str(e)}")
-                
-        return created_tasks
+        return self._get_json(url, params=params)
+
+    def find_time_entry_started_at(self, workspace_id: str, user_id: str, start: datetime,
+                                   project_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        The user's entry that started at `start`, if any. Tells whether a start whose response
+        was lost (a read timeout, a dropped connection) was applied by Clockify after all.
+        """
+        url = f"{self.base_url}/workspaces/{workspace_id}/user/{user_id}/time-entries"
+        started = self._timestamp(start)
+        params = {"start": started, "end": self._timestamp(start + timedelta(seconds=1))}
+        return next((
+            entry for entry in self._get_json(url, params=params)
+            if (entry.get("timeInterval") or {}).get("start") == started
+            and (project_id is None or entry.get("projectId") == project_id)
+        ), None)
+
+    def bulk_create_tasks(self, workspace_id: str, project_id: str,
+                         tasks: List[Dict], max_workers: Optional[int] = None) -> List[Dict]:
+        """Bulk create tasks in a project, returns the created tasks"""
+        results = self.bulk_create_tasks_detailed(workspace_id, project_id, tasks, max_workers)
+        return [result["result"] for result in results if result["status"] == "success"]
+
+    def bulk_create_tasks_detailed(self, workspace_id: str, project_id: str,
+                                   tasks: List[Dict], max_workers: Optional[int] = None,
+                                   on_progress: Optional[Callable[[int], None]] = None) -> List[Dict]:
+        """Create tasks concurrently, one result per input task in input order"""
+        max_workers = self._bulk_workers(max_workers)
+
+        def create(task):
+            return self.create_task(
+                workspace_id,
+                project_id,
+                task['name'],
+                task.get('assignee_ids', [])
+            )
+
+        results = run_bulk(
+            create, tasks,
+            max_workers=max_workers,
+            min_workers=settings.CLOCKIFY_BULK_MIN_WORKERS,
+            max_retries=settings.CLOCKIFY_BULK_MAX_RETRIES,
+            on_progress=on_progress,
+        )
+        for task, result in zip(tasks, results):
+            result["name"] = task.get('name')
+            if result["status"] == "error":
+                logger.error(f"Error creating task {task.get('name')}: {result['error']}")
+        return results
+
+    @staticmethod
+    def _bulk_workers(max_workers: Optional[int] = None) -> int:
+        """Requested concurrency, capped at CLOCKIFY_BULK_MAX_WORKERS"""
+        return max(1, min(int(max_workers or settings.CLOCKIFY_BULK_MAX_WORKERS), settings.CLOCKIFY_BULK_MAX_WORKERS))
+
+    def _check_ids(self, workspace_id: str, project_id: Optional[str] = None, task_id: Optional[str] = None) -> None:
+        invalid_ids = self.find_invalid_ids(workspace_id, project_id, task_id)
+        if invalid_ids:
+            raise ValueError(f"Invalid ID(s) provided: {', '.join(invalid_ids)}")
+
+    def bulk_start_timers(self, items: List[Dict], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Start one timer per item ({"workspace_id", "project_id", "task_id"?, "user_id"?, "description"?})
+        concurrently, one result per item in input order. Items with a user_id start the timer
+        for that user, which needs a workspace admin's API key.
+        """
+        def start(item):
+            if not item.get("workspace_id") or not item.get("project_id"):
+                raise ValueError("workspace_id and project_id are required")
+            workspace_id, project_id, task_id = item["workspace_id"], item["project_id"], item.get("task_id")
+            self._check_ids(workspace_id, project_id, task_id)
+            if item.get("user_id"):
+                return self.start_timer_for_user(workspace_id, item["user_id"], project_id, task_id,
+                                                 item.get("description", ""))
+            if task_id:
+                return self.start_task_timer(workspace_id, project_id, task_id, item.get("description", ""))
+            return self.start_timer(workspace_id, project_id, item.get("description", ""))
+
+        return self._run_timer_items(start, items, max_workers, "starting")
+
+    def bulk_stop_timers(self, items: List[Dict], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Stop one timer per item, by {"workspace_id", "time_entry_id"} or by whatever is running
+        for {"workspace_id", "user_id"}, concurrently, one result per item in input order
+        """
+        def stop(item):
+            if not item.get("workspace_id") or not (item.get("time_entry_id") or item.get("user_id")):
+                raise ValueError("workspace_id and time_entry_id (or user_id) are required")
+            workspace_id = item["workspace_id"]
+            self._check_ids(workspace_id)
+            if not item.get("time_entry_id"):
+                return self.stop_running_timer(workspace_id, item["user_id"])
+            return self.stop_timer_keeping_task(workspace_id, item["time_entry_id"])
+
+        return self._run_timer_items(stop, items, max_workers, "stopping")
+
+    def _run_timer_items(self, func: Callable[[Dict], Dict], items: List[Dict],
+                         max_workers: Optional[int], action: str) -> List[Dict]:
+        results = run_bulk(
+            func, items,
+            max_workers=self._bulk_workers(max_workers),
+            min_workers=settings.CLOCKIFY_BULK_MIN_WORKERS,
+            max_retries=settings.CLOCKIFY_BULK_MAX_RETRIES,
+        )
+        for item, result in zip(items, results):
+            for field in ("user_id", "task_id", "time_entry_id"):
+                if item.get(field):
+                    result[field] = item[field]
+            if result["status"] == "error":
+                logger.error(f"Error {action} timer for item {result['index']}: {result['error']}")
+        return results
 
     def add_tags_to_task(self, workspace_id: str, project_id: str, 
                         task_id: str, tags: List[str]) -> Dict:
@@ -119,58 +453,139 @@ class ClockifyService:
             "tags": tags
         }
         
-        response = requests.put(url, json=payload, headers=self.headers)
+        response = self._request("PUT", url, json=payload)
         response.raise_for_status()
-        return response.json()   
+        task = response.json()
+        self._invalidate_task(workspace_id, project_id, task, task_id)
+        return task
 
 
     ############# Till Task Implementations ###############
 
 
-    def get_workspaces(self):
+    def get_workspaces(self, raw: bool = False):
         url = f"{self.base_url}/workspaces"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        # Cached as the upstream bytes, smaller to keep and pickle than the decoded list
+        body = self.cache.get_or_fetch(
+            "workspaces", self._cache_key("workspaces"), lambda: self._get_json(url, raw=True)
+        )
+        return fast_json.encoded(body) if raw else fast_json.decoded(body)
+
+    def get_current_user(self) -> Dict:
+        """The Clockify user that owns this service's API key"""
+        url = f"{self.base_url}/user"
+        return self.cache.get_or_fetch("user", self._cache_key("user"), lambda: self._get_json(url))
 
     def create_project(self, workspace_id, project_name):
         url = f"{self.base_url}/workspaces/{workspace_id}/projects"
         payload = {"name": project_name}
-        response = requests.post(url, json=payload, headers=self.headers)
+        response = self._request("POST", url, json=payload)
         response.raise_for_status()
-        return response.json()
-
-    def start_timer(self, workspace_id, project_id, description=""):
+        project = response.json()
+        if project.get("id"):
+            self.cache.set("project", self._cache_key("project", workspace_id, project["id"]), project)
+        return project
+
+    @staticmethod
+    def _timestamp(moment: Optional[datetime] = None) -> str:
+        """Clockify's time format, in UTC as its Z suffix says; naive datetimes are taken as UTC"""
+        if moment is None:
+            moment = datetime.now(timezone.utc)
+        elif moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc)
+        return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def start_timer(self, workspace_id, project_id, description="",
+                    start: Optional[datetime] = None, end: Optional[datetime] = None):
         url = f"{self.base_url}/workspaces/{workspace_id}/time-entries"
         payload = {
-            "start": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "start": self._timestamp(start),
             "billable": True,
             "projectId": project_id,
             "description": description
         }
-        response = requests.post(url, json=payload, headers=self.headers)
+        if end is not None:
+            payload["end"] = self._timestamp(end)
+        response = self._request("POST", url, json=payload)
         response.raise_for_status()
-        return response.json()
+        return self._remember_time_entry(workspace_id, response.json())
 
-    def stop_timer(self, workspace_id, time_entry_id):
-        get_url = f"{self.base_url}/workspaces/{workspace_id}/time-entries/{time_entry_id}"
-        existing_entry = requests.get(get_url, headers=self.headers).json()
-        
+    def start_timer_for_user(self, workspace_id: str, user_id: str, project_id: str,
+                             task_id: Optional[str] = None, description: str = "") -> Dict:
+        """Start a timer on another user's behalf (needs a workspace admin's API key)"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/user/{user_id}/time-entries"
+        payload = {
+            "start": self._timestamp(),
+            "billable": True,
+            "projectId": project_id,
+            "description": description
+        }
+        if task_id:
+            payload["taskId"] = task_id
+        response = self._request("POST", url, json=payload)
+        response.raise_for_status()
+        return self._remember_time_entry(workspace_id, response.json())
+
+    def _remember_time_entry(self, workspace_id: str, entry: Dict) -> Dict:
+        """Keep the entry returned on start so stopping it needs no extra GET"""
+        if isinstance(entry, dict) and entry.get("id"):
+            self.cache.set("time_entry", self._cache_key("time_entry", workspace_id, entry["id"]), entry)
+        timer_changed(workspace_id, entry)
+        return entry
+
+    def _get_time_entry(self, workspace_id: str, time_entry_id: str) -> Dict:
+        """Entry captured at start time, or a GET for entries started outside this service"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/time-entries/{time_entry_id}"
+        return self.cache.get_or_fetch(
+            "time_entry", self._cache_key("time_entry", workspace_id, time_entry_id), lambda: self._get_json(url)
+        )
+
+    def _stop_time_entry(self, workspace_id: str, time_entry_id: str, existing_entry: Dict,
+                         include_task: bool = False, end: Optional[datetime] = None) -> requests.Response:
+        url = f"{self.base_url}/workspaces/{workspace_id}/time-entries/{time_entry_id}"
         data = {
             "start": existing_entry['timeInterval']['start'],
-            "end": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end": self._timestamp(end),
             "billable": existing_entry['billable'],
-            "projectId": existing_entry['projectId']
+            "projectId": existing_entry['projectId'],
+            # PUT replaces the entry, carry these over so they are not wiped
+            "description": existing_entry.get('description') or "",
+            "tagIds": existing_entry.get('tagIds') or []
         }
-        
-        response = requests.put(get_url, headers=self.headers, json=data)
-        
+        if include_task:
+            data["taskId"] = existing_entry['taskId']
+
+        response = self._request("PUT", url, json=data)
+        self.cache.invalidate(self._cache_key("time_entry", workspace_id, time_entry_id))
+        return response
+
+    def stop_timer(self, workspace_id, time_entry_id, end: Optional[datetime] = None):
+        existing_entry = self._get_time_entry(workspace_id, time_entry_id)
+        response = self._stop_time_entry(workspace_id, time_entry_id, existing_entry, end=end)
         if response.status_code != 200:
-            print(f"Response Content: {response.text}")
-            print(f"Response Status: {response.status_code}")
-        
+            logger.error(f"Error stopping timer {time_entry_id}: {response.status_code} {response.text}")
         response.raise_for_status()
-        return response.json()
+        entry = response.json()
+        timer_changed(workspace_id, entry)
+        return entry
+
+    def stop_timer_keeping_task(self, workspace_id: str, time_entry_id: str,
+                                end: Optional[datetime] = None) -> Dict:
+        """Stop an entry started anywhere; PUT replaces the entry, so the task goes along if it has one"""
+        existing_entry = self._get_time_entry(workspace_id, time_entry_id)
+        stop_entry = self.stop_task_timer if existing_entry.get("taskId") else self.stop_timer
+        return stop_entry(workspace_id, time_entry_id, end=end)
+
+    def stop_running_timer(self, workspace_id: str, user_id: str) -> Dict:
+        """Stop whatever timer the user has running, one PATCH and no lookup"""
+        url = f"{self.base_url}/workspaces/{workspace_id}/user/{user_id}/time-entries"
+        response = self._request("PATCH", url, json={"end": self._timestamp()})
+        response.raise_for_status()
+        entry = response.json()
+        if isinstance(entry, dict) and entry.get("id"):
+            self.cache.invalidate(self._cache_key("time_entry", workspace_id, entry["id"]))
+        timer_changed(workspace_id, entry)
+        return entry
 
     def create_task(self, workspace_id, project_id, task_name, assignee_ids=None):
         url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks"
@@ -180,13 +595,16 @@ class ClockifyService:
             "assigneeIds": assignee_ids or [],
             "status": "ACTIVE"
         }
-        response = requests.post(url, json=payload, headers=self.headers)
+        response = self._request("POST", url, json=payload)
         response.raise_for_status()
-        return response.json()
+        task = response.json()
+        self._invalidate_task(workspace_id, project_id, task)
+        return task
 
-    def start_task_timer(self, workspace_id, project_id, task_id, description=""):
+    def start_task_timer(self, workspace_id, project_id, task_id, description="",
+                         start: Optional[datetime] = None, end: Optional[datetime] = None):
         url = f"{self.base_url}/workspaces/{workspace_id}/time-entries"
-        current_time = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+        current_time = self._timestamp(start)
         
         payload = {
             "start": current_time,
@@ -195,43 +613,79 @@ class ClockifyService:
             "taskId": task_id,
             "description": description
         }
+        if end is not None:
+            payload["end"] = self._timestamp(end)
         
-        print(f"Starting timer with payload: {payload}")
-        response = requests.post(url, json=payload, headers=self.headers)
-        
-        if response.status_code != 200 and response.status_code != 201:
-            print(f"Response Content: {response.text}")
-            print(f"Response Status: {response.status_code}")
-            
+        logger.debug(f"Starting task timer with payload: {payload}")
+        response = self._request("POST", url, json=payload)
+        if response.status_code not in (200, 201):
+            logger.error(f"Error starting task timer: {response.status_code} {response.text}")
         response.raise_for_status()
-        return response.json()
+        return self._remember_time_entry(workspace_id, response.json())
 
-    def stop_task_timer(self, workspace_id, time_entry_id):
-        get_url = f"{self.base_url}/workspaces/{workspace_id}/time-entries/{time_entry_id}"
-        existing_entry = requests.get(get_url, headers=self.headers).json()
-        
-        data = {
-            "start": existing_entry['timeInterval']['start'],
-            "end": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "billable": existing_entry['billable'],
-            "projectId": existing_entry['projectId'],
-            "taskId": existing_entry['taskId']
-        }
-        
-        response = requests.put(get_url, headers=self.headers, json=data)
-        
+    def stop_task_timer(self, workspace_id, time_entry_id, end: Optional[datetime] = None):
+        existing_entry = self._get_time_entry(workspace_id, time_entry_id)
+        response = self._stop_time_entry(workspace_id, time_entry_id, existing_entry, include_task=True, end=end)
         if response.status_code != 200:
-            print(f"Response Content: {response.text}")
-            print(f"Response Status: {response.status_code}")
-        
+            logger.error(f"Error stopping task timer {time_entry_id}: {response.status_code} {response.text}")
         response.raise_for_status()
-        return response.json()
+        entry = response.json()
+        timer_changed(workspace_id, entry)
+        return entry
 
-    def get_project_tasks(self, workspace_id, project_id):
+    def get_project_tasks(self, workspace_id, project_id, raw: bool = False):
+        """The project's tasks as one request returns them; iter_project_task_pages walks every page"""
         url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        body = self.cache.get_or_fetch(
+            "tasks", self._cache_key("tasks", workspace_id, project_id), lambda: self._get_json(url, raw=True)
+        )
+        return fast_json.encoded(body) if raw else fast_json.decoded(body)
+
+    def _tasks_version(self, workspace_id: str, project_id: str) -> str:
+        """Part of every cached task page key, replaced by _invalidate_task when the tasks change"""
+        return self.cache.get_or_fetch(
+            "tasks", self._cache_key("tasks-version", workspace_id, project_id), lambda: uuid.uuid4().hex
+        )
+
+    def get_project_task_page(self, workspace_id: str, project_id: str, page: int = 1,
+                              page_size: Optional[int] = None, params: Optional[Dict] = None) -> Dict:
+        """
+        One page of the project's tasks, cached per page, as {"tasks": RawJSON, "count": n}.
+        `params` are filters Clockify applies itself (see ListQuery.task_params).
+        """
+        url = f"{self.base_url}/workspaces/{workspace_id}/projects/{project_id}/tasks"
+        params = {**(params or {}), "page": page, "page-size": page_size or settings.CLOCKIFY_LIST_PAGE_SIZE}
+        key = self._cache_key(
+            "tasks", workspace_id, project_id, self._tasks_version(workspace_id, project_id),
+            *(f"{name}={value}" for name, value in sorted(params.items()))
+        )
+
+        def fetch():
+            body = self._get_json(url, raw=True, params=params)
+            return {"tasks": body, "count": len(fast_json.loads(body))}
+        return self.cache.get_or_fetch("tasks", key, fetch)
+
+    def iter_project_task_pages(self, workspace_id: str, project_id: str, page_size: Optional[int] = None,
+                                params: Optional[Dict] = None, start_page: int = 1) -> Iterator[List[Dict]]:
+        """Lazily yield the project's tasks a page at a time, each page read through the page cache"""
+        page_size = page_size or settings.CLOCKIFY_LIST_PAGE_SIZE
+        page = start_page
+        while True:
+            result = self.get_project_task_page(workspace_id, project_id, page, page_size, params)
+            yield fast_json.decoded(result["tasks"])
+            if result["count"] < page_size:
+                return
+            page += 1
+
+    def prefetch_project_task_page(self, workspace_id: str, project_id: str, page: int,
+                                   page_size: Optional[int] = None, params: Optional[Dict] = None) -> None:
+        """Fetch a page into the cache in the background, ahead of the client asking for it"""
+        def fetch():
+            try:
+                self.get_project_task_page(workspace_id, project_id, page, page_size, params)
+            except Exception as e:
+                logger.warning(f"Error prefetching task page {page} of project {project_id}: {str(e)}")
+        _prefetch_pool.submit(contextvars.copy_context().run, fetch)
     
 
     
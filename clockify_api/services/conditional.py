@@ -0,0 +1,24 @@
+# conditional.py
+from typing import Any, Dict, Mapping, Optional
+
+# Upstream revalidation: the last ETag / Last-Modified seen for a GET is kept with its body,
+# so a 304 from Clockify can be answered from the stored copy.
+
+
+def revalidation_headers(headers: Mapping[str, str], stored: Optional[Dict]) -> Dict[str, str]:
+    headers = dict(headers)
+    if stored:
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("last_modified"):
+            headers["If-Modified-Since"] = stored["last_modified"]
+    return headers
+
+
+def validators_from(response_headers: Mapping[str, str], body: Any) -> Optional[Dict]:
+    """What to store for the next revalidation, None if Clockify sent no validators"""
+    etag = response_headers.get("ETag")
+    last_modified = response_headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return None
+    return {"etag": etag, "last_modified": last_modified, "body": body}
@@ -0,0 +1,148 @@
+# credentials.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+from ..models import ClockifyCredential
+from .cache import _MISSING, LocalLRU
+from .clockify_service import ClockifyService
+
+# Users with a ClockifyCredential call Clockify with their own API key (so under their own
+# identity and rate-limit budget); everyone else keeps using CLOCKIFY_API_KEY.
+
+
+def _credential_setting(name: str, default):
+    return getattr(settings, 'CLOCKIFY_CREDENTIALS', {}).get(name, default)
+
+
+class Credential(NamedTuple):
+    api_key: str
+    clockify_user_id: str  # Empty until the key's owner has been looked up
+
+
+class ClientRegistry:
+    """
+    One service per API key, dropping the least recently used past `max_clients`.
+    Services hold no per-request state, so every request made with a key shares its instance
+    and the keep-alive connection pool underneath.
+    """
+
+    def __init__(self, factory: Callable[[str], Any]):
+        self._factory = factory
+        self._clients: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "created": 0, "evicted": 0}
+
+    def get(self, api_key: Optional[str] = None) -> Any:
+        api_key = api_key or settings.CLOCKIFY_API_KEY or ""
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is not None:
+                self._clients.move_to_end(api_key)
+                self._stats["hits"] += 1
+                return client
+            client = self._clients[api_key] = self._factory(api_key)
+            self._stats["created"] += 1
+            while len(self._clients) > int(_credential_setting('max_clients', 256)):
+                self._clients.popitem(last=False)
+                self._stats["evicted"] += 1
+            return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"clients": len(self._clients), **self._stats}
+
+
+def _async_service(api_key: str):
+    from .async_clockify_service import AsyncClockifyService  # Needs httpx, only loaded by the async views
+
+    return AsyncClockifyService(api_key)
+
+
+clients = ClientRegistry(ClockifyService)
+async_clients = ClientRegistry(_async_service)
+
+# user pk -> Credential or None, so most requests skip the credential query
+_lookups = LocalLRU(max_entries=4096)
+
+
+def _forget(sender, instance, **kwargs) -> None:
+    _lookups.delete(str(instance.user_id))
+
+
+post_save.connect(_forget, sender=ClockifyCredential, dispatch_uid="clockify_credential_saved")
+post_delete.connect(_forget, sender=ClockifyCredential, dispatch_uid="clockify_credential_deleted")
+
+
+def _remember(user, row) -> Optional[Credential]:
+    credential = Credential(*row) if row else None
+    _lookups.set(str(user.pk), credential, float(_credential_setting('lookup_ttl', 60)))
+    return credential
+
+
+def credential_for(user) -> Optional[Credential]:
+    """The user's own credential, or None to fall back to CLOCKIFY_API_KEY"""
+    if user is None or not user.is_authenticated:
+        return None
+    credential = _lookups.get(str(user.pk))
+    if credential is _MISSING:
+        credential = _remember(user, ClockifyCredential.objects.filter(user_id=user.pk).values_list(
+            'api_key', 'clockify_user_id'
+        ).first())
+    return credential
+
+
+async def acredential_for(user) -> Optional[Credential]:
+    if user is None or not user.is_authenticated:
+        return None
+    credential = _lookups.get(str(user.pk))
+    if credential is _MISSING:
+        credential = _remember(user, await ClockifyCredential.objects.filter(user_id=user.pk).values_list(
+            'api_key', 'clockify_user_id'
+        ).afirst())
+    return credential
+
+
+def service_for_user(user) -> ClockifyService:
+    credential = credential_for(user)
+    return clients.get(credential.api_key if credential else None)
+
+
+async def async_service_for_user(user):
+    credential = await acredential_for(user)
+    return async_clients.get(credential.api_key if credential else None)
+
+
+def clockify_user_id(user) -> str:
+    """
+    Clockify user ID to look the user's timers up by: the owner of their API key. Users without
+    a credential have no Clockify identity of their own and keep being looked up by Django ID.
+    """
+    credential = credential_for(user)
+    if credential is None:
+        return str(user.pk)
+    if credential.clockify_user_id:
+        return credential.clockify_user_id
+    owner_id = clients.get(credential.api_key).get_current_user()["id"]
+    ClockifyCredential.objects.filter(user_id=user.pk).update(clockify_user_id=owner_id)
+    _lookups.delete(str(user.pk))  # update() sends no post_save
+    return owner_id
+
+
+async def aclockify_user_id(user) -> str:
+    credential = await acredential_for(user)
+    if credential is None:
+        return str(user.pk)
+    if credential.clockify_user_id:
+        return credential.clockify_user_id
+    owner_id = (await async_clients.get(credential.api_key).get_current_user())["id"]
+    await ClockifyCredential.objects.filter(user_id=user.pk).aupdate(clockify_user_id=owner_id)
+    _lookups.delete(str(user.pk))
+    return owner_id
@@ -0,0 +1,319 @@
+# export.py
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from .clockify_service import ClockifyService
+from .sync import _duration_seconds, _parse
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # Only the parquet and arrow formats need it
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Full-workspace export of the detailed report. Pages stream through the sinks one at a time,
+# so memory stays at a few pages whatever the size of the workspace. Every `checkpoint_every`
+# pages the sinks are flushed and the page cursor is written to checkpoint.json; an interrupted
+# export started again on the same directory carries on from there.
+
+FORMATS = ("ndjson", "parquet", "arrow")
+CHECKPOINT_FILE = "checkpoint.json"
+MANIFEST_FILE = "manifest.json"
+NDJSON_FILE = "time_entries.ndjson.gz"
+
+
+def _export_setting(name: str, default):
+    return getattr(settings, 'CLOCKIFY_EXPORT', {}).get(name, default)
+
+
+def export_root() -> Path:
+    return Path(_export_setting('directory', settings.BASE_DIR / 'exports'))
+
+
+def parse_formats(value) -> List[str]:
+    """Formats from a list or a comma separated string, validated"""
+    if not value:
+        return ["ndjson"]
+    formats = value.split(",") if isinstance(value, str) else list(value)
+    formats = list(dict.fromkeys(f.strip().lower() for f in formats if f and f.strip()))
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)}, expected {', '.join(FORMATS)}")
+    if pa is None and any(f != "ndjson" for f in formats):
+        raise ImproperlyConfigured("Parquet and Arrow exports require pyarrow, install it with `pip install pyarrow`")
+    return formats
+
+
+def _schema():
+    return pa.schema([
+        ("id", pa.string()),
+        ("description", pa.string()),
+        ("user_id", pa.string()),
+        ("user_name", pa.string()),
+        ("user_email", pa.string()),
+        ("project_id", pa.string()),
+        ("project_name", pa.string()),
+        ("client_name", pa.string()),
+        ("task_id", pa.string()),
+        ("task_name", pa.string()),
+        ("tags", pa.list_(pa.string())),
+        ("billable", pa.bool_()),
+        ("start", pa.timestamp("s", tz="UTC")),
+        ("end", pa.timestamp("s", tz="UTC")),
+        ("duration_seconds", pa.int64()),
+    ])
+
+
+def flatten(entry: Dict) -> Dict:
+    """One detailed-report entry as a row of the columnar schema"""
+    interval = entry.get("timeInterval") or {}
+    start = _parse(interval.get("start"))
+    end = _parse(interval.get("end"))
+    return {
+        "id": entry.get("_id") or entry.get("id"),
+        "description": entry.get("description") or "",
+        "user_id": entry.get("userId"),
+        "user_name": entry.get("userName"),
+        "user_email": entry.get("userEmail"),
+        "project_id": entry.get("projectId"),
+        "project_name": entry.get("projectName"),
+        "client_name": entry.get("clientName"),
+        "task_id": entry.get("taskId"),
+        "task_name": entry.get("taskName"),
+        "tags": [tag.get("name") or tag.get("_id") or tag.get("id") if isinstance(tag, dict) else tag
+                 for tag in entry.get("tags") or entry.get("tagIds") or []],
+        "billable": bool(entry.get("billable")),
+        "start": start,
+        "end": end,
+        "duration_seconds": _duration_seconds(interval, start, end) if start else None,
+    }
+
+
+class NdjsonSink:
+    """
+    Raw entries, one JSON document per line, gzip compressed. Each checkpoint closes the
+    current gzip member, so the file can be cut back to the last checkpoint and appended to;
+    gzip readers treat the concatenated members as one stream.
+    """
+
+    def __init__(self, directory: Path, checkpoint: Dict):
+        self.path = directory / NDJSON_FILE
+        self._raw = open(self.path, "r+b" if self.path.exists() else "wb")
+        self._raw.truncate(checkpoint.get("ndjson_offset", 0))
+        self._raw.seek(0, os.SEEK_END)
+        self._open_member()
+
+    def _open_member(self) -> None:
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb",
+                                   compresslevel=int(_export_setting('compress_level', 6)))
+
+    def write_page(self, entries: List[Dict], rows: Optional[List[Dict]]) -> None:
+        self._gzip.write(b"".join(
+            json.dumps(entry, separators=(",", ":")).encode() + b"\n" for entry in entries
+        ))
+
+    def checkpoint(self) -> Dict:
+        self._gzip.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        state = {"ndjson_offset": self._raw.tell()}
+        self._open_member()
+        return state
+
+    def close(self) -> None:
+        self._gzip.close()
+        self._raw.close()
+
+    def files(self) -> List[Path]:
+        return [self.path]
+
+
+class PartSink:
+    """
+    Flattened rows as Parquet or Arrow IPC, one page per row group / record batch. A part file
+    is finished at every checkpoint, so resuming only drops the parts written after it.
+    """
+
+    def __init__(self, directory: Path, fmt: str, checkpoint: Dict):
+        self.fmt = fmt
+        self.extension = "parquet" if fmt == "parquet" else "arrow"
+        self.directory = directory / f"time_entries.{self.extension}"
+        self.directory.mkdir(exist_ok=True)
+        self.part = checkpoint.get(f"{fmt}_parts", 0)
+        for path in self.directory.glob(f"part-*.{self.extension}"):
+            if int(path.stem.split("-")[1]) >= self.part:
+                path.unlink()  # Written after the last checkpoint
+        self.schema = _schema()
+        self._writer = None
+        self._sink = None
+
+    def _open(self) -> None:
+        path = self.directory / f"part-{self.part:05d}.{self.extension}"
+        compression = _export_setting('compression', 'zstd')
+        if self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(str(path), self.schema, compression=compression)
+        else:
+            self._sink = pa.OSFile(str(path), "wb")
+            self._writer = pa.ipc.new_file(
+                self._sink, self.schema, options=pa.ipc.IpcWriteOptions(compression=compression)
+            )
+
+    def write_page(self, entries: List[Dict], rows: Optional[List[Dict]]) -> None:
+        if not rows:
+            return
+        if self._writer is None:
+            self._open()
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def _finish(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        self._writer = self._sink = None
+        self.part += 1
+
+    def checkpoint(self) -> Dict:
+        self._finish()
+        return {f"{self.fmt}_parts": self.part}
+
+    def close(self) -> None:
+        self._finish()
+
+    def files(self) -> List[Path]:
+        return sorted(self.directory.glob(f"part-*.{self.extension}"))
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    # Written aside and renamed, so a crash never leaves a torn checkpoint
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load_checkpoint(directory: Path) -> Optional[Dict]:
+    path = Path(directory) / CHECKPOINT_FILE
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def iter_entry_pages(service: ClockifyService, checkpoint: Dict) -> Iterator[List[Dict]]:
+    """Entries of every report page after the checkpointed one"""
+    pages = service.iter_detailed_report_pages(
+        checkpoint["workspace_id"],
+        datetime.fromisoformat(checkpoint["start"]),
+        datetime.fromisoformat(checkpoint["end"]),
+        page_size=checkpoint["page_size"],
+        start_page=checkpoint["pages"] + 1,
+        prefetch=int(_export_setting('prefetch', 4)),
+    )
+    for page in pages:
+        totals = page.get("totals") or []
+        if totals and totals[0] and totals[0].get("entriesCount") is not None:
+            checkpoint["total"] = totals[0]["entriesCount"]
+        yield page.get("timeentries") or []
+
+
+def export_workspace(service: ClockifyService, workspace_id: str, directory,
+                     start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                     formats: Sequence[str] = ("ndjson",), page_size: Optional[int] = None,
+                     on_progress: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict:
+    """
+    Export every detailed-report entry of the workspace into `directory` and return the
+    manifest. When the directory holds a checkpoint of the same export, it is resumed with
+    the date range and page size it started with.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    formats = parse_formats(formats)
+
+    checkpoint = load_checkpoint(directory)
+    if checkpoint is not None:
+        if checkpoint["workspace_id"] != workspace_id or checkpoint["formats"] != formats:
+            raise ValueError(f"{directory} holds an export of another workspace or format, pick a new directory")
+        if checkpoint.get("completed"):
+            with open(directory / MANIFEST_FILE) as f:
+                return json.load(f)
+        logger.info(f"Resuming export of {workspace_id} after page {checkpoint['pages']} ({checkpoint['rows']} rows)")
+    else:
+        end_date = end_date or timezone.now()
+        start_date = start_date or end_date - timedelta(days=int(_export_setting('default_days', 365)))
+        checkpoint = {
+            "workspace_id": workspace_id,
+            "formats": formats,
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "page_size": page_size or int(_export_setting('page_size', 1000)),
+            "pages": 0,
+            "rows": 0,
+            "total": None,
+            "started_at": timezone.now().isoformat(),
+        }
+        _write_json(directory / CHECKPOINT_FILE, checkpoint)
+
+    sinks = [NdjsonSink(directory, checkpoint) if fmt == "ndjson" else PartSink(directory, fmt, checkpoint)
+             for fmt in formats]
+    columnar = any(fmt != "ndjson" for fmt in formats)
+    checkpoint_every = int(_export_setting('checkpoint_every', 50))
+
+    def save_checkpoint() -> None:
+        for sink in sinks:
+            checkpoint.update(sink.checkpoint())
+        _write_json(directory / CHECKPOINT_FILE, checkpoint)
+
+    try:
+        unsaved = 0
+        for entries in iter_entry_pages(service, checkpoint):
+            rows = [flatten(entry) for entry in entries] if columnar else None
+            for sink in sinks:
+                sink.write_page(entries, rows)
+            checkpoint["pages"] += 1
+            checkpoint["rows"] += len(entries)
+            unsaved += 1
+            if unsaved >= checkpoint_every:
+                save_checkpoint()
+                unsaved = 0
+            if on_progress:
+                on_progress(checkpoint["rows"], checkpoint.get("total"))
+        save_checkpoint()
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    manifest = {
+        "workspace_id": workspace_id,
+        "start": checkpoint["start"],
+        "end": checkpoint["end"],
+        "rows": checkpoint["rows"],
+        "pages": checkpoint["pages"],
+        "formats": formats,
+        "files": [
+            {"name": path.relative_to(directory).as_posix(), "bytes": path.stat().st_size}
+            for sink in sinks for path in sink.files()
+        ],
+        "started_at": checkpoint["started_at"],
+        "finished_at": timezone.now().isoformat(),
+    }
+    _write_json(directory / MANIFEST_FILE, manifest)
+    checkpoint["completed"] = True
+    _write_json(directory / CHECKPOINT_FILE, checkpoint)
+    return manifest
+
@@ -0,0 +1,41 @@
+# fast_json.py
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library
+    orjson = None
+
+
+class RawJSON(bytes):
+    """
+    An encoded JSON document, as Clockify sent it. ORJSONRenderer writes it out unchanged,
+    so relaying an upstream body costs no decode/encode pass.
+    """
+
+
+def loads(data) -> Any:
+    if orjson is not None:
+        # A memoryview, as orjson turns down bytes subclasses such as RawJSON
+        return orjson.loads(memoryview(data) if isinstance(data, bytes) else data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Compact UTF-8 JSON; `default` handles types neither encoder knows"""
+    if isinstance(obj, RawJSON):
+        return bytes(obj)
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def decoded(body: Any) -> Any:
+    """A cached body as Python objects, whether it was stored encoded or not"""
+    return loads(body) if isinstance(body, bytes) else body
+
+
+def encoded(body: Any) -> RawJSON:
+    """A cached body as a RawJSON document, whether it was stored encoded or not"""
+    return body if isinstance(body, RawJSON) else RawJSON(dumps(body))
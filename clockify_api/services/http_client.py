@@ -0,0 +1,107 @@
+# http_client.py
+import asyncio
+import threading
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import httpx
+except ImportError:  # Only needed by AsyncClockifyService
+    httpx = None
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+# httpx.AsyncClient is bound to the loop it first ran on, keep one per event loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_timeout() -> Tuple[float, float]:
+    """(connect, read) timeout applied to every Clockify call"""
+    return (
+        float(getattr(settings, 'CLOCKIFY_CONNECT_TIMEOUT', 3.05)),
+        float(getattr(settings, 'CLOCKIFY_READ_TIMEOUT', 30)),
+    )
+
+
+def build_session(pool_connections: int = 10, pool_maxsize: int = 20,
+                  host_pool_sizes: Optional[Dict[str, int]] = None) -> requests.Session:
+    """Build a keep-alive session with connection pools sized per host"""
+    session = requests.Session()
+    # The session is shared by every user of the process, never carry cookies between them
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    default_adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    for host, maxsize in (host_pool_sizes or {}).items():
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=maxsize)
+        session.mount(f"https://{host}", adapter)
+        session.mount(f"http://{host}", adapter)
+
+    return session
+
+
+def _configured_host_pool_sizes() -> Dict[str, int]:
+    pool_sizes = dict(getattr(settings, 'CLOCKIFY_HTTP_HOST_POOL_SIZES', {}) or {})
+    base_host = urlsplit(settings.CLOCKIFY_BASE_URL or "").netloc
+    if base_host and base_host not in pool_sizes:
+        pool_sizes[base_host] = int(getattr(settings, 'CLOCKIFY_HTTP_POOL_MAXSIZE', 20))
+    return pool_sizes
+
+
+def get_session() -> requests.Session:
+    """Process-wide pooled session shared by every ClockifyService instance"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session(
+                    pool_connections=int(getattr(settings, 'CLOCKIFY_HTTP_POOL_CONNECTIONS', 10)),
+                    pool_maxsize=int(getattr(settings, 'CLOCKIFY_HTTP_POOL_MAXSIZE', 20)),
+                    host_pool_sizes=_configured_host_pool_sizes(),
+                )
+    return _session
+
+
+def reset_session() -> None:
+    """Close the shared session so the next call rebuilds it from settings"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    """Pooled keep-alive AsyncClient shared by every AsyncClockifyService on the running loop"""
+    if httpx is None:
+        raise ImproperlyConfigured("AsyncClockifyService requires httpx, install it with `pip install httpx`")
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        connect_timeout, read_timeout = get_timeout()
+        max_connections = int(getattr(settings, 'CLOCKIFY_ASYNC_MAX_CONNECTIONS', 100))
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=int(getattr(settings, 'CLOCKIFY_HTTP_POOL_MAXSIZE', 20)),
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_client() -> None:
+    """Close the AsyncClient bound to the running loop, if any"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
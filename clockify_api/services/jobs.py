@@ -0,0 +1,194 @@
+# jobs.py
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Job
+from .credentials import service_for_user
+from .export import export_root, export_workspace
+
+logger = logging.getLogger(__name__)
+
+_handlers: Dict[str, Callable[[Dict, "JobContext"], Any]] = {}
+
+
+def job_handler(kind: str):
+    """Register the function that runs jobs of `kind`: handler(payload, context) -> result"""
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind: str, payload: Dict, total: Optional[int] = None, user=None) -> Job:
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(
+        kind=kind, payload=payload, progress_total=total,
+        created_by=user if getattr(user, 'is_authenticated', False) else None,
+    )
+
+
+def _lock_until():
+    return timezone.now() + timedelta(seconds=settings.CLOCKIFY_JOB_LOCK_SECONDS)
+
+
+class JobContext:
+    """Handed to handlers so they can report progress, which also renews the job's lock"""
+
+    def __init__(self, job: Job, worker_id: str):
+        self.job = job
+        self.worker_id = worker_id
+        self._last_saved = 0.0
+
+    def progress(self, done: int, total: Optional[int] = None, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_saved < 1.0:
+            return
+        self._last_saved = now
+        fields = {"progress_done": done, "locked_until": _lock_until()}
+        if total is not None:
+            fields["progress_total"] = total
+        Job.objects.filter(pk=self.job.pk, locked_by=self.worker_id).update(**fields)
+
+
+def requeue_stale_jobs() -> int:
+    """Jobs whose worker stopped heart-beating go back to the queue, or fail once out of attempts"""
+    stale = Job.objects.filter(status=Job.RUNNING, locked_until__lt=timezone.now())
+    failed = stale.filter(attempts__gte=settings.CLOCKIFY_JOB_MAX_ATTEMPTS).update(
+        status=Job.FAILED, error="Worker stopped responding", finished_at=timezone.now(), locked_by=""
+    )
+    requeued = stale.update(status=Job.QUEUED, locked_by="", locked_until=None)
+    return failed + requeued
+
+
+def claim_next(worker_id: str) -> Optional[Job]:
+    """
+    Claim the oldest queued job. The conditional UPDATE acts as compare-and-set, so two
+    workers never run the same job, on any database backend.
+    """
+    candidates = Job.objects.filter(status=Job.QUEUED).order_by("created_at").values_list("pk", flat=True)[:5]
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker_id, locked_until=_lock_until(),
+            started_at=timezone.now(), attempts=F("attempts") + 1
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job: Job, worker_id: str) -> None:
+    handler = _handlers.get(job.kind)
+    context = JobContext(job, worker_id)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        result = handler(job.payload, context)
+    except Exception as e:
+        logger.error(f"Job {job.pk} ({job.kind}) failed: {str(e)}\n{traceback.format_exc()}")
+        Job.objects.filter(pk=job.pk, locked_by=worker_id).update(
+            status=Job.FAILED, error=str(e), finished_at=timezone.now(), locked_until=None
+        )
+        return
+    Job.objects.filter(pk=job.pk, locked_by=worker_id).update(
+        status=Job.SUCCEEDED, result=result, finished_at=timezone.now(), locked_until=None
+    )
+
+
+class WorkerPool:
+    """`size` threads polling the job table, used by the run_clockify_workers command"""
+
+    def __init__(self, size: int = 4, poll_interval: float = 1.0):
+        self.size = size
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+        self.prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def _work(self, index: int, once: bool) -> None:
+        worker_id = f"{self.prefix}:{index}"
+        while not self.stopping.is_set():
+            close_old_connections()
+            job = claim_next(worker_id)
+            if job is None:
+                if once:
+                    return
+                self.stopping.wait(self.poll_interval)
+                continue
+            logger.info(f"Worker {worker_id} running job {job.pk} ({job.kind})")
+            run_job(job, worker_id)
+        close_old_connections()
+
+    def run(self, once: bool = False) -> None:
+        requeue_stale_jobs()
+        threads = [
+            threading.Thread(target=self._work, args=(index, once), name=f"clockify-job-{index}", daemon=True)
+            for index in range(self.size)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            last_sweep = time.monotonic()
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=self.poll_interval)
+                if time.monotonic() - last_sweep > settings.CLOCKIFY_JOB_LOCK_SECONDS:
+                    requeue_stale_jobs()
+                    last_sweep = time.monotonic()
+        except KeyboardInterrupt:
+            self.stopping.set()
+            for thread in threads:
+                thread.join()
+
+
+def job_to_dict(job: Job) -> Dict:
+    return {
+        "id": str(job.pk),
+        "kind": job.kind,
+        "status": job.status,
+        "progress": {"done": job.progress_done, "total": job.progress_total},
+        "error": job.error or None,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+@job_handler("bulk_create_tasks")
+def bulk_create_tasks_job(payload: Dict, context: JobContext) -> Dict:
+    tasks = payload["tasks"]
+    context.progress(0, len(tasks), force=True)
+    results = service_for_user(context.job.created_by).bulk_create_tasks_detailed(
+        payload["workspace_id"], payload["project_id"], tasks,
+        max_workers=payload.get("max_concurrency"),
+        on_progress=lambda done: context.progress(done),
+    )
+    context.progress(len(results), force=True)
+    failed = sum(1 for result in results if result["status"] == "error")
+    return {"created": len(results) - failed, "failed": failed, "results": results}
+
+
+@job_handler("export_workspace")
+def export_workspace_job(payload: Dict, context: JobContext) -> Dict:
+    # Keyed by the job, so a job re-queued after its worker died resumes from the checkpoint
+    manifest = export_workspace(
+        service_for_user(context.job.created_by),
+        payload["workspace_id"],
+        export_root() / str(context.job.pk),
+        start_date=datetime.fromisoformat(payload["start_date"]) if payload.get("start_date") else None,
+        end_date=datetime.fromisoformat(payload["end_date"]) if payload.get("end_date") else None,
+        formats=payload.get("formats") or ["ndjson"],
+        on_progress=lambda done, total: context.progress(done, total),
+    )
+    context.progress(manifest["rows"], manifest["rows"], force=True)
+    return manifest
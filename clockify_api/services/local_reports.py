@@ -0,0 +1,46 @@
+# local_reports.py
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+
+from ..models import TimeEntry
+
+# Read paths answered from the local mirror kept by services/sync.py
+
+
+def user_report_pages(workspace_id: str, user_id: str, start_date: datetime,
+                      end_date: datetime) -> Tuple[Dict, Iterator[Dict]]:
+    """Same (first_page, remaining pages) contract as ClockifyService.iter_user_time_report_pages"""
+    queryset = TimeEntry.objects.filter(
+        workspace_id=workspace_id, user_id=user_id, start__gte=start_date, start__lte=end_date
+    ).order_by("start")
+    totals = queryset.aggregate(totalTime=Sum("duration"), entriesCount=Count("clockify_id"))
+    totals["totalTime"] = totals["totalTime"] or 0
+
+    def pages() -> Iterator[Dict]:
+        chunk: List[Dict] = []
+        for entry in queryset.iterator(chunk_size=settings.CLOCKIFY_REPORT_PAGE_SIZE):
+            chunk.append(entry.to_clockify())
+            if len(chunk) >= settings.CLOCKIFY_REPORT_PAGE_SIZE:
+                yield {"timeentries": chunk}
+                chunk = []
+        if chunk:
+            yield {"timeentries": chunk}
+
+    return {"totals": [totals], "timeentries": []}, pages()
+
+
+def running_entries(workspace_id: str, user_id: str) -> List[Dict]:
+    """Entries with no end yet, the local answer to get_timer_status"""
+    queryset = TimeEntry.objects.filter(workspace_id=workspace_id, user_id=str(user_id), end__isnull=True)
+    return [entry.to_clockify() for entry in queryset.order_by("-start")]
+
+
+def project_totals(workspace_id: str, project_id: str) -> Dict:
+    return TimeEntry.objects.filter(workspace_id=workspace_id, project_id=project_id).aggregate(
+        totalTime=Sum("duration"),
+        totalBillableTime=Sum("duration", filter=Q(billable=True)),
+        entriesCount=Count("clockify_id"),
+    )
@@ -0,0 +1,239 @@
+# metrics.py
+import bisect
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Small in-process metrics registry rendered in the Prometheus text format at /metrics.
+# Each worker process reports its own numbers; Prometheus sums them across targets.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_COLLECTIONS = {"workspaces", "projects", "tasks", "time-entries", "user", "users", "clients", "tags"}
+_ID_RE = re.compile(r"^[0-9a-fA-F]{24}$")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        key = tuple(str(label) for label in labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Tuple[str, ...], List] = {}  # [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = tuple(str(label) for label in labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                bucket_labels = _labels(self.labelnames, key, 'le="%s"' % _number(bound))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {state[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(state[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], List[str]]) -> None:
+        """`collector()` returns ready-made exposition lines, read at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collector in self._collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+upstream_latency = registry.histogram(
+    "clockify_upstream_request_duration_seconds", "Clockify API call latency, per attempt",
+    ("method", "endpoint")
+)
+upstream_requests = registry.counter(
+    "clockify_upstream_requests_total", "Clockify API responses by status (error = no response)",
+    ("method", "endpoint", "status")
+)
+upstream_retries = registry.counter(
+    "clockify_upstream_retries_total", "Clockify API calls retried", ("method", "endpoint", "reason")
+)
+upstream_request_bytes = registry.histogram(
+    "clockify_upstream_request_bytes", "Request body sizes sent to Clockify", ("method", "endpoint"), SIZE_BUCKETS
+)
+upstream_response_bytes = registry.histogram(
+    "clockify_upstream_response_bytes", "Response body sizes received from Clockify", ("method", "endpoint"),
+    SIZE_BUCKETS
+)
+view_latency = registry.histogram(
+    "clockify_view_duration_seconds", "Time to produce a response, per view", ("view", "method", "status")
+)
+view_upstream = registry.histogram(
+    "clockify_view_upstream_seconds", "Part of the view time spent waiting on Clockify", ("view",)
+)
+view_local = registry.histogram(
+    "clockify_view_local_seconds", "Part of the view time spent on local work", ("view",)
+)
+view_response_bytes = registry.histogram(
+    "clockify_view_response_bytes", "Response body sizes returned to clients", ("view",), SIZE_BUCKETS
+)
+
+
+def endpoint_template(path: str) -> str:
+    """/workspaces/abc/projects/def/tasks -> /workspaces/{id}/projects/{id}/tasks, to keep label sets small"""
+    segments = path.split("?")[0].strip("/").split("/")
+    templated = []
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index else ""
+        if _ID_RE.match(segment) or (previous in _COLLECTIONS and segment not in _COLLECTIONS):
+            templated.append("{id}")
+        else:
+            templated.append(segment)
+    return "/" + "/".join(templated)
+
+
+class _UpstreamTimer:
+    __slots__ = ("seconds",)
+
+    def __init__(self):
+        self.seconds = 0.0
+
+
+_upstream_timer: ContextVar[Optional[_UpstreamTimer]] = ContextVar("clockify_upstream_timer", default=None)
+
+
+def start_view_timer() -> Tuple[_UpstreamTimer, object]:
+    timer = _UpstreamTimer()
+    return timer, _upstream_timer.set(timer)
+
+
+def stop_view_timer(token) -> None:
+    _upstream_timer.reset(token)
+
+
+def observe_upstream(method: str, endpoint: str, started: float, status: str,
+                     request_bytes: Optional[int] = None, response_bytes: Optional[int] = None) -> None:
+    """Record one attempt of an upstream call; its wait is charged to the current view"""
+    elapsed = time.perf_counter() - started
+    upstream_latency.observe(elapsed, method, endpoint)
+    upstream_requests.inc(method, endpoint, status)
+    if request_bytes is not None:
+        upstream_request_bytes.observe(request_bytes, method, endpoint)
+    if response_bytes is not None:
+        upstream_response_bytes.observe(response_bytes, method, endpoint)
+    timer = _upstream_timer.get()
+    if timer is not None:
+        timer.seconds += elapsed
+
+
+def _cache_lines() -> List[str]:
+    from .cache import metadata_cache
+
+    lines = [
+        "# HELP clockify_cache_lookups_total Metadata cache lookups by tier outcome",
+        "# TYPE clockify_cache_lookups_total counter",
+    ]
+    resources = metadata_cache.stats()["resources"]
+    for resource, counts in sorted(resources.items()):
+        for outcome in ("local_hits", "shared_hits", "misses"):
+            lines.append(f"clockify_cache_lookups_total{_labels(('resource', 'outcome'), (resource, outcome))} "
+                         f"{counts[outcome]}")
+    lines += ["# HELP clockify_cache_hit_ratio Share of metadata cache lookups served without Clockify",
+              "# TYPE clockify_cache_hit_ratio gauge"]
+    lines += [f"clockify_cache_hit_ratio{_labels(('resource',), (resource,))} {counts['hit_ratio']}"
+              for resource, counts in sorted(resources.items())]
+    return lines
+
+
+def _single_flight_lines() -> List[str]:
+    from .singleflight import single_flight
+
+    stats = single_flight.stats()
+    lines = [
+        "# HELP clockify_single_flight_requests_total Upstream reads by how they were served",
+        "# TYPE clockify_single_flight_requests_total counter",
+    ]
+    for outcome in ("upstream_calls", "coalesced_local", "coalesced_shared"):
+        lines.append(f"clockify_single_flight_requests_total{_labels(('outcome',), (outcome,))} {stats[outcome]}")
+    lines += ["# HELP clockify_single_flight_dedup_ratio Share of reads that joined another call",
+              "# TYPE clockify_single_flight_dedup_ratio gauge",
+              f"clockify_single_flight_dedup_ratio {stats['dedup_ratio']}"]
+    return lines
+
+
+registry.register_collector(_cache_lines)
+registry.register_collector(_single_flight_lines)
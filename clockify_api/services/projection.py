@@ -0,0 +1,77 @@
+# projection.py
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+# fields=, status=, assignee= and name__contains= on list endpoints. Filters Clockify supports
+# are sent upstream (see ClockifyService.get_project_task_page), the rest is applied here in one
+# pass over the decoded items.
+
+QUERY_PARAMS = ("fields", "status", "assignee", "name__contains")
+TASK_STATUSES = ("ACTIVE", "DONE", "ALL")
+
+
+class ListQuery(NamedTuple):
+    fields: Optional[Tuple[str, ...]] = None
+    status: Optional[str] = None
+    assignee: Optional[str] = None
+    name_contains: Optional[str] = None
+
+    @classmethod
+    def from_params(cls, params, allowed: Sequence[str] = QUERY_PARAMS) -> "ListQuery":
+        """Read the query string, raising ValueError for malformed or unsupported parameters"""
+        unsupported = [name for name in QUERY_PARAMS if name not in allowed and params.get(name)]
+        if unsupported:
+            raise ValueError(f"Unsupported filter(s) on this endpoint: {', '.join(unsupported)}")
+
+        fields = None
+        if params.get('fields'):
+            fields = tuple(dict.fromkeys(f.strip() for f in params['fields'].split(",") if f.strip())) or None
+
+        status = (params.get('status') or "").upper() or None
+        if status == "ALL":
+            status = None
+        elif status is not None and status not in TASK_STATUSES:
+            raise ValueError(f"status must be one of {', '.join(TASK_STATUSES)}")
+
+        return cls(
+            fields=fields,
+            status=status,
+            assignee=params.get('assignee') or None,
+            name_contains=params.get('name__contains') or None,
+        )
+
+    @property
+    def filters(self) -> bool:
+        return any((self.status, self.assignee, self.name_contains))
+
+    def is_identity(self) -> bool:
+        """True when the list is returned as it is, so the upstream body can be relayed"""
+        return not self.filters and not self.fields
+
+    def task_params(self) -> Dict[str, str]:
+        """The part of the query Clockify's task listing filters on itself"""
+        params = {}
+        if self.status:
+            params["is-active"] = "true" if self.status == "ACTIVE" else "false"
+        if self.name_contains:
+            params["name"] = self.name_contains
+        return params
+
+    def without_task_params(self) -> "ListQuery":
+        return self._replace(status=None, name_contains=None)
+
+    def matches(self, item: Dict) -> bool:
+        if self.status and item.get("status") != self.status:
+            return False
+        if self.assignee and self.assignee not in (item.get("assigneeIds") or [item.get("assigneeId")]):
+            return False
+        if self.name_contains and self.name_contains.casefold() not in (item.get("name") or "").casefold():
+            return False
+        return True
+
+    def project(self, item: Dict) -> Dict:
+        return {field: item[field] for field in self.fields if field in item}
+
+    def apply(self, items: Iterable[Dict]) -> Iterator[Dict]:
+        for item in items:
+            if self.matches(item):
+                yield self.project(item) if self.fields else item
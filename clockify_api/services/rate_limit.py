@@ -0,0 +1,137 @@
+# rate_limit.py
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+_WORKSPACE_RE = re.compile(r"/workspaces/([^/?]+)")
+
+# Statuses worth retrying; 5xx only for methods that are safe to send twice
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def _limit_setting(name: str, default):
+    return getattr(settings, 'CLOCKIFY_RATE_LIMIT', {}).get(name, default)
+
+
+def _retry_setting(name: str, default):
+    return getattr(settings, 'CLOCKIFY_RETRY', {}).get(name, default)
+
+
+def limiter_key(api_key: Optional[str], url: str) -> str:
+    """Clockify budgets requests per API key and workspace"""
+    match = _WORKSPACE_RE.search(url)
+    credential = hashlib.sha1((api_key or "").encode()).hexdigest()[:12]
+    return f"{credential}:{match.group(1) if match else '-'}"
+
+
+class TokenBucket:
+    """In-process token bucket. reserve() always takes a token and says how long to wait for it."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Shared budget for upstream calls. The `local` backend keeps one token bucket per key in
+    this process; the `cache` backend counts calls per one-second window in the Django cache
+    so every worker draws from the same budget.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(_limit_setting('enabled', True))
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.setdefault(key, TokenBucket(
+                    rate=float(_limit_setting('rate', 50)),
+                    capacity=float(_limit_setting('burst', 50)),
+                ))
+        return bucket
+
+    def _reserve_shared(self, key: str) -> float:
+        cache = caches[_limit_setting('cache_alias', 'default')]
+        now = time.time()
+        window = int(now)
+        cache_key = f"clockify:ratelimit:{key}:{window}"
+        cache.add(cache_key, 0, timeout=2)
+        try:
+            count = cache.incr(cache_key)
+        except ValueError:  # Window expired between add and incr
+            return 0.0
+        if count <= int(_limit_setting('rate', 50)):
+            return 0.0
+        return window + 1 - now
+
+    def delay_for(self, key: str) -> float:
+        if _limit_setting('backend', 'local') == 'cache':
+            return self._reserve_shared(key)
+        return self._bucket(key).reserve()
+
+    def acquire(self, key: str) -> None:
+        if not self.enabled():
+            return
+        delay = self.delay_for(key)
+        while delay > 0:
+            time.sleep(delay)
+            # The local bucket already holds our token once the delay passes, the shared window must be re-checked
+            delay = self._reserve_shared(key) if _limit_setting('backend', 'local') == 'cache' else 0.0
+
+    async def acquire_async(self, key: str) -> None:
+        if not self.enabled():
+            return
+        delay = self.delay_for(key)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self._reserve_shared(key) if _limit_setting('backend', 'local') == 'cache' else 0.0
+
+
+rate_limiter = RateLimiter()
+
+
+def should_retry(method: str, status_code: Optional[int], attempt: int) -> bool:
+    """status_code None means the request failed before a response came back"""
+    if attempt >= int(_retry_setting('max_retries', 3)):
+        return False
+    if status_code == 429:
+        return True
+    return method.upper() in IDEMPOTENT_METHODS and (status_code is None or status_code in RETRYABLE_STATUSES)
+
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Honour Retry-After when Clockify sends it, else full-jitter exponential backoff"""
+    max_delay = float(_retry_setting('max_delay', 10.0))
+    if retry_after:
+        try:
+            return min(max_delay, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    base = float(_retry_setting('base_delay', 0.5))
+    return random.uniform(0, min(max_delay, base * (2 ** attempt)))
@@ -0,0 +1,153 @@
+# singleflight.py
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+def _flight_setting(name: str, default):
+    return getattr(settings, 'CLOCKIFY_SINGLE_FLIGHT', {}).get(name, default)
+
+
+def flight_key(api_key: Optional[str], method: str, url: str, params: Optional[Dict] = None) -> str:
+    """Identical reads are the same method, URL and query made with the same credential"""
+    raw = json.dumps([api_key or "", method.upper(), url, sorted((params or {}).items())], default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical upstream reads into one call whose result every waiter shares.
+    Threads in this process wait on the leader directly; with `shared` enabled, workers also
+    elect one leader through a short cache lock and pick its result up from the cache.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._async_calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+        self._stats = {"requests": 0, "upstream_calls": 0, "coalesced_local": 0, "coalesced_shared": 0}
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(_flight_setting('enabled', True))
+
+    def _count(self, outcome: str) -> None:
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats[outcome] += 1
+
+    def do(self, key: str, fetch: Callable[[], Any]) -> Any:
+        if not self.enabled():
+            return fetch()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            self._count("coalesced_local")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._lead(key, fetch)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _lead(self, key: str, fetch: Callable[[], Any]) -> Any:
+        if not _flight_setting('shared', False):
+            self._count("upstream_calls")
+            return fetch()
+
+        cache = caches[_flight_setting('cache_alias', 'default')]
+        lock_key = f"clockify:flight:lock:{key}"
+        result_key = f"clockify:flight:result:{key}"
+        lock_timeout = float(_flight_setting('lock_timeout', 5))
+        locked = cache.add(lock_key, 1, timeout=lock_timeout)
+        if not locked:
+            # Another worker is already fetching, wait for it to publish the result
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                result = cache.get(result_key, _MISSING)
+                if result is not _MISSING:
+                    self._count("coalesced_shared")
+                    return result
+                if cache.get(lock_key) is None:  # Leader failed without a result, take over
+                    locked = cache.add(lock_key, 1, timeout=lock_timeout)
+                    break
+                time.sleep(float(_flight_setting('poll_interval', 0.05)))
+
+        self._count("upstream_calls")
+        try:
+            result = fetch()
+            cache.set(result_key, result, timeout=float(_flight_setting('result_ttl', 2)))
+            return result
+        finally:
+            # Only the lock this call took; a waiter that gave up must not release another worker's
+            if locked:
+                cache.delete(lock_key)
+
+    async def do_async(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Same for coroutines, coalescing within the running event loop"""
+        if not self.enabled():
+            return await fetch()
+
+        calls = self._async_calls.setdefault(asyncio.get_running_loop(), {})
+        task = calls.get(key)
+        if task is not None:
+            self._count("coalesced_local")
+        else:
+            self._count("upstream_calls")
+            # A task of its own, so a caller that disconnects does not cancel it for the others
+            task = calls[key] = asyncio.ensure_future(fetch())
+
+            def finished(done: asyncio.Future) -> None:
+                calls.pop(key, None)
+                if not done.cancelled():
+                    done.exception()  # Retrieved here in case every waiter went away
+
+            task.add_done_callback(finished)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        coalesced = stats["coalesced_local"] + stats["coalesced_shared"]
+        stats["dedup_ratio"] = round(coalesced / stats["requests"], 4) if stats["requests"] else 0.0
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            for outcome in self._stats:
+                self._stats[outcome] = 0
+
+
+single_flight = SingleFlight()
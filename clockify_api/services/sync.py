@@ -0,0 +1,176 @@
+# sync.py
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import Project, SyncState, Task, TimeEntry, Workspace
+from .bulk import run_bulk
+from .clockify_service import ClockifyService
+
+logger = logging.getLogger(__name__)
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    return parse_datetime(value) if value else None
+
+
+def _duration_seconds(interval: Dict, start: datetime, end: Optional[datetime]) -> Optional[int]:
+    duration = interval.get("duration")
+    if isinstance(duration, (int, float)):
+        return int(duration)
+    return int((end - start).total_seconds()) if end else None
+
+
+def time_entry_from_clockify(workspace_id: str, entry: Dict) -> TimeEntry:
+    """Map a detailed-report (or time-entries API) entry onto a TimeEntry row"""
+    interval = entry.get("timeInterval") or {}
+    start = _parse(interval.get("start"))
+    end = _parse(interval.get("end"))
+    return TimeEntry(
+        clockify_id=entry.get("_id") or entry["id"],
+        workspace_id=workspace_id,
+        project_id=entry.get("projectId"),
+        task_id=entry.get("taskId"),
+        user_id=entry.get("userId") or "",
+        description=entry.get("description") or "",
+        billable=bool(entry.get("billable")),
+        start=start,
+        end=end,
+        duration=_duration_seconds(interval, start, end),
+        tag_ids=[tag.get("id") or tag.get("_id") if isinstance(tag, dict) else tag
+                 for tag in entry.get("tags") or entry.get("tagIds") or []],
+    )
+
+
+TIME_ENTRY_UPDATE_FIELDS = [
+    "workspace", "project", "task", "user_id", "description", "billable",
+    "start", "end", "duration", "tag_ids", "synced_at",
+]
+
+
+def upsert_time_entries(rows: List[TimeEntry]) -> int:
+    # One statement may not touch the same row twice, keep the last copy of each entry
+    rows = list({row.clockify_id: row for row in rows}.values())
+    if rows:
+        now = timezone.now()
+        for row in rows:
+            row.synced_at = now
+        TimeEntry.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["clockify_id"],
+            update_fields=TIME_ENTRY_UPDATE_FIELDS,
+        )
+    return len(rows)
+
+
+class SyncEngine:
+    """
+    Mirrors a workspace into the local tables. Metadata is refreshed in full; time entries
+    are fetched incrementally from the stored watermark (minus CLOCKIFY_SYNC_LOOKBACK_HOURS,
+    since Clockify's report API filters by start time rather than modification time).
+    """
+
+    def __init__(self, service: Optional[ClockifyService] = None):
+        self.service = service or ClockifyService()
+
+    def sync_workspace(self, workspace_id: str, full: bool = False,
+                       include_metadata: bool = True) -> Dict[str, int]:
+        started_at = timezone.now()
+        workspace = self._sync_workspace_row(workspace_id)
+        state, _ = SyncState.objects.get_or_create(workspace=workspace)
+
+        counts = {"projects": 0, "tasks": 0}
+        if include_metadata:
+            counts.update(self.sync_metadata(workspace_id))
+
+        window_start = self._window_start(state, full, started_at)
+        counts.update(self.sync_time_entries(workspace_id, window_start, started_at))
+
+        state.time_entries_watermark = started_at
+        state.last_synced_at = timezone.now()
+        state.save()
+        return counts
+
+    def _sync_workspace_row(self, workspace_id: str) -> Workspace:
+        data = self.service.get_workspace_by_id(workspace_id)
+        workspace, _ = Workspace.objects.update_or_create(
+            clockify_id=workspace_id, defaults={"name": data.get("name") or ""}
+        )
+        return workspace
+
+    @staticmethod
+    def _window_start(state: SyncState, full: bool, now: datetime) -> datetime:
+        if full or state.time_entries_watermark is None:
+            return now - timedelta(days=settings.CLOCKIFY_SYNC_INITIAL_DAYS)
+        return state.time_entries_watermark - timedelta(hours=settings.CLOCKIFY_SYNC_LOOKBACK_HOURS)
+
+    def sync_metadata(self, workspace_id: str) -> Dict[str, int]:
+        projects = [
+            Project(
+                clockify_id=project["id"],
+                workspace_id=workspace_id,
+                name=project.get("name") or "",
+                billable=bool(project.get("billable")),
+                archived=bool(project.get("archived")),
+            )
+            for project in self.service.iter_projects(workspace_id)
+        ]
+        Project.objects.bulk_create(
+            projects, update_conflicts=True, unique_fields=["clockify_id"],
+            update_fields=["workspace", "name", "billable", "archived", "synced_at"],
+        )
+
+        # Task listings are per project, fetch them side by side
+        results = run_bulk(
+            lambda project: list(self.service.iter_all_project_tasks(workspace_id, project.clockify_id)),
+            projects, max_workers=settings.CLOCKIFY_BULK_MAX_WORKERS,
+        )
+        tasks = []
+        for project, result in zip(projects, results):
+            if result["status"] == "error":
+                logger.error(f"Error syncing tasks for project {project.clockify_id}: {result['error']}")
+                continue
+            tasks.extend(
+                Task(
+                    clockify_id=task["id"],
+                    project_id=project.clockify_id,
+                    name=task.get("name") or "",
+                    status=task.get("status") or "",
+                    assignee_ids=task.get("assigneeIds") or [],
+                )
+                for task in result["result"]
+            )
+        Task.objects.bulk_create(
+            tasks, update_conflicts=True, unique_fields=["clockify_id"],
+            update_fields=["project", "name", "status", "assignee_ids", "synced_at"],
+        )
+        return {"projects": len(projects), "tasks": len(tasks)}
+
+    def sync_time_entries(self, workspace_id: str, window_start: datetime,
+                          window_end: datetime) -> Dict[str, int]:
+        """Upsert every entry started inside the window and drop local entries Clockify no longer has"""
+        seen = set()
+        upserted = 0
+        pages: Iterable[Dict] = self.service.iter_detailed_report_pages(workspace_id, window_start, window_end)
+        for page in pages:
+            rows = [
+                time_entry_from_clockify(workspace_id, entry)
+                for entry in page.get("timeentries") or []
+                if (entry.get("timeInterval") or {}).get("start")
+            ]
+            with transaction.atomic():
+                upserted += upsert_time_entries(rows)
+            seen.update(row.clockify_id for row in rows)
+
+        local_ids = set(TimeEntry.objects.filter(
+            workspace_id=workspace_id, start__gte=window_start, start__lte=window_end
+        ).values_list("clockify_id", flat=True))
+        stale_ids = list(local_ids - seen)
+        deleted = 0
+        for offset in range(0, len(stale_ids), 500):
+            deleted += TimeEntry.objects.filter(clockify_id__in=stale_ids[offset:offset + 500]).delete()[0]
+        return {"time_entries": upserted, "deleted_time_entries": deleted}
@@ -0,0 +1,168 @@
+# timer_events.py
+import asyncio
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+TIMER_STARTED = "timer.started"
+TIMER_STOPPED = "timer.stopped"
+
+
+def _events_setting(name: str, default):
+    return getattr(settings, 'CLOCKIFY_TIMER_EVENTS', {}).get(name, default)
+
+
+def timer_event(event_type: str, workspace_id: str, entry: Dict) -> Dict:
+    return {
+        "type": event_type,
+        "workspaceId": workspace_id,
+        "userId": str(entry.get("userId") or ""),
+        "timeEntry": entry,
+        "at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+
+def _matches(event: Dict, workspace_id: str, user_id: Optional[str]) -> bool:
+    return event["workspaceId"] == workspace_id and (user_id is None or event["userId"] == str(user_id))
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, workspace_id: str, user_id: Optional[str]):
+        self.loop = loop
+        self.workspace_id = workspace_id
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=int(_events_setting('queue_size', 100)))
+
+    def offer(self, event: Dict) -> None:
+        """Runs on the subscriber's loop; a client too slow to keep up loses its oldest events"""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class TimerEventBroker:
+    """
+    Fans timer start/stop events out to connected clients (the SSE view in async_views.py).
+    The `local` backend hands events straight to subscribers in this process; the `cache`
+    backend appends them to a short numbered log in the Django cache that every worker polls.
+    """
+
+    def __init__(self):
+        self._subscribers: List[_Subscriber] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _shared() -> bool:
+        return _events_setting('backend', 'local') == 'cache'
+
+    @staticmethod
+    def _cache():
+        return caches[_events_setting('cache_alias', 'default')]
+
+    def publish(self, event: Dict) -> None:
+        """Safe to call from any thread or event loop"""
+        if self._shared():
+            cache = self._cache()
+            cache.add("clockify:timer-events:seq", 0, timeout=None)
+            sequence = cache.incr("clockify:timer-events:seq")
+            cache.set(f"clockify:timer-events:{sequence}", event, timeout=int(_events_setting('retention', 300)))
+            return
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if _matches(event, subscriber.workspace_id, subscriber.user_id):
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+                except RuntimeError:  # Loop already closed, the subscription is going away
+                    pass
+
+    async def subscribe(self, workspace_id: str, user_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Yield events for the workspace (or one user in it), None every `heartbeat` seconds of silence"""
+        if self._shared():
+            async for event in self._poll_shared(workspace_id, user_id):
+                yield event
+            return
+
+        subscriber = _Subscriber(asyncio.get_running_loop(), workspace_id, user_id)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        try:
+            heartbeat = float(_events_setting('heartbeat', 15))
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers.remove(subscriber)
+
+    async def _poll_shared(self, workspace_id: str, user_id: Optional[str]) -> AsyncIterator[Dict]:
+        cache = self._cache()
+        poll_interval = float(_events_setting('poll_interval', 1.0))
+        heartbeat = float(_events_setting('heartbeat', 15))
+        seen = await cache.aget("clockify:timer-events:seq", 0)
+        idle = 0.0
+        while True:
+            latest = await cache.aget("clockify:timer-events:seq", 0)
+            if latest < seen:  # Counter was evicted and restarted
+                seen = 0
+            if latest > seen:
+                keys = [f"clockify:timer-events:{sequence}" for sequence in range(seen + 1, latest + 1)]
+                events = await cache.aget_many(keys)
+                seen = latest
+                for key in keys:
+                    event = events.get(key)
+                    if event is not None and _matches(event, workspace_id, user_id):
+                        idle = 0.0
+                        yield event
+            await asyncio.sleep(poll_interval)
+            idle += poll_interval
+            if idle >= heartbeat:
+                idle = 0.0
+                yield None
+
+
+timer_events = TimerEventBroker()
+
+# Set while the write-behind flusher sends changes that were announced when they were accepted
+_announced = contextvars.ContextVar("clockify_timer_change_announced", default=False)
+
+
+@contextmanager
+def already_announced():
+    """Changes made inside only update the timer store, e.g. from a local entry ID to Clockify's"""
+    token = _announced.set(True)
+    try:
+        yield
+    finally:
+        _announced.reset(token)
+
+
+def timer_changed(workspace_id: str, entry: Dict) -> None:
+    """
+    Record a timer start/stop made through this service: update the per-user timer store
+    and notify subscribers. Never lets a bookkeeping failure fail the Clockify call itself.
+    """
+    from . import timer_store  # Imports the models, keep this module importable on its own
+
+    if not isinstance(entry, dict) or not entry.get("id") or not entry.get("userId"):
+        return
+    try:
+        if (entry.get("timeInterval") or {}).get("end"):
+            if timer_store.set_idle(workspace_id, entry["userId"], time_entry_id=entry["id"],
+                                    at=timer_store.event_time(entry)) and not _announced.get():
+                timer_events.publish(timer_event(TIMER_STOPPED, workspace_id, entry))
+        elif timer_store.set_running(workspace_id, entry["userId"], entry) and not _announced.get():
+            timer_events.publish(timer_event(TIMER_STARTED, workspace_id, entry))
+    except Exception as e:
+        logger.error(f"Error recording timer change for time entry {entry.get('id')}: {str(e)}")
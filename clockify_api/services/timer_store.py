@@ -0,0 +1,122 @@
+# timer_store.py
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.dateparse import parse_datetime
+
+from ..models import RunningTimer
+
+logger = logging.getLogger(__name__)
+
+# Per-user "current timer" state fed by Clockify webhooks. Reads hit the Django cache and fall
+# back to the RunningTimer table; None from get() means the user has never been seen.
+# Webhooks may arrive out of order, so a change older than the last one applied is dropped.
+
+_IDLE = "idle"
+
+
+def _cache():
+    return caches[getattr(settings, 'CLOCKIFY_CACHE_ALIAS', 'default')]
+
+
+def _key(workspace_id: str, user_id: str) -> str:
+    return f"clockify:timer:{workspace_id}:{user_id}"
+
+
+def get(workspace_id: str, user_id: str) -> Optional[List[Dict]]:
+    """Running entries for the user in the same shape as ClockifyService.get_timer_status"""
+    cached = _cache().get(_key(workspace_id, user_id))
+    if cached is not None:
+        return [] if cached == _IDLE else [cached]
+
+    timer = RunningTimer.objects.filter(workspace_id=workspace_id, user_id=str(user_id)).first()
+    if timer is None:
+        return None
+    _cache().set(_key(workspace_id, user_id), timer.time_entry or _IDLE, settings.CLOCKIFY_TIMER_STORE_TTL)
+    return [timer.time_entry] if timer.time_entry else []
+
+
+def event_time(entry: Dict) -> Optional[datetime]:
+    """When the change an entry reports happened: its end once stopped, else its start"""
+    interval = entry.get("timeInterval") or {}
+    value = interval.get("end") or interval.get("start")
+    return parse_datetime(value) if value else None
+
+
+def _stale(current: Optional[RunningTimer], at: Optional[datetime]) -> bool:
+    return current is not None and current.event_at is not None and at is not None and at < current.event_at
+
+
+def set_running(workspace_id: str, user_id: str, entry: Dict) -> bool:
+    """
+    Returns False when the store already held this exact entry (e.g. a webhook echoing our own start),
+    or when the entry started before the last change applied (a late delivery of an older start)
+    """
+    current = RunningTimer.objects.filter(workspace_id=workspace_id, user_id=str(user_id)).first()
+    at = event_time(entry)
+    # Updates of the running entry itself always apply, its start may have been edited back
+    if (current is None or current.time_entry_id != entry.get("id")) and _stale(current, at):
+        logger.info(f"Ignoring stale start of time entry {entry.get('id')} for user {user_id}")
+        return False
+    changed = current is None or current.time_entry != entry
+    if changed:
+        RunningTimer.objects.update_or_create(
+            workspace_id=workspace_id, user_id=str(user_id),
+            defaults={"time_entry_id": entry.get("id") or "", "time_entry": entry, "event_at": at},
+        )
+    _cache().set(_key(workspace_id, user_id), entry, settings.CLOCKIFY_TIMER_STORE_TTL)
+    return changed
+
+
+def set_idle(workspace_id: str, user_id: str, time_entry_id: Optional[str] = None,
+             at: Optional[datetime] = None) -> bool:
+    """
+    Mark the user idle. With `time_entry_id`, only if that entry is the one running; `at` is when
+    it stopped. Returns False when the user was already known to be idle.
+    """
+    current = RunningTimer.objects.filter(workspace_id=workspace_id, user_id=str(user_id)).first()
+    if current is not None and time_entry_id is not None and current.time_entry_id \
+            and current.time_entry_id != time_entry_id:
+        return False
+    changed = current is None or bool(current.time_entry_id)
+    if changed:
+        RunningTimer.objects.update_or_create(
+            workspace_id=workspace_id, user_id=str(user_id),
+            defaults={"time_entry_id": "", "time_entry": None,
+                      "event_at": at if at is not None or current is None else current.event_at},
+        )
+    elif at is not None and (current.event_at is None or at > current.event_at):
+        # Already idle, but starts from before this stop are now stale too
+        RunningTimer.objects.filter(pk=current.pk).update(event_at=at)
+    _cache().set(_key(workspace_id, user_id), _IDLE, settings.CLOCKIFY_TIMER_STORE_TTL)
+    return changed
+
+
+def remap(workspace_id: str, user_id: str, local_id: str, entry: Dict) -> bool:
+    """Swap a running entry stored under its write-behind local ID for `entry`, its Clockify counterpart"""
+    updated = RunningTimer.objects.filter(
+        workspace_id=workspace_id, user_id=str(user_id), time_entry_id=local_id
+    ).update(time_entry_id=entry.get("id") or "", time_entry=entry)
+    if updated:
+        _cache().set(_key(workspace_id, user_id), entry, settings.CLOCKIFY_TIMER_STORE_TTL)
+    return bool(updated)
+
+
+def seed(workspace_id: str, user_id: str, running: List[Dict]) -> None:
+    """Record an upstream answer so the next read is served locally"""
+    if running:
+        set_running(workspace_id, user_id, running[0])
+    else:
+        set_idle(workspace_id, user_id)
+
+
+def get_or_fetch(workspace_id: str, user_id: str, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+    """Stored state, or an upstream lookup for users the store has never seen"""
+    running = get(workspace_id, user_id)
+    if running is None:
+        running = fetch()
+        seed(workspace_id, user_id, running)
+    return running
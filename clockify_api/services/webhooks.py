@@ -0,0 +1,68 @@
+# webhooks.py
+import hmac
+import logging
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from ..models import TimeEntry, Workspace
+from . import timer_store
+from .timer_events import TIMER_STARTED as EVENT_STARTED, TIMER_STOPPED as EVENT_STOPPED, timer_event, timer_events
+from .sync import time_entry_from_clockify, upsert_time_entries
+
+logger = logging.getLogger(__name__)
+
+# Clockify sends the event name in a header and the time entry as the body
+EVENT_HEADER = "Clockify-Webhook-Event-Type"
+SIGNATURE_HEADER = "Clockify-Signature"
+
+TIMER_STARTED = "NEW_TIMER_STARTED"
+TIMER_STOPPED = "TIMER_STOPPED"
+TIME_ENTRY_CREATED = "NEW_TIME_ENTRY"
+TIME_ENTRY_UPDATED = "TIME_ENTRY_UPDATED"
+TIME_ENTRY_DELETED = "TIME_ENTRY_DELETED"
+TIME_ENTRY_EVENTS = {TIMER_STARTED, TIMER_STOPPED, TIME_ENTRY_CREATED, TIME_ENTRY_UPDATED, TIME_ENTRY_DELETED}
+
+
+def verify_signature(signature: Optional[str]) -> bool:
+    """Clockify signs each webhook with its own static token; accept any configured one"""
+    if not signature:
+        return False
+    return any(
+        hmac.compare_digest(signature.encode(), secret.encode())
+        for secret in settings.CLOCKIFY_WEBHOOK_SECRETS
+    )
+
+
+def _mirror(workspace_id: str, entry: Dict, deleted: bool) -> None:
+    """Keep the local TimeEntry mirror in step for workspaces that are being synced"""
+    if deleted:
+        TimeEntry.objects.filter(pk=entry["id"]).delete()
+    elif not (entry.get("timeInterval") or {}).get("end") \
+            and TimeEntry.objects.filter(pk=entry["id"], end__isnull=False).exists():
+        return  # A late delivery of the start of an entry already mirrored as stopped
+    elif Workspace.objects.filter(pk=workspace_id).exists():
+        upsert_time_entries([time_entry_from_clockify(workspace_id, entry)])
+
+
+def handle_event(event_type: str, entry: Dict) -> bool:
+    """Apply one webhook delivery. Returns False for events we do not track."""
+    if event_type not in TIME_ENTRY_EVENTS:
+        return False
+
+    workspace_id = entry.get("workspaceId")
+    user_id = entry.get("userId")
+    entry_id = entry.get("id")
+    if not (workspace_id and user_id and entry_id):
+        raise ValueError("Webhook payload is missing id, workspaceId or userId")
+
+    running = not (entry.get("timeInterval") or {}).get("end")
+    if event_type == TIME_ENTRY_DELETED or not running:
+        if timer_store.set_idle(workspace_id, user_id, time_entry_id=entry_id, at=timer_store.event_time(entry)):
+            timer_events.publish(timer_event(EVENT_STOPPED, workspace_id, entry))
+    elif timer_store.set_running(workspace_id, user_id, entry):
+        timer_events.publish(timer_event(EVENT_STARTED, workspace_id, entry))
+
+    _mirror(workspace_id, entry, deleted=event_type == TIME_ENTRY_DELETED)
+    logger.info(f"Applied Clockify webhook {event_type} for time entry {entry_id}")
+    return True
@@ -0,0 +1,329 @@
+# write_behind.py
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional
+
+import requests
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import TimerWrite
+from . import timer_store
+from .bulk import run_bulk
+from .credentials import clockify_user_id, service_for_user
+from .timer_events import already_announced, timer_changed
+
+logger = logging.getLogger(__name__)
+
+# Write-behind timer actions: the request is answered at once from a TimerWrite row holding the
+# times captured on arrival, and the Clockify call is made afterwards by a flusher with bounded
+# concurrency, retrying with backoff until it succeeds or runs out of attempts.
+
+
+def _wb_setting(name: str, default):
+    return getattr(settings, 'CLOCKIFY_TIMER_WRITE_BEHIND', {}).get(name, default)
+
+
+def requested(flag=None) -> bool:
+    """Per-request `write_behind` flag, CLOCKIFY_TIMER_WRITE_BEHIND['enabled'] when absent"""
+    if flag is None:
+        return bool(_wb_setting('enabled', False))
+    if isinstance(flag, str):
+        return flag.lower() in ("1", "true", "yes", "on")
+    return bool(flag)
+
+
+def _timestamp(moment) -> Optional[str]:
+    return moment.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") if moment else None
+
+
+def to_entry(write: TimerWrite) -> Dict:
+    """The write in the shape of a Clockify time entry, as the timer views return it"""
+    return {
+        "id": write.time_entry_id or str(write.pk),
+        "localId": str(write.pk),
+        "pending": write.status != TimerWrite.SYNCED,
+        "workspaceId": write.workspace_id,
+        "userId": write.clockify_user_id or None,
+        "projectId": write.project_id or None,
+        "taskId": write.task_id or None,
+        "description": write.description,
+        "billable": True,
+        "timeInterval": {"start": _timestamp(write.start), "end": _timestamp(write.end)},
+    }
+
+
+def _accepted(write: TimerWrite) -> Dict:
+    entry = to_entry(write)
+    timer_changed(write.workspace_id, entry)
+    transaction.on_commit(flusher.wake)
+    return entry
+
+
+def start(user, workspace_id: str, project_id: str, task_id: Optional[str] = None, description: str = "") -> Dict:
+    authenticated = user is not None and user.is_authenticated
+    write = TimerWrite.objects.create(
+        workspace_id=workspace_id,
+        user=user if authenticated else None,
+        clockify_user_id=clockify_user_id(user) if authenticated else "",
+        project_id=project_id,
+        task_id=task_id or "",
+        description=description or "",
+        start=timezone.now(),
+    )
+    return _accepted(write)
+
+
+def find(workspace_id: str, time_entry_id: str) -> Optional[TimerWrite]:
+    """Buffered write by the local ID handed out on start, or by its Clockify ID once flushed"""
+    try:
+        return TimerWrite.objects.filter(pk=uuid.UUID(str(time_entry_id)), workspace_id=workspace_id).first()
+    except ValueError:
+        return TimerWrite.objects.filter(
+            workspace_id=workspace_id, time_entry_id=time_entry_id
+        ).order_by("-created_at").first()
+
+
+def find_running(workspace_id: str, user_id: str) -> Optional[TimerWrite]:
+    """Latest buffered timer of a Clockify user that has not been stopped"""
+    return TimerWrite.objects.filter(
+        workspace_id=workspace_id, clockify_user_id=str(user_id), start__isnull=False, end__isnull=True
+    ).order_by("-created_at").first()
+
+
+def stop(user, workspace_id: str, time_entry_id: Optional[str] = None, user_id: Optional[str] = None) -> Optional[Dict]:
+    """
+    Stop a buffered timer, or buffer the stop of an entry that already exists in Clockify.
+    By `user_id` only a timer buffered here can be stopped; None means there is none.
+    """
+    if not time_entry_id:
+        write = find_running(workspace_id, user_id)
+        if write is None:
+            return None
+    else:
+        write = find(workspace_id, time_entry_id)
+    ended = timezone.now()
+    if write is None:
+        if is_local_id(time_entry_id):
+            raise ValueError(f"Unknown time entry: {time_entry_id}")
+        # Started elsewhere, its start is read back from Clockify when the stop is flushed
+        authenticated = user is not None and user.is_authenticated
+        write = TimerWrite.objects.create(
+            workspace_id=workspace_id,
+            user=user if authenticated else None,
+            clockify_user_id=clockify_user_id(user) if authenticated else "",
+            time_entry_id=time_entry_id,
+            end=ended,
+        )
+        return _accepted(write)
+
+    # Conditional, so a repeated stop keeps the first end time
+    if TimerWrite.objects.filter(pk=write.pk, end__isnull=True).update(
+        end=ended, status=TimerWrite.PENDING, next_attempt_at=ended
+    ):
+        write.refresh_from_db()
+        return _accepted(write)
+    write.refresh_from_db()
+    return to_entry(write)
+
+
+def is_local_id(value: str) -> bool:
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+
+def claim(worker_id: str, limit: int) -> List[TimerWrite]:
+    """
+    Claim up to `limit` due writes. The conditional UPDATE acts as compare-and-set, so two
+    flushers never send the same write.
+    """
+    now = timezone.now()
+    unlocked = Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    candidates = list(TimerWrite.objects.filter(
+        unlocked, status=TimerWrite.PENDING, next_attempt_at__lte=now
+    ).order_by("created_at").values_list("pk", flat=True)[:limit])
+    if not candidates:
+        return []
+    lock_until = now + timedelta(seconds=float(_wb_setting('lock_seconds', 60)))
+    TimerWrite.objects.filter(unlocked, pk__in=candidates, status=TimerWrite.PENDING).update(
+        locked_by=worker_id, locked_until=lock_until
+    )
+    return list(TimerWrite.objects.filter(
+        pk__in=candidates, locked_by=worker_id, locked_until=lock_until
+    ).select_related("user").order_by("created_at"))
+
+
+def _sent_start(service, write: TimerWrite) -> Optional[Dict]:
+    """
+    The entry an earlier attempt at this start created, if any. A start POST is not idempotent
+    and one that failed may still have reached Clockify, so it is looked up before it is resent.
+    """
+    owner_id = service.get_current_user()["id"]  # Entries are created for the API key's owner
+    return service.find_time_entry_started_at(write.workspace_id, owner_id, write.start, write.project_id)
+
+
+def _send(write: TimerWrite, worker_id: str) -> str:
+    service = service_for_user(write.user)
+    sent_end = write.end
+    time_entry_id = write.time_entry_id
+    entry = None
+    if not time_entry_id:
+        if write.attempts:
+            entry = _sent_start(service, write)
+        if entry is None and write.task_id:
+            entry = service.start_task_timer(write.workspace_id, write.project_id, write.task_id,
+                                             write.description, start=write.start, end=write.end)
+        elif entry is None:
+            entry = service.start_timer(write.workspace_id, write.project_id, write.description,
+                                        start=write.start, end=write.end)
+        time_entry_id = entry["id"]
+        if write.clockify_user_id:
+            # Started events went out on accept, the timer store only learns the Clockify ID
+            timer_store.remap(write.workspace_id, write.clockify_user_id, str(write.pk),
+                              {**to_entry(write), "id": time_entry_id})
+    if write.end and not write.end_synced and not (entry and (entry.get("timeInterval") or {}).get("end")):
+        # Looks the entry up (cached by a start sent from here) so entries started elsewhere keep their task
+        service.stop_timer_keeping_task(write.workspace_id, time_entry_id, end=write.end)
+
+    done = {"time_entry_id": time_entry_id, "end_synced": sent_end is not None,
+            "attempts": 0, "last_error": "", "locked_by": "", "locked_until": None}
+    if TimerWrite.objects.filter(pk=write.pk, locked_by=worker_id, end=sent_end).update(
+        status=TimerWrite.SYNCED, **done
+    ):
+        return "synced"
+    # Stopped while the start was on its way, the stop goes out in the next round
+    TimerWrite.objects.filter(pk=write.pk, locked_by=worker_id).update(**done)
+    return "pending"
+
+
+def _failed(write: TimerWrite, worker_id: str, error: Exception, permanent: bool) -> str:
+    attempts = write.attempts + 1
+    give_up = permanent or attempts >= int(_wb_setting('max_attempts', 10))
+    delay = min(float(_wb_setting('max_retry_delay', 300)), float(_wb_setting('retry_delay', 2)) * 2 ** (attempts - 1))
+    TimerWrite.objects.filter(pk=write.pk, locked_by=worker_id).update(
+        status=TimerWrite.FAILED if give_up else TimerWrite.PENDING,
+        attempts=attempts, last_error=str(error),
+        next_attempt_at=timezone.now() + timedelta(seconds=delay),
+        locked_by="", locked_until=None,
+    )
+    if give_up:
+        logger.error(f"Giving up on timer write {write.pk} after {attempts} attempt(s): {str(error)}")
+        return "failed"
+    logger.warning(f"Timer write {write.pk} failed (attempt {attempts}), retrying in {delay:.0f}s: {str(error)}")
+    return "retrying"
+
+
+def _flush_one(write: TimerWrite, worker_id: str) -> str:
+    try:
+        # Subscribers heard of the change on accept, the service must not announce it again
+        with already_announced():
+            return _send(write, worker_id)
+    except requests.exceptions.HTTPError as e:
+        status_code = e.response.status_code if e.response is not None else None
+        if status_code == 429:
+            raise  # run_bulk lowers the concurrency and retries
+        return _failed(write, worker_id, e, permanent=status_code is not None and 400 <= status_code < 500)
+    except Exception as e:
+        return _failed(write, worker_id, e, permanent=False)
+    finally:
+        connection.close()  # Runs on a short-lived run_bulk thread
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def flush(worker_id: Optional[str] = None, max_concurrency: Optional[int] = None) -> Dict[str, int]:
+    """Send one batch of due writes and return counts per outcome"""
+    worker_id = worker_id or _worker_id()
+    writes = claim(worker_id, int(_wb_setting('batch_size', 100)))
+    counts = {"claimed": len(writes), "synced": 0, "pending": 0, "retrying": 0, "failed": 0}
+    if not writes:
+        return counts
+    outcomes = run_bulk(
+        lambda write: _flush_one(write, worker_id),
+        writes,
+        max_workers=int(max_concurrency or _wb_setting('max_concurrency', 8)),
+        min_workers=settings.CLOCKIFY_BULK_MIN_WORKERS,
+        max_retries=settings.CLOCKIFY_BULK_MAX_RETRIES,
+    )
+    for write, outcome in zip(writes, outcomes):
+        if outcome["status"] == "success":
+            counts[outcome["result"]] += 1
+        else:  # Still throttled after run_bulk's retries
+            counts[_failed(write, worker_id, Exception(outcome["error"]), permanent=False)] += 1
+    return counts
+
+
+def flush_all(worker_id: Optional[str] = None, max_concurrency: Optional[int] = None) -> Dict[str, int]:
+    """Flush batches until nothing is due"""
+    totals = {}
+    while True:
+        counts = flush(worker_id, max_concurrency)
+        for outcome, count in counts.items():
+            totals[outcome] = totals.get(outcome, 0) + count
+        if not counts["claimed"]:
+            return totals
+
+
+class Flusher:
+    """
+    Daemon thread draining the buffer inside this process, woken by every new write and
+    otherwise sweeping every `poll_interval` seconds for retries. Writes a previous process
+    left pending are picked up on this one's first request (see resume). With the `command`
+    flusher setting, `manage.py flush_timer_writes` does this instead.
+    """
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def wake(self) -> None:
+        if _wb_setting('flusher', 'thread') != 'thread':
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="clockify-timer-writes", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def install(self) -> None:
+        """Called from AppConfig.ready(), where the database must not be queried yet"""
+        if _wb_setting('flusher', 'thread') == 'thread':
+            request_started.connect(self.resume, dispatch_uid="clockify-timer-writes-resume")
+
+    def resume(self, **kwargs) -> None:
+        """Start flushing on the first request if writes are waiting, e.g. from before a restart"""
+        request_started.disconnect(dispatch_uid="clockify-timer-writes-resume")
+        try:
+            if TimerWrite.objects.filter(status=TimerWrite.PENDING).exists():
+                self.wake()
+        except Exception as e:
+            logger.error(f"Error checking for pending timer writes: {str(e)}")
+
+    def _run(self) -> None:
+        worker_id = _worker_id()
+        while True:
+            self._wake.wait(float(_wb_setting('poll_interval', 5)))
+            self._wake.clear()
+            try:
+                close_old_connections()
+                flush_all(worker_id)
+            except Exception as e:
+                logger.error(f"Error flushing timer writes: {str(e)}")
+            finally:
+                close_old_connections()
+
+
+flusher = Flusher()
@@ -0,0 +1,81 @@
+import itertools
+import json
+import logging
+from typing import AsyncIterator, Dict, Iterator
+
+from .services import fast_json
+
+logger = logging.getLogger(__name__)
+
+
+def stream_report_json(first_page: Dict, pages: Iterator[Dict]) -> Iterator[bytes]:
+    """
+    Chunked JSON in the same shape as Clockify's detailed report, one chunk per upstream page:
+    {"totals": [...], "timeentries": [...every page...]}
+    """
+    yield b'{"totals": ' + fast_json.dumps(first_page.get("totals") or []) + b', "timeentries": ['
+    separator = b""
+    try:
+        for page in itertools.chain([first_page], pages):
+            entries = page.get("timeentries") or []
+            if entries:
+                yield separator + b", ".join(fast_json.dumps(entry) for entry in entries)
+                separator = b", "
+    except Exception as e:
+        # Headers are already sent, close the document and report the failure inline
+        logger.error(f"Error streaming time report: {str(e)}")
+        yield b'], "error": ' + json.dumps(str(e)).encode() + b'}'
+        return
+    yield b"]}"
+
+
+def stream_report_ndjson(first_page: Dict, pages: Iterator[Dict]) -> Iterator[bytes]:
+    """One time entry per line, followed by a trailing {"totals": ...} line"""
+    try:
+        for page in itertools.chain([first_page], pages):
+            entries = page.get("timeentries") or []
+            if entries:
+                yield b"".join(fast_json.dumps(entry) + b"\n" for entry in entries)
+    except Exception as e:
+        logger.error(f"Error streaming time report: {str(e)}")
+        yield json.dumps({"error": str(e)}).encode() + b"\n"
+        return
+    yield fast_json.dumps({"totals": first_page.get("totals") or []}) + b"\n"
+
+
+
+async def _achain(first_page: Dict, pages: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+    yield first_page
+    async for page in pages:
+        yield page
+
+
+async def astream_report_json(first_page: Dict, pages: AsyncIterator[Dict]) -> AsyncIterator[bytes]:
+    """stream_report_json over the async service's page iterator"""
+    yield b'{"totals": ' + fast_json.dumps(first_page.get("totals") or []) + b', "timeentries": ['
+    separator = b""
+    try:
+        async for page in _achain(first_page, pages):
+            entries = page.get("timeentries") or []
+            if entries:
+                yield separator + b", ".join(fast_json.dumps(entry) for entry in entries)
+                separator = b", "
+    except Exception as e:
+        logger.error(f"Error streaming time report: {str(e)}")
+        yield b'], "error": ' + json.dumps(str(e)).encode() + b'}'
+        return
+    yield b"]}"
+
+
+async def astream_report_ndjson(first_page: Dict, pages: AsyncIterator[Dict]) -> AsyncIterator[bytes]:
+    """stream_report_ndjson over the async service's page iterator"""
+    try:
+        async for page in _achain(first_page, pages):
+            entries = page.get("timeentries") or []
+            if entries:
+                yield b"".join(fast_json.dumps(entry) + b"\n" for entry in entries)
+    except Exception as e:
+        logger.error(f"Error streaming time report: {str(e)}")
+        yield json.dumps({"error": str(e)}).encode() + b"\n"
+        return
+    yield fast_json.dumps({"totals": first_page.get("totals") or []}) + b"\n"
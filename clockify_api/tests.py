@@ -1,3 +1,445 @@
-from django.test import TestCase
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import requests
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from benchmarks.fake_clockify import FakeClockify, start_fake_clockify
+from benchmarks.stub_server import stop_stub_server
+
+from . import pagination
+from .models import Job, RunningTimer, TimeEntry, TimerWrite, Workspace
+from .services import fast_json, jobs, timer_store, webhooks, write_behind
+from .services.async_clockify_service import AsyncClockifyService
+from .services.batch import run_batch
+from .services.bulk import run_bulk
+from .services.cache import metadata_cache
+from .services.clockify_service import ClockifyService
+from .services.credentials import clients
+from .services.export import CHECKPOINT_FILE, NDJSON_FILE, export_workspace, load_checkpoint
+from .services.metrics import start_view_timer, stop_view_timer
+
+WORKSPACE = "ws1"
+WEBHOOK_SECRET = "test-webhook-secret"
+
+
+@jobs.job_handler("test_echo")
+def _echo(payload, context):
+    return payload
+
+
+class FakeClockifyMixin:
+    """Points the services at a FakeClockify started for the test class, with every cache emptied"""
+    report_entries = 1000
+
+    def setUp(self):
+        super().setUp()
+        self.fake = FakeClockify(report_entries=self.report_entries, seed=1)
+        server, base_url = start_fake_clockify(self.fake)
+        self.addCleanup(stop_stub_server, server)
+        self.enterContext(override_settings(CLOCKIFY_BASE_URL=base_url, CLOCKIFY_API_KEY="test-api-key"))
+        clients.clear()  # Services keep the base URL they were created with
+        for alias in caches:
+            caches[alias].clear()
+        metadata_cache.local.clear()
+
+
+class JobClaimTests(TestCase):
+    def test_a_job_is_claimed_once(self):
+        job = jobs.enqueue("test_echo", {"n": 1})
+        claimed = jobs.claim_next("worker-a")
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual((claimed.status, claimed.locked_by, claimed.attempts), (Job.RUNNING, "worker-a", 1))
+        self.assertIsNone(jobs.claim_next("worker-b"))
+
+    def test_claims_skip_a_job_taken_since_it_was_listed(self):
+        first = jobs.enqueue("test_echo", {"n": 1})
+        second = jobs.enqueue("test_echo", {"n": 2})
+        update = Job.objects.filter(pk=first.pk).update
+        real_filter = Job.objects.filter
+
+        def filter_after_race(*args, **kwargs):
+            # Another worker claims the oldest job between the candidate query and the UPDATE
+            if kwargs.get("pk") == first.pk and kwargs.get("status") == Job.QUEUED:
+                update(status=Job.RUNNING, locked_by="worker-b")
+            return real_filter(*args, **kwargs)
+
+        with mock.patch.object(Job.objects, "filter", side_effect=filter_after_race):
+            claimed = jobs.claim_next("worker-a")
+        self.assertEqual(claimed.pk, second.pk)
+        self.assertEqual(Job.objects.get(pk=first.pk).locked_by, "worker-b")
+
+    def test_only_the_lock_holder_records_the_outcome(self):
+        jobs.enqueue("test_echo", {"n": 1})
+        job = jobs.claim_next("worker-a")
+        jobs.run_job(job, "worker-b")
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+
+        jobs.run_job(job, "worker-a")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (Job.SUCCEEDED, {"n": 1}))
+
+    @override_settings(CLOCKIFY_JOB_MAX_ATTEMPTS=2)
+    def test_stale_jobs_are_requeued_until_out_of_attempts(self):
+        job = jobs.enqueue("test_echo", {})
+        jobs.claim_next("worker-a")
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.QUEUED)
+
+        jobs.claim_next("worker-b")
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        jobs.requeue_stale_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+
+def _entry(entry_id, start, end=None, user_id="user-1"):
+    return {"id": entry_id, "workspaceId": WORKSPACE, "userId": user_id, "description": "",
+            "timeInterval": {"start": start, "end": end}}
+
+
+@override_settings(CLOCKIFY_WEBHOOK_SECRETS=[WEBHOOK_SECRET])
+class WebhookTests(TestCase):
+    def deliver(self, event_type, entry, signature=WEBHOOK_SECRET):
+        headers = {"HTTP_CLOCKIFY_WEBHOOK_EVENT_TYPE": event_type}
+        if signature is not None:
+            headers["HTTP_CLOCKIFY_SIGNATURE"] = signature
+        return self.client.post("/api/clockify/webhooks/clockify/", data=json.dumps(entry),
+                                content_type="application/json", **headers)
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_deliveries_without_a_valid_signature_are_refused(self):
+        entry = _entry("te1", "2026-01-01T09:00:00Z")
+        self.assertEqual(self.deliver(webhooks.TIMER_STARTED, entry, signature=None).status_code, 403)
+        self.assertEqual(self.deliver(webhooks.TIMER_STARTED, entry, signature="wrong").status_code, 403)
+        self.assertFalse(RunningTimer.objects.exists())
+
+        response = self.deliver(webhooks.TIMER_STARTED, entry)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"handled": True})
+        self.assertEqual(timer_store.get(WORKSPACE, "user-1"), [entry])
+
+    def test_a_late_start_does_not_resurrect_a_stopped_timer(self):
+        Workspace.objects.create(clockify_id=WORKSPACE)
+        self.deliver(webhooks.TIMER_STOPPED, _entry("te1", "2026-01-01T09:00:00Z", "2026-01-01T10:00:00Z"))
+        self.deliver(webhooks.TIMER_STARTED, _entry("te1", "2026-01-01T09:00:00Z"))
+
+        self.assertEqual(timer_store.get(WORKSPACE, "user-1"), [])
+        caches["default"].clear()
+        self.assertEqual(timer_store.get(WORKSPACE, "user-1"), [])
+        self.assertIsNotNone(TimeEntry.objects.get(pk="te1").end)
+
+    def test_an_older_start_does_not_replace_a_newer_one(self):
+        newer = _entry("te2", "2026-01-01T11:00:00Z")
+        self.deliver(webhooks.TIMER_STARTED, newer)
+        self.deliver(webhooks.TIMER_STARTED, _entry("te1", "2026-01-01T09:00:00Z"))
+        self.assertEqual(timer_store.get(WORKSPACE, "user-1"), [newer])
+
+    def test_edits_of_the_running_entry_still_apply(self):
+        self.deliver(webhooks.TIMER_STARTED, _entry("te1", "2026-01-01T09:00:00Z"))
+        edited = _entry("te1", "2026-01-01T08:30:00Z")
+        self.deliver(webhooks.TIME_ENTRY_UPDATED, edited)
+        self.assertEqual(timer_store.get(WORKSPACE, "user-1"), [edited])
+
+
+# Batch operations run on run_bulk threads, and timer_status writes to the timer store
+class BatchAuthorizationTests(FakeClockifyMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("bob", password="bob")
+        self.staff = User.objects.create_user("carol", password="carol", is_staff=True)
+
+    def operations(self, user_id):
+        args = {"workspace_id": WORKSPACE, "user_id": user_id}
+        return [{"id": "status", "op": "timer_status", "args": args},
+                {"id": "report", "op": "user_time_report", "args": args}]
+
+    def test_users_read_their_own_data(self):
+        results = run_batch(ClockifyService(), self.user, self.operations(str(self.user.pk)))
+        self.assertEqual([result["status"] for result in results], ["success", "success"])
+
+    def test_users_cannot_read_other_users_data(self):
+        results = run_batch(ClockifyService(), self.user, self.operations("someone-else"))
+        self.assertEqual([result["error"] for result in results], ["Not allowed to read other users' data"] * 2)
+        self.assertEqual(self.fake.total_calls(), 0)
+
+    def test_staff_read_anyones_data(self):
+        results = run_batch(ClockifyService(), self.staff, self.operations("someone-else"))
+        self.assertEqual([result["status"] for result in results], ["success", "success"])
+
+    def test_reports_hold_every_page(self):
+        results = run_batch(ClockifyService(), self.staff, self.operations("someone-else"))
+        self.assertEqual(len(results[1]["result"]["timeentries"]), self.fake.report_entries)
+        self.assertGreater(self.fake.calls["detailed_report"], 1)
+
+    def test_the_view_reports_refused_operations(self):
+        self.client.force_login(self.user)
+        operations = self.operations("someone-else") + [{"id": "mine", "op": "workspaces"}]
+        response = self.client.post("/api/clockify/batch/", data=json.dumps({"operations": operations}),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result["status"] for result in response.json()["results"]], ["error", "error", "success"])
+
+    def test_anonymous_callers_are_refused(self):
+        response = self.client.post("/api/clockify/batch/", data=json.dumps({"operations": self.operations("1")}),
+                                    content_type="application/json")
+        self.assertIn(response.status_code, (401, 403))
+
+
+# Flushes run on run_bulk threads, which only see committed rows
+@override_settings(CLOCKIFY_TIMER_WRITE_BEHIND={'flusher': 'command'})
+class WriteBehindTests(FakeClockifyMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("alice", password="alice")
+
+    def test_flush_creates_then_stops_the_entry(self):
+        started = write_behind.start(self.user, WORKSPACE, "p1", task_id="p1-t3", description="Work")
+        self.assertTrue(started["pending"])
+        write_behind.stop(self.user, WORKSPACE, started["id"])
+
+        self.assertEqual(write_behind.flush_all()["synced"], 1)
+        write = TimerWrite.objects.get(pk=started["localId"])
+        self.assertEqual((write.status, write.end_synced), (TimerWrite.SYNCED, True))
+        entry = self.fake.entry(write.time_entry_id)
+        self.assertEqual((entry["taskId"], entry["description"]), ("p1-t3", "Work"))
+        self.assertIsNotNone(entry["timeInterval"]["end"])
+        self.assertIsNone(self.fake.running_entry("user-1"))
+
+    def test_stopping_an_entry_started_elsewhere_keeps_its_task(self):
+        entry = self.fake.start_timer(WORKSPACE, {"projectId": "p1", "taskId": "p1-t2", "description": "Elsewhere"})
+        write_behind.stop(self.user, WORKSPACE, entry["id"])
+
+        self.assertEqual(write_behind.flush_all()["synced"], 1)
+        stopped = self.fake.entry(entry["id"])
+        self.assertEqual((stopped["taskId"], stopped["description"]), ("p1-t2", "Elsewhere"))
+        self.assertIsNotNone(stopped["timeInterval"]["end"])
+
+    def test_a_start_whose_response_was_lost_is_not_sent_twice(self):
+        started = write_behind.start(self.user, WORKSPACE, "p1")
+        real_start_timer = ClockifyService.start_timer
+
+        def start_then_time_out(service, *args, **kwargs):
+            real_start_timer(service, *args, **kwargs)
+            raise requests.exceptions.ReadTimeout("Read timed out")
+
+        with mock.patch.object(ClockifyService, "start_timer", start_then_time_out):
+            self.assertEqual(write_behind.flush_all()["retrying"], 1)
+        self.assertEqual(len(self.fake.user_entries(WORKSPACE, "user-1")), 1)
+
+        TimerWrite.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(write_behind.flush_all()["synced"], 1)
+        entries = self.fake.user_entries(WORKSPACE, "user-1")
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(TimerWrite.objects.get(pk=started["localId"]).time_entry_id, entries[0]["id"])
+
+    def test_claimed_writes_are_not_claimed_again(self):
+        write_behind.start(self.user, WORKSPACE, "p1")
+        self.assertEqual(len(write_behind.claim("worker-a", 10)), 1)
+        self.assertEqual(write_behind.claim("worker-b", 10), [])
+
+    def test_a_repeated_stop_keeps_the_first_end(self):
+        started = write_behind.start(self.user, WORKSPACE, "p1")
+        first = write_behind.stop(self.user, WORKSPACE, started["id"])
+        again = write_behind.stop(self.user, WORKSPACE, started["id"])
+        self.assertEqual(first["timeInterval"]["end"], again["timeInterval"]["end"])
+
+
+class ExportTests(FakeClockifyMixin, TestCase):
+    report_entries = 950  # The last page is a short one, which ends the report
+
+    def setUp(self):
+        super().setUp()
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def export(self, **kwargs):
+        return export_workspace(
+            ClockifyService(), WORKSPACE, self.directory,
+            start_date=datetime(2026, 1, 1, tzinfo=dt_timezone.utc),
+            end_date=datetime(2026, 3, 1, tzinfo=dt_timezone.utc),
+            page_size=100, **kwargs
+        )
+
+    def read_ids(self):
+        with gzip.open(self.directory / NDJSON_FILE) as f:
+            return [json.loads(line)["_id"] for line in f]
+
+    def test_export_writes_every_entry(self):
+        manifest = self.export()
+        self.assertEqual((manifest["rows"], manifest["pages"]), (950, 10))
+        self.assertEqual(len(set(self.read_ids())), 950)
+        self.assertTrue(load_checkpoint(self.directory)["completed"])
+
+    def test_resume_drops_what_was_written_after_the_checkpoint(self):
+        def interrupt(done, total):
+            if done >= 300:
+                raise KeyboardInterrupt
+
+        with override_settings(CLOCKIFY_EXPORT={'checkpoint_every': 2, 'prefetch': 1}):
+            with self.assertRaises(KeyboardInterrupt):
+                self.export(on_progress=interrupt)
+        checkpoint = load_checkpoint(self.directory)
+        self.assertEqual((checkpoint["pages"], checkpoint["rows"]), (2, 200))
+        # The third page reached the file after the checkpoint
+        self.assertGreater((self.directory / NDJSON_FILE).stat().st_size, checkpoint["ndjson_offset"])
+
+        pages = ClockifyService.iter_detailed_report_pages
+        with mock.patch.object(ClockifyService, "iter_detailed_report_pages", autospec=True,
+                               side_effect=pages) as iter_pages:
+            manifest = self.export()
+        self.assertEqual(iter_pages.call_args.kwargs["start_page"], 3)
+        self.assertEqual(manifest["rows"], 950)
+        ids = self.read_ids()
+        self.assertEqual(len(ids), 950)
+        self.assertEqual(len(set(ids)), 950)
+
+    def test_a_finished_export_is_not_run_again(self):
+        first = self.export()
+        self.fake.reset_calls()
+        self.assertEqual(self.export(), first)
+        self.assertEqual(self.fake.total_calls(), 0)
+
+    def test_a_directory_of_another_workspace_is_refused(self):
+        self.export()
+        with self.assertRaises(ValueError):
+            export_workspace(ClockifyService(), "other", self.directory)
+        self.assertTrue((self.directory / CHECKPOINT_FILE).exists())
+
+
+class CursorTests(SimpleTestCase):
+    filters = {"is-active": "true"}
+
+    def test_a_cursor_reads_back_its_page(self):
+        cursor = pagination.encode_cursor(3, 25, self.filters)
+        self.assertEqual(pagination.read_cursor({"cursor": cursor}, self.filters), (3, 25))
+
+    def test_a_tampered_cursor_is_refused(self):
+        cursor = pagination.encode_cursor(3, 25, self.filters)
+        tampered = cursor[:-2] + ("AA" if not cursor.endswith("AA") else "BB")
+        with self.assertRaisesMessage(ValueError, "Invalid cursor"):
+            pagination.read_cursor({"cursor": tampered}, self.filters)
+
+    def test_a_cursor_is_bound_to_its_filters(self):
+        cursor = pagination.encode_cursor(3, 25, self.filters)
+        with self.assertRaisesMessage(ValueError, "other filters"):
+            pagination.read_cursor({"cursor": cursor}, {"is-active": "false"})
+
+    def test_page_size_is_bounded(self):
+        with override_settings(CLOCKIFY_TASK_PAGINATION={'max_page_size': 100}):
+            self.assertEqual(pagination.read_cursor({"page_size": "100"}, {}), (1, 100))
+            with self.assertRaises(ValueError):
+                pagination.read_cursor({"page_size": "101"}, {})
+
+
+class TaskPagingTests(FakeClockifyMixin, TestCase):
+    url = f"/api/clockify/workspaces/{WORKSPACE}/projects/p1/tasks/"
+
+    def test_cursors_walk_every_task_once(self):
+        seen = []
+        response = self.client.get(self.url, {"page_size": 7})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen += [task["id"] for task in response.json()]
+            if "X-Next-Cursor" not in response:
+                break
+            response = self.client.get(self.url, {"cursor": response["X-Next-Cursor"]})
+        self.assertEqual(sorted(seen), sorted(task["id"] for task in self.fake.tasks("p1")))
+
+    def test_a_tampered_cursor_is_a_bad_request(self):
+        cursor = self.client.get(self.url, {"page_size": 7})["X-Next-Cursor"]
+        response = self.client.get(self.url, {"cursor": cursor[:-2] + "xx"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_a_cursor_cannot_be_replayed_with_other_filters(self):
+        cursor = self.client.get(self.url, {"page_size": 7})["X-Next-Cursor"]
+        response = self.client.get(self.url, {"cursor": cursor, "status": "DONE"})
+        self.assertEqual(response.status_code, 400)
+
+
+# Bulk items run on run_bulk threads, and started timers are written to the timer store
+class BulkTimerTests(FakeClockifyMixin, TransactionTestCase):
+    def test_a_throttled_id_lookup_is_retried_not_reported_invalid(self):
+        self.fake.throttle_next("workspace")
+        results = ClockifyService().bulk_start_timers([{"workspace_id": WORKSPACE, "project_id": "p1"}])
+        self.assertEqual([result["status"] for result in results], ["success"])
+        self.assertEqual(self.fake.calls["workspace"], 2)
+
+    def test_a_timed_out_id_lookup_is_not_reported_invalid(self):
+        with mock.patch.object(ClockifyService, "get_workspace_by_id",
+                               side_effect=requests.exceptions.ReadTimeout("Read timed out")):
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                ClockifyService().find_invalid_ids(WORKSPACE)
+        self.assertEqual(ClockifyService().find_invalid_ids(WORKSPACE), [])
+
+
+class RunBulkTests(FakeClockifyMixin, SimpleTestCase):
+    def test_upstream_waits_are_charged_to_the_calling_view(self):
+        self.fake.latency = 0.05
+        timer, token = start_view_timer()
+        try:
+            outcomes = run_bulk(lambda index: ClockifyService().get_project_by_id(WORKSPACE, f"p{index}"), range(4))
+        finally:
+            stop_view_timer(token)
+        self.assertEqual([outcome["status"] for outcome in outcomes], ["success"] * 4)
+        self.assertGreaterEqual(timer.seconds, 4 * 0.05)
+
+
+class UserTimeReportViewTests(FakeClockifyMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("dave", password="dave")
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    async def test_sync_and_async_views_report_the_same_range(self):
+        def pages(*args):
+            return iter([{"totals": [], "timeentries": []}])
+
+        async def apages(*args):
+            yield {"totals": [], "timeentries": []}
+
+        query = {"workspace_id": WORKSPACE}
+        with mock.patch.object(ClockifyService, "iter_user_time_report_pages", side_effect=pages) as sync_pages, \
+                mock.patch.object(AsyncClockifyService, "iter_user_time_report_pages", side_effect=apages) as async_pages:
+            response = await sync_to_async(self.client.get)("/api/clockify/users/u1/time-report/", query)
+            self.assertEqual(response.status_code, 200)
+            response = await self.async_client.get("/api/clockify/async/users/u1/time-report/", query)
+            self.assertEqual(response.status_code, 200)
+
+        for call in (sync_pages.call_args, async_pages.call_args):
+            start_date, end_date = call.args[2:4]
+            self.assertTrue(timezone.is_aware(start_date) and timezone.is_aware(end_date))
+        self.assertLess(abs(async_pages.call_args.args[3] - sync_pages.call_args.args[3]), timedelta(seconds=5))
+
+
+class AsyncServiceCacheTests(FakeClockifyMixin, SimpleTestCase):
+    async def test_reads_share_the_sync_services_cache(self):
+        service = AsyncClockifyService()
+        workspaces = await service.get_workspaces()
+        tasks = await service.get_project_tasks(WORKSPACE, "p1")
+        self.assertEqual(workspaces, await sync_to_async(ClockifyService().get_workspaces)())
+        self.assertEqual(tasks, await sync_to_async(ClockifyService().get_project_tasks)(WORKSPACE, "p1"))
+        raw = await service.get_project_tasks(WORKSPACE, "p1", raw=True)
+        self.assertIsInstance(raw, fast_json.RawJSON)
+        self.assertEqual(fast_json.loads(raw), tasks)
+        self.assertEqual((self.fake.calls["workspaces"], self.fake.calls["tasks"]), (1, 1))
+
+    async def test_a_created_task_is_listed_at_once(self):
+        service = AsyncClockifyService()
+        await service.get_project_tasks(WORKSPACE, "p1")
+        task = await service.create_task(WORKSPACE, "p1", "New task")
+        self.assertIn(task["id"], [item["id"] for item in await service.get_project_tasks(WORKSPACE, "p1")])
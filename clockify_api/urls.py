@@ -2,7 +2,14 @@ from django.urls import path
 from .views import (
     WorkspaceView, CreateProjectView, StartTimerView, StopTimerView,
     CreateTaskView, StartTaskTimerView, StopTaskTimerView, GetProjectTasksView,UserTimeReportView, ProjectTimeReportView, TaskAssignmentView,
-    TimerStatusView, BulkTaskCreateView
+    TimerStatusView, BulkTaskCreateView, CacheStatsView, JobStatusView, JobResultView,
+    ClockifyWebhookView, BatchView, BulkTimerView, WorkspaceExportView, ExportFileView
+)
+from .async_views import (
+    AsyncWorkspaceView, AsyncCreateProjectView, AsyncStartTimerView, AsyncStopTimerView,
+    AsyncCreateTaskView, AsyncStartTaskTimerView, AsyncStopTaskTimerView, AsyncGetProjectTasksView,
+    AsyncUserTimeReportView, AsyncProjectTimeReportView, AsyncTaskAssignmentView,
+    AsyncTimerStatusView, AsyncBulkTaskCreateView, TimerEventsView
 )
 
 urlpatterns = [
@@ -20,6 +27,32 @@ urlpatterns = [
     path('tasks/<str:task_id>/assign/',TaskAssignmentView.as_view(),name='assign-task'),
     path('timer/status/', TimerStatusView.as_view(),name='timer-status'),
     path('tasks/bulk-create/', BulkTaskCreateView.as_view(),name='bulk-create-tasks'),
+    path('timer/bulk-start/', BulkTimerView.as_view(action='start'), name='bulk-start-timers'),
+    path('timer/bulk-stop/', BulkTimerView.as_view(action='stop'), name='bulk-stop-timers'),
+    path('batch/', BatchView.as_view(), name='batch'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('jobs/<uuid:job_id>/', JobStatusView.as_view(), name='job-status'),
+    path('jobs/<uuid:job_id>/result/', JobResultView.as_view(), name='job-result'),
+    path('exports/', WorkspaceExportView.as_view(), name='workspace-export'),
+    path('exports/<uuid:job_id>/files/<path:name>', ExportFileView.as_view(), name='export-file'),
+    path('webhooks/clockify/', ClockifyWebhookView.as_view(), name='clockify-webhook'),
+
+    # Async counterparts, serve through clockify_integration/asgi.py
+    path('async/workspaces/', AsyncWorkspaceView.as_view(), name='async-workspaces'),
+    path('async/projects/create/', AsyncCreateProjectView.as_view(), name='async-create-project'),
+    path('async/timer/start/', AsyncStartTimerView.as_view(), name='async-start-timer'),
+    path('async/timer/stop/', AsyncStopTimerView.as_view(), name='async-stop-timer'),
+    path('async/tasks/create/', AsyncCreateTaskView.as_view(), name='async-create-task'),
+    path('async/tasks/start-timer/', AsyncStartTaskTimerView.as_view(), name='async-start-task-timer'),
+    path('async/tasks/stop-timer/', AsyncStopTaskTimerView.as_view(), name='async-stop-task-timer'),
+    path('async/workspaces/<str:workspace_id>/projects/<str:project_id>/tasks/',
+         AsyncGetProjectTasksView.as_view(), name='async-get-project-tasks'),
+    path('async/users/<str:user_id>/time-report/', AsyncUserTimeReportView.as_view(), name='async-user-time-report'),
+    path('async/projects/<str:project_id>/time-report/', AsyncProjectTimeReportView.as_view(), name='async-project-time-report'),
+    path('async/tasks/<str:task_id>/assign/', AsyncTaskAssignmentView.as_view(), name='async-assign-task'),
+    path('async/timer/status/', AsyncTimerStatusView.as_view(), name='async-timer-status'),
+    path('async/timer/events/', TimerEventsView.as_view(), name='timer-events'),
+    path('async/tasks/bulk-create/', AsyncBulkTaskCreateView.as_view(), name='async-bulk-create-tasks'),
 ]
 
 
@@ -1,8 +1,23 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .services.clockify_service import ClockifyService
-from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from .models import Job, TimeEntry
+from .services.aggregation import TimeEntryColumns, aggregate, parse_group_by
+from .services.credentials import clients, clockify_user_id, service_for_user
+from .services.jobs import enqueue, job_to_dict
+from .services import export, fast_json, timer_store, webhooks, write_behind
+from .services.batch import run_batch
+from .services.local_reports import project_totals, running_entries, user_report_pages
+from .services.metrics import registry as metrics_registry
+from .services.projection import ListQuery
+from .services.singleflight import single_flight
+from .streaming import stream_report_json, stream_report_ndjson
+from . import pagination
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth.models import User
 from datetime import datetime, timedelta
 import requests
@@ -13,13 +28,47 @@ logger = logging.getLogger(__name__)
 class BaseClockifyView(APIView):
     permission_classes = [IsAuthenticated]
     
-    def __init__(self):
-        super().__init__()
-        self.service = ClockifyService()
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Once authenticated, so the view calls Clockify with the user's own credential
+        self.service = service_for_user(request.user)
 
     def validate_ids(self, workspace_id, project_id=None, task_id=None):
-        if not self.service.validate_ids(workspace_id, project_id, task_id):
-            raise ValueError("Invalid ID(s) provided")
+        invalid_ids = self.service.find_invalid_ids(workspace_id, project_id, task_id)
+        if invalid_ids:
+            raise ValueError(f"Invalid ID(s) provided: {', '.join(invalid_ids)}")
+
+    def aggregate_report(self, request, workspace_id, start_date, end_date,
+                         user_id=None, project_id=None):
+        """Group raw time entries locally (?backend=aggregate&group_by=user,task,tag,day)"""
+        if request.query_params.get('source') == 'local':
+            queryset = TimeEntry.objects.filter(
+                workspace_id=workspace_id, start__gte=start_date, start__lte=end_date
+            )
+            if user_id:
+                queryset = queryset.filter(user_id=user_id)
+            if project_id:
+                queryset = queryset.filter(project_id=project_id)
+            columns = TimeEntryColumns.from_queryset(queryset)
+        else:
+            filters = {}
+            if user_id:
+                filters["users"] = {"ids": [user_id]}
+            if project_id:
+                filters["projects"] = {"ids": [project_id]}
+            columns = TimeEntryColumns.from_entries(
+                entry
+                for page in self.service.iter_detailed_report_pages(workspace_id, start_date, end_date, filters)
+                for entry in page.get("timeentries") or []
+            )
+
+        result = aggregate(
+            columns,
+            parse_group_by(request.query_params.get('group_by')),
+            tz_offset_minutes=int(request.query_params.get('tz_offset', 0))
+        )
+        result.update(dateRangeStart=start_date.isoformat(), dateRangeEnd=end_date.isoformat())
+        return result
 
 class UserTimeReportView(BaseClockifyView):
     def get(self, request, user_id):
@@ -31,16 +80,44 @@ class UserTimeReportView(BaseClockifyView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
+            stream_format = request.query_params.get('stream', 'json')
+            if stream_format not in ('json', 'ndjson'):
+                return Response(
+                    {"error": "stream must be 'json' or 'ndjson'"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
             # Default to last 30 days if dates not provided
-            end_date = datetime.now()
+            end_date = timezone.now()
             start_date = end_date - timedelta(days=30)
-            
-            report = self.service.get_user_time_report(
-                workspace_id, user_id, start_date, end_date
+
+            if request.query_params.get('backend') == 'aggregate':
+                report = self.aggregate_report(
+                    request, workspace_id, start_date, end_date, user_id=user_id
+                )
+                return Response(report, status=status.HTTP_200_OK)
+
+            if request.query_params.get('source') == 'local':
+                first_page, pages = user_report_pages(workspace_id, user_id, start_date, end_date)
+            else:
+                pages = self.service.iter_user_time_report_pages(
+                    workspace_id, user_id, start_date, end_date
+                )
+                # Fetch the first page up front so upstream errors still map to a 400
+                first_page = next(pages)
+
+            if stream_format == 'ndjson':
+                return StreamingHttpResponse(
+                    stream_report_ndjson(first_page, pages),
+                    content_type='application/x-ndjson',
+                    status=status.HTTP_200_OK
+                )
+            return StreamingHttpResponse(
+                stream_report_json(first_page, pages),
+                content_type='application/json',
+                status=status.HTTP_200_OK
             )
             
-            return Response(report, status=status.HTTP_200_OK)
-            
         except Exception as e:
             logger.error(f"Error fetching user time report: {str(e)}")
             return Response(
@@ -58,9 +135,23 @@ class ProjectTimeReportView(BaseClockifyView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
+            if request.query_params.get('backend') == 'aggregate':
+                end_date = timezone.now()
+                start_date = end_date - timedelta(days=30)
+                report = self.aggregate_report(
+                    request, workspace_id, start_date, end_date, project_id=project_id
+                )
+                return Response(report, status=status.HTTP_200_OK)
+
+            if request.query_params.get('source') == 'local':
+                return Response({
+                    "projectId": project_id,
+                    "totals": project_totals(workspace_id, project_id)
+                }, status=status.HTTP_200_OK)
+
             self.validate_ids(workspace_id, project_id)
             
-            report = self.service.get_project_time_report(workspace_id, project_id)
+            report = self.service.get_project_time_report(workspace_id, project_id, raw=True)
             return Response(report, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -101,7 +192,7 @@ class TimerStatusView(BaseClockifyView):
     def get(self, request):
         try:
             workspace_id = request.query_params.get('workspace_id')
-            user_id = request.user.id  # Assuming user is authenticated
+            user_id = clockify_user_id(request.user)
 
             if not workspace_id:
                 return Response(
@@ -109,8 +200,17 @@ class TimerStatusView(BaseClockifyView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            status = self.service.get_timer_status(workspace_id, user_id)
-            return Response(status, status=status.HTTP_200_OK)
+            source = request.query_params.get('source', settings.CLOCKIFY_TIMER_STATUS_SOURCE)
+            if source == 'local':
+                timer_status = running_entries(workspace_id, user_id)
+            elif source == 'store':
+                # Webhooks keep the store current; users it has never seen are looked up once
+                timer_status = timer_store.get_or_fetch(
+                    workspace_id, user_id, lambda: self.service.get_timer_status(workspace_id, user_id)
+                )
+            else:
+                timer_status = self.service.get_timer_status(workspace_id, user_id)
+            return Response(timer_status, status=status.HTTP_200_OK)
             
         except Exception as e:
             logger.error(f"Error fetching timer status: {str(e)}")
@@ -119,6 +219,30 @@ class TimerStatusView(BaseClockifyView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+class ClockifyWebhookView(APIView):
+    """Receives Clockify time-entry webhooks; authenticated by the Clockify-Signature token"""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        if not webhooks.verify_signature(request.headers.get(webhooks.SIGNATURE_HEADER)):
+            return Response(
+                {"error": "Invalid webhook signature"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            event_type = request.headers.get(webhooks.EVENT_HEADER, '')
+            handled = webhooks.handle_event(event_type, request.data)
+            return Response({"handled": handled}, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error processing Clockify webhook: {str(e)}")
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
 class BulkTaskCreateView(BaseClockifyView):
     def post(self, request):
         try:
@@ -133,11 +257,29 @@ class BulkTaskCreateView(BaseClockifyView):
                 )
 
             self.validate_ids(workspace_id, project_id)
-            
-            created_tasks = self.service.bulk_create_tasks(
-                workspace_id, project_id, tasks
+
+            if request.data.get('background'):
+                job = enqueue("bulk_create_tasks", {
+                    "workspace_id": workspace_id,
+                    "project_id": project_id,
+                    "tasks": tasks,
+                    "max_concurrency": request.data.get('max_concurrency')
+                }, total=len(tasks), user=request.user)
+                return Response({
+                    "job_id": str(job.pk),
+                    "status_url": reverse('job-status', args=[job.pk], request=request)
+                }, status=status.HTTP_202_ACCEPTED)
+
+            results = self.service.bulk_create_tasks_detailed(
+                workspace_id, project_id, tasks,
+                max_workers=request.data.get('max_concurrency')
             )
-            return Response(created_tasks, status=status.HTTP_201_CREATED)
+            failed = sum(1 for result in results if result["status"] == "error")
+            return Response({
+                "created": len(results) - failed,
+                "failed": failed,
+                "results": results
+            }, status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED)
             
         except Exception as e:
             logger.error(f"Error creating tasks in bulk: {str(e)}")
@@ -146,15 +288,193 @@ class BulkTaskCreateView(BaseClockifyView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+class BulkTimerView(BaseClockifyView):
+    """
+    Start or stop many timers in one call: {"items": [...], "workspace_id"?, "project_id"?}.
+    Top-level fields are defaults for every item; one result per item, in order.
+    """
+    action = None
+
+    def post(self, request):
+        try:
+            items = request.data.get('items')
+            if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+                return Response({"error": "items must be a non-empty list of objects"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            if len(items) > settings.CLOCKIFY_BULK_TIMER_MAX_ITEMS:
+                return Response(
+                    {"error": f"At most {settings.CLOCKIFY_BULK_TIMER_MAX_ITEMS} items per call"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            defaults = {field: request.data[field] for field in ('workspace_id', 'project_id') if request.data.get(field)}
+            items = [{**defaults, **item} for item in items]
+
+            # Acting for other users is for staff (kiosks, shift leads); everyone else only for themselves
+            if not request.user.is_staff:
+                own_id = clockify_user_id(request.user)
+                if any(item.get('user_id') and str(item['user_id']) != own_id for item in items):
+                    return Response({"error": "Not allowed to manage other users' timers"},
+                                    status=status.HTTP_403_FORBIDDEN)
+
+            run = self.service.bulk_start_timers if self.action == 'start' else self.service.bulk_stop_timers
+            results = run(items, max_workers=request.data.get('max_concurrency'))
+            failed = sum(1 for result in results if result["status"] == "error")
+            return Response({
+                "succeeded": len(results) - failed,
+                "failed": failed,
+                "results": results
+            }, status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK)
+
+        except Exception as e:
+            logger.error(f"Error in bulk timer {self.action}: {str(e)}")
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BatchView(BaseClockifyView):
+    """Run several read operations in one call: {"operations": [{"id", "op", "args"}, ...]}"""
+    def post(self, request):
+        try:
+            operations = request.data.get('operations')
+            if not isinstance(operations, list) or not operations:
+                return Response(
+                    {"error": "operations must be a non-empty list"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if len(operations) > settings.CLOCKIFY_BATCH_MAX_OPERATIONS:
+                return Response(
+                    {"error": f"At most {settings.CLOCKIFY_BATCH_MAX_OPERATIONS} operations per batch"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            results = run_batch(self.service, request.user, operations, request.data.get('max_concurrency'))
+            failed = sum(1 for result in results if result["status"] == "error")
+            return Response(
+                {"results": results},
+                status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK
+            )
+
+        except Exception as e:
+            logger.error(f"Error running batch: {str(e)}")
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+class JobStatusView(BaseClockifyView):
+    def get_job(self, request, job_id):
+        jobs = Job.objects.all()
+        if not request.user.is_staff:
+            jobs = jobs.filter(created_by=request.user)
+        return jobs.filter(pk=job_id).first()
+
+    def get(self, request, job_id):
+        job = self.get_job(request, job_id)
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        data = job_to_dict(job)
+        data["result_url"] = reverse('job-result', args=[job.pk], request=request)
+        return Response(data, status=status.HTTP_200_OK)
+
+class JobResultView(JobStatusView):
+    def get(self, request, job_id):
+        job = self.get_job(request, job_id)
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        if job.status in (Job.QUEUED, Job.RUNNING):
+            return Response(job_to_dict(job), status=status.HTTP_202_ACCEPTED)
+        if job.status == Job.FAILED:
+            return Response({"error": job.error}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(job.result, status=status.HTTP_200_OK)
+
+class WorkspaceExportView(BaseClockifyView):
+    """Start a background export of every time entry in the workspace"""
+
+    @staticmethod
+    def parse_date(value):
+        if not value:
+            return None
+        moment = datetime.fromisoformat(value)
+        return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+    def post(self, request):
+        try:
+            workspace_id = request.data.get('workspace_id')
+            if not workspace_id:
+                return Response(
+                    {"error": "workspace_id is required"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            formats = export.parse_formats(request.data.get('formats'))
+            start_date = self.parse_date(request.data.get('start_date'))
+            end_date = self.parse_date(request.data.get('end_date'))
+            if start_date and end_date and start_date >= end_date:
+                raise ValueError("start_date must be before end_date")
+
+            self.validate_ids(workspace_id)
+
+            job = enqueue("export_workspace", {
+                "workspace_id": workspace_id,
+                "start_date": start_date.isoformat() if start_date else None,
+                "end_date": end_date.isoformat() if end_date else None,
+                "formats": formats
+            }, user=request.user)
+            return Response({
+                "job_id": str(job.pk),
+                "status_url": reverse('job-status', args=[job.pk], request=request),
+                "result_url": reverse('job-result', args=[job.pk], request=request)
+            }, status=status.HTTP_202_ACCEPTED)
+
+        except Exception as e:
+            logger.error(f"Error starting workspace export: {str(e)}")
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+class ExportFileView(JobStatusView):
+    """Download a file listed in a finished export's manifest"""
+
+    def get(self, request, job_id, name):
+        job = self.get_job(request, job_id)
+        if job is None or job.kind != "export_workspace":
+            return Response({"error": "Export not found"}, status=status.HTTP_404_NOT_FOUND)
+        if job.status != Job.SUCCEEDED:
+            return Response(job_to_dict(job), status=status.HTTP_409_CONFLICT)
+        if name not in {file["name"] for file in job.result.get("files", [])}:
+            return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+        path = export.export_root() / str(job.pk) / name
+        if not path.exists():
+            return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
+
+class CacheStatsView(BaseClockifyView):
+    def get(self, request):
+        stats = self.service.cache.stats()
+        stats["single_flight"] = single_flight.stats()
+        stats["clients"] = clients.stats()
+        return Response(stats, status=status.HTTP_200_OK)
+
+
+def metrics_view(request):
+    """Prometheus scrape target; set CLOCKIFY_METRICS_TOKEN to require a bearer token"""
+    token = settings.CLOCKIFY_METRICS_TOKEN
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return HttpResponseForbidden()
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 
 ############ Old Features ##################
 class WorkspaceView(APIView):
     def get(self, request):
         try:
-            service = ClockifyService()
-            print(f"==>> service: {service}")
-            workspaces = service.get_workspaces()
-            print(f"==>> workspaces: {workspaces}")
+            service = service_for_user(request.user)
+            query = ListQuery.from_params(request.query_params, allowed=("fields", "name__contains"))
+            if query.is_identity():
+                # Relayed as Clockify sent it, ORJSONRenderer writes RawJSON out unchanged
+                return Response(service.get_workspaces(raw=True), status=status.HTTP_200_OK)
+            workspaces = list(query.apply(service.get_workspaces()))
             return Response(workspaces, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error fetching workspaces: {e}")
@@ -165,7 +485,7 @@ class CreateProjectView(APIView):
         workspace_id = request.data.get("workspace_id")
 
         try:
-            service = ClockifyService()
+            service = service_for_user(request.user)
             project_name = request.data.get("name")
 
             if not project_name:
@@ -188,7 +508,10 @@ class StartTimerView(APIView):
             return Response({"error": "Workspace ID and Project ID are required"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            service = ClockifyService()
+            if write_behind.requested(request.data.get("write_behind")):
+                time_entry = write_behind.start(request.user, workspace_id, project_id, description=description)
+                return Response(time_entry, status=status.HTTP_202_ACCEPTED)
+            service = service_for_user(request.user)
             time_entry = service.start_timer(workspace_id, project_id, description)
             return Response(time_entry, status=status.HTTP_201_CREATED)
         
@@ -200,19 +523,37 @@ class StopTimerView(APIView):
     def put(self, request):
         workspace_id = request.data.get("workspaceId")
         time_entry_id = request.data.get("timeEntryId")
+        user_id = request.data.get("userId")
         
-        print(f"Received request data: {request.data}")
+        logger.debug(f"Received request data: {request.data}")
         
-        if not workspace_id or not time_entry_id:
+        if not workspace_id or not (time_entry_id or user_id):
             return Response(
-                {"error": "workspaceId and timeEntryId are required"}, 
+                {"error": "workspaceId and timeEntryId (or userId) are required"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        service = ClockifyService()
+        # Stopping by userId is for the user's own timer, or for staff (as with BulkTimerView)
+        if user_id and not request.user.is_staff and (
+                not request.user.is_authenticated or str(user_id) != clockify_user_id(request.user)):
+            return Response(
+                {"error": "Not allowed to manage other users' timers"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        service = service_for_user(request.user)
         try:
-            response = service.stop_timer(workspace_id, time_entry_id)
+            if write_behind.requested(request.data.get("write_behind")) or write_behind.is_local_id(time_entry_id):
+                entry = write_behind.stop(request.user, workspace_id, time_entry_id, user_id)
+                if entry is not None:
+                    return Response(entry, status=status.HTTP_202_ACCEPTED)
+            if time_entry_id:
+                response = service.stop_timer(workspace_id, time_entry_id)
+            else:
+                response = service.stop_running_timer(workspace_id, user_id)
             return Response(response, status=status.HTTP_200_OK)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
         except requests.exceptions.RequestException as e:
             error_message = f"Error stopping timer: {str(e)}"
             if hasattr(e, 'response') and e.response is not None:
@@ -237,7 +578,7 @@ class CreateTaskView(APIView):
             )
 
         try:
-            service = ClockifyService()
+            service = service_for_user(request.user)
             task = service.create_task(workspace_id, project_id, task_name, assignee_ids)
             return Response(task, status=status.HTTP_201_CREATED)
         except Exception as e:
@@ -258,7 +599,13 @@ class StartTaskTimerView(APIView):
             )
 
         try:
-            service = ClockifyService()
+            if write_behind.requested(request.data.get("write_behind")):
+                time_entry = write_behind.start(request.user, workspace_id, project_id, task_id, description)
+                return Response({
+                    "message": "Timer start accepted",
+                    "time_entry": time_entry
+                }, status=status.HTTP_202_ACCEPTED)
+            service = service_for_user(request.user)
             time_entry = service.start_task_timer(
                 workspace_id, project_id, task_id, description
             )
@@ -275,7 +622,7 @@ class StopTaskTimerView(APIView):
         workspace_id = request.data.get("workspace_id")
         time_entry_id = request.data.get("time_entry_id")
         
-        print(f"Received request data: {request.data}")
+        logger.debug(f"Received request data: {request.data}")
         
         if not workspace_id or not time_entry_id:
             return Response(
@@ -283,13 +630,20 @@ class StopTaskTimerView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        service = ClockifyService()
+        service = service_for_user(request.user)
         try:
+            if write_behind.requested(request.data.get("write_behind")) or write_behind.is_local_id(time_entry_id):
+                return Response({
+                    "message": "Timer stop accepted",
+                    "time_entry": write_behind.stop(request.user, workspace_id, time_entry_id)
+                }, status=status.HTTP_202_ACCEPTED)
             response = service.stop_task_timer(workspace_id, time_entry_id)
             return Response({
                 "message": "Timer stopped successfully",
                 "time_entry": response
             }, status=status.HTTP_200_OK)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
         except requests.exceptions.RequestException as e:
             error_message = f"Error stopping task timer: {str(e)}"
             if hasattr(e, 'response') and e.response is not None:
@@ -303,9 +657,26 @@ class StopTaskTimerView(APIView):
 class GetProjectTasksView(APIView):
     def get(self, request, workspace_id, project_id):
         try:
-            service = ClockifyService()
-            tasks = service.get_project_tasks(workspace_id, project_id)
-            return Response(tasks, status=status.HTTP_200_OK)
+            service = service_for_user(request.user)
+            # ?fields=id,name&status=ACTIVE|DONE|ALL&assignee=<user id>&name__contains=<text>
+            query = ListQuery.from_params(request.query_params)
+            filters = query.task_params()
+            # ?page_size=<n> for the first page, then ?cursor=<X-Next-Cursor of the previous page>
+            page, page_size = pagination.read_cursor(request.query_params, filters)
+            result = service.get_project_task_page(workspace_id, project_id, page, page_size, filters)
+
+            query = query.without_task_params()
+            if query.is_identity():
+                tasks = result["tasks"]  # Relayed as Clockify sent it
+            else:
+                tasks = list(query.apply(fast_json.decoded(result["tasks"])))
+            response = Response(tasks, status=status.HTTP_200_OK)
+
+            if result["count"] >= page_size:
+                pagination.add_next_link(response, request, page + 1, page_size, filters)
+                if pagination.prefetch_enabled():
+                    service.prefetch_project_task_page(workspace_id, project_id, page + 1, page_size, filters)
+            return response
         except Exception as e:
             logger.error(f"Error fetching tasks: {e}")
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -2,6 +2,9 @@
 ASGI config for clockify_integration project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn clockify_integration.asgi:application``)
+so the ``api/clockify/async/`` views can multiplex upstream Clockify calls on one worker
+and ``api/clockify/async/timer/events/`` can hold many long-lived SSE connections.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'clockify_api.middleware.metrics_middleware',  # Per-view latency for /metrics
+    'django.middleware.http.ConditionalGetMiddleware',  # ETag on GET responses, 304 on If-None-Match
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -82,6 +84,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Webhooks, the timer store and write-behind write from many threads at once: take SQLite's
+        # write lock when a transaction begins and wait for it, rather than failing on a read-to-write upgrade
+        'OPTIONS': {
+            'timeout': 30,
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -127,6 +135,150 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# DRF's defaults with the JSON renderer and parser swapped for their orjson versions
+# (clockify_api/renderers.py), which fall back to the standard library without orjson
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'clockify_api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'clockify_api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
 # settings.py
 CLOCKIFY_API_KEY = os.getenv('CLOCKIFY_API_KEY_VALUE')  # Updated variable name for API Key
 CLOCKIFY_BASE_URL = os.getenv('CLOCKIFY_API_BASE_URL')  # Updated variable name for Base URL
+
+# Per-user API keys (ClockifyCredential rows, managed in the admin); users without one use CLOCKIFY_API_KEY
+CLOCKIFY_CREDENTIALS = {
+    'max_clients': int(os.getenv('CLOCKIFY_MAX_CLIENTS', 256)),  # Services kept per process, least recently used dropped
+    'lookup_ttl': float(os.getenv('CLOCKIFY_CREDENTIAL_LOOKUP_TTL', 60)),  # Seconds a user's credential is reused unread
+}
+
+# Shared keep-alive HTTP pool used by every ClockifyService instance
+CLOCKIFY_HTTP_POOL_CONNECTIONS = int(os.getenv('CLOCKIFY_HTTP_POOL_CONNECTIONS', 10))  # Number of per-host pools kept
+CLOCKIFY_HTTP_POOL_MAXSIZE = int(os.getenv('CLOCKIFY_HTTP_POOL_MAXSIZE', 20))  # Connections kept alive per host
+CLOCKIFY_HTTP_HOST_POOL_SIZES = {}  # e.g. {"api.clockify.me": 50} to size individual hosts
+CLOCKIFY_CONNECT_TIMEOUT = float(os.getenv('CLOCKIFY_CONNECT_TIMEOUT', 3.05))
+CLOCKIFY_READ_TIMEOUT = float(os.getenv('CLOCKIFY_READ_TIMEOUT', 30))
+CLOCKIFY_ASYNC_MAX_CONNECTIONS = int(os.getenv('CLOCKIFY_ASYNC_MAX_CONNECTIONS', 100))  # In-flight cap for AsyncClockifyService
+
+# Concurrent bulk operations (concurrency halves on every 429 and recovers gradually)
+CLOCKIFY_BULK_MAX_WORKERS = int(os.getenv('CLOCKIFY_BULK_MAX_WORKERS', 8))
+CLOCKIFY_BULK_MIN_WORKERS = int(os.getenv('CLOCKIFY_BULK_MIN_WORKERS', 1))
+CLOCKIFY_BULK_MAX_RETRIES = int(os.getenv('CLOCKIFY_BULK_MAX_RETRIES', 3))  # Retries per item after a 429
+CLOCKIFY_BULK_TIMER_MAX_ITEMS = int(os.getenv('CLOCKIFY_BULK_TIMER_MAX_ITEMS', 200))  # Per timer/bulk-start|stop call
+
+# Read-through metadata cache (local LRU tier in front of Django's cache framework)
+CLOCKIFY_CACHE_ALIAS = os.getenv('CLOCKIFY_CACHE_ALIAS', 'default')
+CLOCKIFY_CACHE_LOCAL_MAX_ENTRIES = int(os.getenv('CLOCKIFY_CACHE_LOCAL_MAX_ENTRIES', 1024))
+CLOCKIFY_CACHE_LOCAL_TTL = int(os.getenv('CLOCKIFY_CACHE_LOCAL_TTL', 30))  # Upper bound for the in-process copy
+CLOCKIFY_CACHE_TTLS = {  # Seconds, per resource
+    'workspaces': 600,
+    'workspace': 600,
+    'project': 300,
+    'task': 120,
+    'tasks': 60,
+    'missing': 15,  # Negative cache for IDs Clockify reported as unknown
+    'time_entry': 24 * 60 * 60,  # Entries captured on start, so stop needs no GET
+    'validators': 24 * 60 * 60,  # Upstream ETag / Last-Modified with the body they describe
+    'user': 24 * 60 * 60,  # Owner of an API key
+}
+CLOCKIFY_VALIDATION_WORKERS = int(os.getenv('CLOCKIFY_VALIDATION_WORKERS', 8))  # Threads resolving validate_ids lookups
+
+# Paginated detailed reports
+CLOCKIFY_REPORT_PAGE_SIZE = int(os.getenv('CLOCKIFY_REPORT_PAGE_SIZE', 200))  # Clockify accepts up to 1000
+CLOCKIFY_PREFETCH_WORKERS = int(os.getenv('CLOCKIFY_PREFETCH_WORKERS', 4))  # Threads fetching the next page ahead
+CLOCKIFY_LIST_PAGE_SIZE = int(os.getenv('CLOCKIFY_LIST_PAGE_SIZE', 200))  # page-size for project/task listings
+
+# Cursor pagination of GET workspaces/<workspace>/projects/<project>/tasks/ (Link / X-Next-Cursor headers)
+CLOCKIFY_TASK_PAGINATION = {
+    'default_page_size': int(os.getenv('CLOCKIFY_TASK_PAGE_SIZE', 50)),  # Clockify's own default
+    'max_page_size': int(os.getenv('CLOCKIFY_TASK_MAX_PAGE_SIZE', 500)),
+    'prefetch': os.getenv('CLOCKIFY_TASK_PAGE_PREFETCH', '0') == '1',  # Cache the next page while the client reads this one, for clients that page through
+}
+
+# Full-workspace exports (python manage.py export_clockify, or POST api/clockify/exports/ as a job)
+CLOCKIFY_EXPORT = {
+    'directory': os.getenv('CLOCKIFY_EXPORT_DIR', BASE_DIR / 'exports'),  # API exports go to <directory>/<job id>/
+    'page_size': int(os.getenv('CLOCKIFY_EXPORT_PAGE_SIZE', 1000)),  # Report rows per request, Clockify's maximum
+    'prefetch': int(os.getenv('CLOCKIFY_EXPORT_PREFETCH', 4)),  # Pages requested ahead, bounded by CLOCKIFY_PREFETCH_WORKERS
+    'checkpoint_every': 50,  # Pages between checkpoints, the most an interrupted export re-reads
+    'default_days': 365,  # Range exported when no start date is given
+    'compression': 'zstd',  # Parquet/Arrow codec (needs pyarrow)
+    'compress_level': 6,  # gzip level for the NDJSON output
+}
+
+# Local mirror sync (python manage.py sync_clockify)
+CLOCKIFY_SYNC_INITIAL_DAYS = int(os.getenv('CLOCKIFY_SYNC_INITIAL_DAYS', 90))  # Window for the first/full sync
+CLOCKIFY_SYNC_LOOKBACK_HOURS = int(os.getenv('CLOCKIFY_SYNC_LOOKBACK_HOURS', 72))  # Re-read recent entries to catch edits
+CLOCKIFY_SYNC_WORKSPACES = [w for w in os.getenv('CLOCKIFY_SYNC_WORKSPACES', '').split(',') if w]
+
+# Client-side rate limiting and retries for every Clockify call
+CLOCKIFY_RATE_LIMIT = {
+    'enabled': os.getenv('CLOCKIFY_RATE_LIMIT_ENABLED', '1') == '1',
+    'rate': float(os.getenv('CLOCKIFY_RATE_LIMIT_RATE', 50)),  # Requests per second per API key/workspace
+    'burst': float(os.getenv('CLOCKIFY_RATE_LIMIT_BURST', 50)),
+    'backend': os.getenv('CLOCKIFY_RATE_LIMIT_BACKEND', 'local'),  # 'local' or 'cache' (shared by all workers)
+    'cache_alias': 'default',
+}
+CLOCKIFY_RETRY = {
+    'max_retries': int(os.getenv('CLOCKIFY_RETRY_MAX', 3)),
+    'base_delay': float(os.getenv('CLOCKIFY_RETRY_BASE_DELAY', 0.5)),  # Seconds, doubled per attempt with full jitter
+    'max_delay': float(os.getenv('CLOCKIFY_RETRY_MAX_DELAY', 10)),  # Also caps Retry-After
+}
+
+# Background jobs (python manage.py run_clockify_workers)
+CLOCKIFY_JOB_LOCK_SECONDS = int(os.getenv('CLOCKIFY_JOB_LOCK_SECONDS', 120))  # Heartbeat window before a job is re-queued
+CLOCKIFY_JOB_MAX_ATTEMPTS = int(os.getenv('CLOCKIFY_JOB_MAX_ATTEMPTS', 3))
+CLOCKIFY_JOB_WORKERS = int(os.getenv('CLOCKIFY_JOB_WORKERS', 4))
+
+# Clockify webhooks (POST api/clockify/webhooks/clockify/) feeding the per-user timer store
+CLOCKIFY_WEBHOOK_SECRETS = [s for s in os.getenv('CLOCKIFY_WEBHOOK_SECRETS', '').split(',') if s]  # Clockify-Signature tokens
+CLOCKIFY_TIMER_STORE_TTL = int(os.getenv('CLOCKIFY_TIMER_STORE_TTL', 24 * 60 * 60))
+# 'store', 'local' or 'clockify'; the store is only kept current where Clockify webhooks are configured
+CLOCKIFY_TIMER_STATUS_SOURCE = os.getenv('CLOCKIFY_TIMER_STATUS_SOURCE', 'store' if CLOCKIFY_WEBHOOK_SECRETS else 'clockify')
+
+# Write-behind timer actions: start/stop answered at once (202) and written to Clockify from the TimerWrite table
+CLOCKIFY_TIMER_WRITE_BEHIND = {
+    'enabled': os.getenv('CLOCKIFY_TIMER_WRITE_BEHIND', '0') == '1',  # Default for the timer views, requests may pass write_behind
+    'flusher': os.getenv('CLOCKIFY_TIMER_WRITE_BEHIND_FLUSHER', 'thread'),  # 'thread' (in each web process) or 'command' (manage.py flush_timer_writes)
+    'max_concurrency': int(os.getenv('CLOCKIFY_TIMER_WRITE_BEHIND_CONCURRENCY', 8)),  # Writes in flight per flush
+    'batch_size': 100,  # Writes claimed per flush
+    'max_attempts': int(os.getenv('CLOCKIFY_TIMER_WRITE_BEHIND_MAX_ATTEMPTS', 10)),
+    'retry_delay': 2,  # Seconds before the first retry, doubled per attempt
+    'max_retry_delay': 300,
+    'lock_seconds': 60,  # A claimed write whose flusher died is picked up again after this
+    'poll_interval': 5,  # Seconds between sweeps for retries when no new write wakes the flusher
+}
+
+# Timer start/stop push channel (Server-Sent Events at api/clockify/async/timer/events/, needs ASGI)
+CLOCKIFY_TIMER_EVENTS = {
+    'backend': os.getenv('CLOCKIFY_TIMER_EVENTS_BACKEND', 'local'),  # 'local' or 'cache' (shared by all workers)
+    'cache_alias': 'default',
+    'heartbeat': float(os.getenv('CLOCKIFY_TIMER_EVENTS_HEARTBEAT', 15)),  # Seconds between keep-alive comments
+    'poll_interval': float(os.getenv('CLOCKIFY_TIMER_EVENTS_POLL_INTERVAL', 1)),  # 'cache' backend only
+    'retention': 300,  # Seconds an event stays in the shared log
+    'queue_size': 100,  # Events buffered per slow client before the oldest are dropped
+}
+
+# Concurrent identical GETs to Clockify share one upstream call
+CLOCKIFY_SINGLE_FLIGHT = {
+    'enabled': os.getenv('CLOCKIFY_SINGLE_FLIGHT_ENABLED', '1') == '1',
+    'shared': os.getenv('CLOCKIFY_SINGLE_FLIGHT_SHARED', '0') == '1',  # Also coalesce across workers via a cache lock
+    'cache_alias': 'default',
+    'lock_timeout': 5,  # Seconds a worker waits on another worker's call before fetching itself
+    'result_ttl': 2,  # Seconds the leader's result stays in the cache for waiting workers
+    'poll_interval': 0.05,
+}
+
+# POST api/clockify/batch/
+CLOCKIFY_BATCH_MAX_OPERATIONS = int(os.getenv('CLOCKIFY_BATCH_MAX_OPERATIONS', 50))
+CLOCKIFY_BATCH_MAX_CONCURRENCY = int(os.getenv('CLOCKIFY_BATCH_MAX_CONCURRENCY', 8))  # Sub-operations in flight per batch
+
+# Prometheus metrics at /metrics (per worker process)
+CLOCKIFY_METRICS_TOKEN = os.getenv('CLOCKIFY_METRICS_TOKEN', '')  # Bearer token required to scrape, empty = open
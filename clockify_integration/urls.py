@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from clockify_api.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/clockify/', include('clockify_api.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]